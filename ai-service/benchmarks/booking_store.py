@@ -0,0 +1,105 @@
+"""
+Seeded SQLite stand-in for the MySQL booking tables
+Runs the same booking queries as database.db_config against generated data
+"""
+import random
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_config import (
+    PREPARED_QUERIES, USER_BOOKINGS_PAGE_SIZE, booking_batch_chunks,
+    user_bookings_page_params, user_bookings_page_query
+)
+
+DESTINATIONS = [
+    'San Francisco, CA', 'New York, NY', 'Paris, France', 'Tokyo, Japan', 'Barcelona, Spain',
+    'Lisbon, Portugal', 'Austin, TX', 'Chicago, IL', 'Rome, Italy', 'Seattle, WA'
+]
+PROPERTY_TYPES = ['apartment', 'house', 'villa', 'cabin', 'loft']
+
+
+class SQLiteBookingStore:
+    def __init__(self, bookings: int = 200, properties: int = 40, destinations: int = 10,
+                 seed: int = 42, query_latency: float = 0.0, path: str = ':memory:'):
+        """
+        Args:
+            bookings: Number of bookings to generate (ids 1..bookings)
+            properties: Number of properties they are spread over
+            destinations: How many distinct cities the properties are in
+            seed: Random seed, so runs see identical data
+            query_latency: Extra seconds added to every query, standing in for the network round trip
+            path: SQLite file, in memory by default
+        """
+        self.query_latency = query_latency
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._seed(bookings, properties, DESTINATIONS[:max(1, destinations)], random.Random(seed))
+
+    def _seed(self, bookings: int, properties: int, destinations, rng: random.Random):
+        self._db.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT);
+            CREATE TABLE properties (
+                id INTEGER PRIMARY KEY, title TEXT, type TEXT, location TEXT, description TEXT,
+                price_per_night REAL, bedrooms INTEGER, bathrooms INTEGER, amenities TEXT, images TEXT
+            );
+            CREATE TABLE bookings (
+                id INTEGER PRIMARY KEY, property_id INTEGER, user_id INTEGER, check_in TEXT,
+                check_out TEXT, guests INTEGER, total_price REAL, status TEXT
+            );
+        """)
+        self._db.executemany("INSERT INTO users VALUES (?, ?, ?)", [
+            (user_id, f"Traveler {user_id}", f"traveler{user_id}@example.com") for user_id in range(1, 51)
+        ])
+        self._db.executemany("INSERT INTO properties VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+            (property_id, f"Stay #{property_id}", rng.choice(PROPERTY_TYPES), rng.choice(destinations),
+             "A comfortable place to stay", rng.randint(80, 400), rng.randint(1, 4), rng.randint(1, 3),
+             '["wifi", "kitchen"]', f'["/uploads/property-{property_id}-1.jpg", "/uploads/property-{property_id}-2.jpg"]')
+            for property_id in range(1, properties + 1)
+        ])
+        first_day = date(2025, 6, 1)
+        rows = []
+        for booking_id in range(1, bookings + 1):
+            check_in = first_day + timedelta(days=rng.randint(0, 180))
+            nights = rng.randint(2, 5)
+            rows.append((booking_id, rng.randint(1, properties), rng.randint(1, 50), check_in.isoformat(),
+                         (check_in + timedelta(days=nights)).isoformat(), rng.randint(1, 5),
+                         nights * 150.0, rng.choice(['Accepted', 'Accepted', 'Pending'])))
+        self._db.executemany("INSERT INTO bookings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.commit()
+
+    def _query(self, name: str, params: tuple):
+        return self._execute(PREPARED_QUERIES[name], params)
+
+    def _execute(self, query: str, params: tuple):
+        if self.query_latency:
+            time.sleep(self.query_latency)
+        with self._lock:
+            self.queries += 1
+            return [dict(row) for row in self._db.execute(query.replace('%s', '?'), params)]
+
+    def fetch_booking_context(self, booking_id: int) -> Optional[Dict[str, Any]]:
+        """Same row shape as database.db_config.fetch_booking_context"""
+        rows = self._query('booking_context', (booking_id,))
+        return rows[0] if rows else None
+
+    def fetch_user_bookings_page(self, user_id: int, status: str = None, columns=None,
+                                 after=None, limit: int = USER_BOOKINGS_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Same keyset page query as database.db_config.fetch_user_bookings_page"""
+        query = user_bookings_page_query(columns, bool(status), after is not None)
+        return self._execute(query, user_bookings_page_params(user_id, status, after, limit))
+
+    def fetch_booking_contexts(self, booking_ids) -> List[Dict[str, Any]]:
+        """Same chunked IN (...) queries as database.db_config.fetch_booking_contexts"""
+        rows = []
+        for name, params in booking_batch_chunks(booking_ids):
+            rows.extend(self._query(name, params))
+        return rows
@@ -0,0 +1,209 @@
+"""
+Local stand-ins for the Ollama and Tavily HTTP APIs
+Serve canned, correctly shaped responses after a configurable latency
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import zlib
+from collections import deque
+from typing import Dict, Optional
+
+from aiohttp import web
+
+
+class LatencyModel:
+    def __init__(self, latency: float, jitter: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            latency: Mean delay in seconds
+            jitter: Standard deviation in seconds (normal, clipped at zero)
+            seed: Seed for reproducible jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    def sample(self, extra: float = 0.0) -> float:
+        delay = self.latency + extra
+        if self.jitter:
+            delay += self.random.gauss(0, self.jitter)
+        return max(0.0, delay)
+
+
+class FakeServer:
+    """Base class: an aiohttp app on 127.0.0.1 with per-route call counters"""
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.calls: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def routes(self):
+        raise NotImplementedError
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def start(self):
+        app = web.Application()
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        await site.start()
+        # Port 0 means "pick a free one"; read back what was bound
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class FakeTavily(FakeServer):
+    """POST /search returning max_results plausible results"""
+
+    def __init__(self, latency: LatencyModel, port: int = 0):
+        super().__init__(port)
+        self.latency = latency
+
+    def routes(self):
+        return [web.post('/search', self.search)]
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.count('search')
+        body = await request.json()
+        await asyncio.sleep(self.latency.sample())
+        query = body.get('query', '')
+        results = [
+            {
+                'title': f"{query} - result {i + 1}",
+                'url': f"https://example.com/{zlib.crc32(query.encode()) % 100000}/{i}",
+                'content': f"{query}. " + "Local detail sentence for the benchmark. " * 6,
+                'score': round(1 - i * 0.1, 2)
+            }
+            for i in range(int(body.get('max_results', 5)))
+        ]
+        return web.json_response({'query': query, 'results': results})
+
+
+DAY_ACTIVITY = {"title": "Old Town Walk", "description": "Guided walk through the historic centre.",
+                "duration": "2 hours", "location": "Main Square"}
+DAY_RESTAURANT = {"name": "Corner Bistro", "cuisine": "Local", "why": "Good value, vegan options",
+                  "location": "Market Street"}
+
+
+def day_payload(day_number: int) -> dict:
+    return {
+        "day_number": day_number,
+        "morning": [DAY_ACTIVITY],
+        "afternoon": [dict(DAY_ACTIVITY, title="City Museum")],
+        "evening": [dict(DAY_ACTIVITY, title="Sunset Viewpoint", duration="1 hour")],
+        "restaurants": [DAY_RESTAURANT, dict(DAY_RESTAURANT, name="Harbour Grill")],
+        "summary": f"Day {day_number}: history and local food"
+    }
+
+
+class FakeOllama(FakeServer):
+    """
+    POST /api/generate answering each pipeline prompt with a response of the right shape
+
+    Generations take latency + evaluated prompt tokens * prefill_per_token +
+    generated tokens * decode_per_token, and at most `slots` run at once, like a single Ollama instance with
+    OLLAMA_NUM_PARALLEL. Each slot keeps its last prompt: the part of a new
+    prompt that matches a finished prompt's prefix is not evaluated again, as
+    with Ollama's KV cache reuse.
+    """
+
+    def __init__(self, latency: LatencyModel, slots: int = 1, prefill_per_token: float = 0.0,
+                 decode_per_token: float = 0.0, port: int = 0):
+        super().__init__(port)
+        self.latency = latency
+        self.slots = asyncio.Semaphore(slots)
+        self.prefill_per_token = prefill_per_token
+        self.decode_per_token = decode_per_token
+        self.cached_prompts: deque = deque(maxlen=slots)
+        self.prompt_tokens = 0
+        self.prompt_eval_tokens = 0
+
+    def _evaluated_tokens(self, prompt: str) -> int:
+        """Tokens (~4 chars each) beyond the longest prefix shared with a cached prompt"""
+        reused = max((len(os.path.commonprefix([prompt, cached])) for cached in self.cached_prompts), default=0)
+        return max(1, (len(prompt) - reused) // 4)
+
+    def routes(self):
+        return [web.post('/api/generate', self.generate), web.get('/api/ps', self.ps)]
+
+    def respond(self, prompt: str) -> str:
+        if '"days": [' in prompt:
+            match = re.search(r'(\d+)-day itinerary', prompt)
+            num_days = int(match.group(1)) if match else 1
+            self.count('whole_trip')
+            return json.dumps({"days": [day_payload(n) for n in range(1, num_days + 1)]})
+        if '"packing_checklist"' in prompt:
+            self.count('extras')
+            return json.dumps({
+                "packing_checklist": ["Comfortable walking shoes", "Light rain jacket", "Reusable water bottle",
+                                      "Phone charger", "Travel adapter"],
+                "weather_summary": "Mild, 15-22°C with occasional showers.",
+                "local_tips": ["Buy a day pass for public transport", "Museums are free on the first Sunday",
+                               "Tipping is appreciated but not expected"]
+            })
+        if '"morning"' in prompt:
+            match = re.search(r'Day (\d+)', prompt)
+            self.count('day_plan')
+            return json.dumps(day_payload(int(match.group(1)) if match else 1))
+        if 'cost range' in prompt.lower():
+            self.count('cost')
+            return "$400-$650 per person"
+        self.count('text')
+        return "\n".join([
+            "Pack layers for changing weather conditions",
+            "Use public transport to avoid parking costs",
+            "Book popular attractions a day in advance"
+        ])
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        prompt = body.get('prompt', '')
+        if not prompt:
+            # Empty prompt: Ollama just loads the model
+            self.count('load')
+            return web.json_response({'model': body.get('model'), 'response': '', 'done': True,
+                                      'load_duration': 0})
+        self.count('generate')
+        if body.get('format'):
+            # Constrained decoding requested ("json" or a JSON schema)
+            self.count('structured')
+        self.prompt_tokens += len(prompt) // 4
+
+        text = self.respond(prompt)
+        async with self.slots:
+            evaluated = self._evaluated_tokens(prompt)
+            self.prompt_eval_tokens += evaluated
+            await asyncio.sleep(self.latency.sample(
+                evaluated * self.prefill_per_token + len(text) // 4 * self.decode_per_token
+            ))
+            self.cached_prompts.append(prompt)
+
+        final = {'model': body.get('model'), 'response': text, 'done': True,
+                 'prompt_eval_count': evaluated, 'eval_count': len(text) // 4}
+        if body.get('stream') is False:
+            return web.json_response(final)
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        await response.write((json.dumps(final) + '\n').encode())
+        await response.write_eof()
+        return response
+
+    async def ps(self, request: web.Request) -> web.Response:
+        model = os.getenv('OLLAMA_MODEL', 'llama3.2:latest')
+        return web.json_response({'models': [{'name': model, 'model': model}]})
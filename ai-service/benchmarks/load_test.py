@@ -0,0 +1,249 @@
+"""
+End-to-end load benchmark for /api/concierge
+
+Starts fake Ollama and Tavily servers and a seeded SQLite booking store, points
+the app at them, and drives POST /api/concierge at a fixed concurrency.
+
+Usage (from ai-service/):
+    python -m benchmarks.load_test --requests 200 --concurrency 20
+    python -m benchmarks.load_test --planning-mode whole_trip --ollama-latency 1.5 --ollama-slots 2
+    python -m benchmarks.load_test --compare parallel whole_trip --ollama-decode 0.01 --ollama-slots 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.booking_store import SQLiteBookingStore
+from benchmarks.fakes import FakeOllama, FakeTavily, LatencyModel
+
+PLANNING_MODES = ['sequential', 'parallel', 'whole_trip']
+
+FREE_TEXTS = [
+    None,
+    "We're vegan and love museums",
+    "Traveling with kids, we like parks and the beach",
+    "Wheelchair accessible please, interested in food and history",
+    "Nightlife and shopping, budget is tight"
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load benchmark for the AI concierge API")
+    parser.add_argument('--requests', type=int, default=100, help="Measured requests")
+    parser.add_argument('--concurrency', type=int, default=10, help="Requests in flight at once")
+    parser.add_argument('--warmup', type=int, default=0, help="Unmeasured requests sent first")
+    parser.add_argument('--planning-mode', choices=PLANNING_MODES, default=None)
+    parser.add_argument('--compare', choices=PLANNING_MODES, nargs='+', default=None, metavar='MODE',
+                        help="Run the same load once per planning mode and compare them")
+    parser.add_argument('--bookings', type=int, default=200, help="Distinct bookings requests cycle through")
+    parser.add_argument('--destinations', type=int, default=10, help="Distinct cities the bookings are in")
+    parser.add_argument('--ollama-latency', type=float, default=0.5, help="Mean seconds per generation")
+    parser.add_argument('--ollama-jitter', type=float, default=0.1, help="Std dev seconds per generation")
+    parser.add_argument('--ollama-slots', type=int, default=1, help="Generations the fake Ollama runs at once")
+    parser.add_argument('--ollama-prefill', type=float, default=0.0,
+                        help="Extra seconds per evaluated (not prefix-cached) prompt token")
+    parser.add_argument('--ollama-decode', type=float, default=0.0,
+                        help="Extra seconds per generated token, so long outputs (whole_trip) take longer")
+    parser.add_argument('--warm-prefix', action='store_true',
+                        help="Plan day 1 before fanning out the other days (DAY_PLAN_WARM_PREFIX)")
+    parser.add_argument('--tavily-latency', type=float, default=0.3, help="Mean seconds per search")
+    parser.add_argument('--tavily-jitter', type=float, default=0.1, help="Std dev seconds per search")
+    parser.add_argument('--db-latency', type=float, default=0.002, help="Seconds per booking query")
+    parser.add_argument('--caches', action='store_true', help="Keep the Tavily/LLM disk caches on (fresh, temporary)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's own log output")
+    args = parser.parse_args(argv)
+    if args.compare and args.caches:
+        # The LLM cache would serve the second mode from the first one's run
+        parser.error("--compare runs every mode cold; drop --caches")
+    return args
+
+
+def configure_environment(args, tavily: FakeTavily, ollama: FakeOllama, cache_dir: str):
+    """Point the app at the fakes; must run before main is imported"""
+    os.environ['TAVILY_BASE_URL'] = tavily.base_url
+    os.environ['OLLAMA_BASE_URL'] = ollama.base_url
+    os.environ.setdefault('TAVILY_API_KEY', 'benchmark')
+    os.environ['OLLAMA_NUM_PARALLEL'] = str(args.ollama_slots)
+    os.environ['DAY_PLAN_WARM_PREFIX'] = 'true' if args.warm_prefix else 'false'
+    os.environ['BOOKING_EVENTS_SOURCE'] = ''
+    os.environ['PREGENERATION_ENABLED'] = 'false'
+    os.environ['TAVILY_CACHE_ENABLED'] = 'true' if args.caches else 'false'
+    os.environ['LLM_CACHE_ENABLED'] = 'true' if args.caches else 'false'
+    os.environ['TAVILY_CACHE_PATH'] = os.path.join(cache_dir, 'tavily.sqlite3')
+    os.environ['LLM_CACHE_PATH'] = os.path.join(cache_dir, 'llm.sqlite3')
+
+
+async def drive(client: httpx.AsyncClient, args, total: int, offset: int = 0,
+                planning_mode: Optional[str] = None) -> Dict[str, Any]:
+    """Send total requests, concurrency at a time; return latencies and status counts"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    next_index = iter(range(offset, offset + total))
+
+    async def worker():
+        for index in next_index:
+            body = {
+                'booking_id': index % args.bookings + 1,
+                'user_id': 1,
+                'free_text': FREE_TEXTS[index % len(FREE_TEXTS)]
+            }
+            if planning_mode:
+                body['planning_mode'] = planning_mode
+            started = time.perf_counter()
+            try:
+                response = await client.post('/api/concierge', json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, args.concurrency))])
+    return {'elapsed': time.perf_counter() - started, 'latencies': latencies, 'statuses': statuses}
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    """One report per planning mode (--compare), all against the same fakes and bookings"""
+    tavily = await FakeTavily(LatencyModel(args.tavily_latency, args.tavily_jitter, args.seed)).start()
+    ollama = await FakeOllama(
+        LatencyModel(args.ollama_latency, args.ollama_jitter, args.seed + 1),
+        slots=args.ollama_slots,
+        prefill_per_token=args.ollama_prefill,
+        decode_per_token=args.ollama_decode
+    ).start()
+    store = SQLiteBookingStore(bookings=args.bookings, destinations=args.destinations,
+                               seed=args.seed, query_latency=args.db_latency)
+
+    reports = []
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            configure_environment(args, tavily, ollama, cache_dir)
+            import main
+
+            main.fetch_booking_from_db = store.fetch_booking_context
+            for planning_mode in args.compare or [args.planning_mode]:
+                # Each mode starts with a cold Ollama prompt cache
+                ollama.cached_prompts.clear()
+                reports.append(await run_mode(main, args, planning_mode, tavily, ollama, store))
+    finally:
+        await tavily.stop()
+        await ollama.stop()
+    return reports
+
+
+async def run_mode(main, args, planning_mode: Optional[str], tavily: FakeTavily, ollama: FakeOllama,
+                   store: SQLiteBookingStore) -> Dict[str, Any]:
+    await main.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+            if args.warmup:
+                await drive(client, args, args.warmup, planning_mode=planning_mode)
+            calls_before = {
+                'tavily': dict(tavily.calls), 'ollama': dict(ollama.calls),
+                'db': store.queries, 'prompt_tokens': ollama.prompt_tokens,
+                'prompt_eval_tokens': ollama.prompt_eval_tokens
+            }
+            result = await drive(client, args, args.requests, offset=args.warmup, planning_mode=planning_mode)
+    finally:
+        await main.shutdown_event()
+
+    def delta(after: Dict[str, int], before: Dict[str, int]) -> Dict[str, int]:
+        return {name: count - before.get(name, 0) for name, count in sorted(after.items())}
+
+    latencies = sorted(result['latencies'])
+    completed = len(latencies)
+    return {
+        'requests': completed,
+        'concurrency': args.concurrency,
+        'planning_mode': planning_mode or os.getenv('DAY_PLANNING_MODE', 'parallel'),
+        'statuses': result['statuses'],
+        'elapsed_s': round(result['elapsed'], 3),
+        'requests_per_s': round(completed / result['elapsed'], 2) if result['elapsed'] else 0.0,
+        'latency_s': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0
+        },
+        'calls': {
+            'tavily': delta(tavily.calls, calls_before['tavily']),
+            'ollama': delta(ollama.calls, calls_before['ollama']),
+            'db_queries': store.queries - calls_before['db']
+        },
+        'ollama_prompt_tokens': ollama.prompt_tokens - calls_before['prompt_tokens'],
+        'ollama_prompt_eval_tokens': ollama.prompt_eval_tokens - calls_before['prompt_eval_tokens']
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("=" * 60)
+    print(f"📊 {report['requests']} requests, concurrency {report['concurrency']}, "
+          f"planning mode {report['planning_mode']}")
+    print("=" * 60)
+    print(f"   Status codes: {report['statuses']}")
+    print(f"   Throughput:   {report['requests_per_s']} req/s over {report['elapsed_s']}s")
+    latency = report['latency_s']
+    print(f"   Latency:      p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s  max {latency['max']}s")
+    requests = report['requests'] or 1
+    for dependency, counts in report['calls'].items():
+        if isinstance(counts, dict):
+            total = counts.get('search', counts.get('generate', 0))
+            detail = ", ".join(f"{name}={count}" for name, count in counts.items())
+            print(f"   {dependency:<13} {total} calls ({total / requests:.2f}/request) [{detail}]")
+        else:
+            print(f"   {dependency:<13} {counts} calls ({counts / requests:.2f}/request)")
+    print(f"   Prompt tokens: {report['ollama_prompt_tokens']} sent ({report['ollama_prompt_tokens'] // requests}/request), "
+          f"{report['ollama_prompt_eval_tokens']} evaluated ({report['ollama_prompt_eval_tokens'] // requests}/request)")
+
+
+def print_comparison(reports: List[Dict[str, Any]]):
+    print("=" * 60)
+    print(f"⚖️  Planning modes, {reports[0]['requests']} requests at concurrency {reports[0]['concurrency']}")
+    print("=" * 60)
+    print(f"   {'mode':<11} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'req/s':>7} {'ollama/req':>11}")
+    for report in reports:
+        latency = report['latency_s']
+        generations = report['calls']['ollama'].get('generate', 0) / (report['requests'] or 1)
+        print(f"   {report['planning_mode']:<11} {latency['p50']:>7} {latency['p95']:>7} {latency['p99']:>7} "
+              f"{report['requests_per_s']:>7} {generations:>11.2f}")
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    app_output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with app_output:
+        reports = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(reports if args.compare else reports[0], indent=2))
+        return
+    for report in reports:
+        print_report(report)
+    if args.compare:
+        print_comparison(reports)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,144 @@
+"""
+Microbenchmark for free-text preference extraction
+
+Compares the compiled single-pass matcher in services.preference_extraction
+with the per-keyword substring scans it replaced, over generated free text
+of increasing size.
+
+Usage (from ai-service/):
+    python -m benchmarks.preference_extraction
+    python -m benchmarks.preference_extraction --sizes 200 5000 100000 --texts 500
+"""
+import argparse
+import json
+import random
+import sys
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.preference_extraction import DEFAULT_LEXICON, PreferenceExtractor
+
+FILLER = (
+    "we are looking forward to our trip and would love some ideas for the week "
+    "our flight lands early so the first morning is free please plan something "
+    "nice near the apartment we stay in the old town start with coffee"
+).split()
+
+
+def legacy_extract(text: str) -> Dict[str, Any]:
+    """The keyword scans main.build_agent_inputs used to run, kept as the baseline"""
+    lowered = text.lower()
+    dietary = []
+    for keyword, restriction in {
+        'vegan': 'vegan', 'vegetarian': 'vegetarian', 'gluten-free': 'gluten-free',
+        'gluten free': 'gluten-free', 'halal': 'halal', 'kosher': 'kosher',
+        'dairy-free': 'dairy-free', 'dairy free': 'dairy-free'
+    }.items():
+        if keyword in lowered and restriction not in dietary:
+            dietary.append(restriction)
+    interests = [
+        interest for interest, keywords in {
+            'culture': ['culture', 'museum', 'art', 'history'],
+            'food': ['food', 'restaurant', 'dining', 'cuisine'],
+            'nature': ['nature', 'outdoor', 'hiking', 'park', 'beach'],
+            'adventure': ['adventure', 'thrill', 'sport'],
+            'relaxation': ['relax', 'spa', 'calm', 'peaceful'],
+            'nightlife': ['nightlife', 'bar', 'club', 'party'],
+            'shopping': ['shopping', 'mall', 'boutique']
+        }.items()
+        if any(keyword in lowered for keyword in keywords)
+    ]
+    mobility = None
+    if 'wheelchair' in lowered or 'accessible' in lowered:
+        mobility = 'wheelchair'
+    elif 'limited mobility' in lowered or 'no long walk' in lowered:
+        mobility = 'limited'
+    children = 'kid' in lowered or 'child' in lowered
+    return {'dietary': dietary, 'interests': interests, 'mobility': mobility, 'children': children}
+
+
+def generate_texts(count: int, size: int, keyword_rate: float, rng: random.Random) -> List[str]:
+    """count texts of about size characters, one word in 1/keyword_rate a lexicon keyword"""
+    keywords = [
+        keyword for values in DEFAULT_LEXICON.values() for words in values.values() for keyword in words
+    ]
+    texts = []
+    for _ in range(count):
+        words, length = [], 0
+        while length < size:
+            word = rng.choice(keywords) if rng.random() < keyword_rate else rng.choice(FILLER)
+            if rng.random() < 0.2:
+                word = word.capitalize()
+            words.append(word)
+            length += len(word) + 1
+        texts.append(" ".join(words))
+    return texts
+
+
+def measure(function: Callable[[List[str]], Any], texts: List[str], repeat: int) -> float:
+    """Best wall time of repeat runs over all texts"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(texts)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Free-text preference extraction microbenchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20000, 200000],
+                        help="Characters per text")
+    parser.add_argument('--texts', type=int, default=200, help="Texts per size")
+    parser.add_argument('--keyword-rate', type=float, default=0.05, help="Share of words that are keywords")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement; the best is reported")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def run(args) -> List[Dict[str, Any]]:
+    rng = random.Random(args.seed)
+    extractor = PreferenceExtractor()
+    rows = []
+    for size in args.sizes:
+        # Keep the total volume per size roughly constant
+        count = max(1, min(args.texts, args.texts * 2000 // size))
+        texts = generate_texts(count, size, args.keyword_rate, rng)
+        volume = sum(len(text) for text in texts)
+
+        legacy = measure(lambda batch: [legacy_extract(text) for text in batch], texts, args.repeat)
+        compiled = measure(extractor.extract_batch, texts, args.repeat)
+        rows.append({
+            'size': size,
+            'texts': count,
+            'legacy_us_per_text': round(legacy / count * 1e6, 1),
+            'compiled_us_per_text': round(compiled / count * 1e6, 1),
+            'legacy_mb_per_s': round(volume / legacy / 1e6, 1),
+            'compiled_mb_per_s': round(volume / compiled / 1e6, 1),
+            'speedup': round(legacy / compiled, 2)
+        })
+    return rows
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    rows = run(args)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"🔎 Preference extraction, keyword rate {args.keyword_rate}, best of {args.repeat}")
+    print("=" * 72)
+    print(f"   {'chars':>8} {'texts':>6} {'legacy µs':>11} {'compiled µs':>12} {'legacy MB/s':>12} {'compiled MB/s':>14}")
+    for row in rows:
+        print(f"   {row['size']:>8} {row['texts']:>6} {row['legacy_us_per_text']:>11} "
+              f"{row['compiled_us_per_text']:>12} {row['legacy_mb_per_s']:>12} {row['compiled_mb_per_s']:>14}")
+
+
+if __name__ == "__main__":
+    main_cli()
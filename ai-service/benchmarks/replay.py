@@ -0,0 +1,223 @@
+"""
+Replay recorded traffic against the current pipeline, fully offline
+
+Record a cassette on a live instance with CASSETTE_MODE=record, then re-drive
+the same concierge requests here, each to the endpoint it was recorded on
+(stream responses are read to the end, jobs are polled until they finish).
+Bookings, Tavily results and Ollama generations all come from the cassette,
+so two pipeline versions can be compared on identical inputs.
+
+Usage (from ai-service/):
+    python -m benchmarks.replay cache/cassette.jsonl.gz --speed 10
+    python -m benchmarks.replay cache/cassette.jsonl.gz --speed 0 --concurrency 8 --planning-mode whole_trip
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import percentile
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded cassette through the concierge pipeline")
+    parser.add_argument('cassette', help="Cassette file written with CASSETTE_MODE=record")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Latency divisor for recorded calls and request arrivals (0 = no waiting)")
+    parser.add_argument('--concurrency', type=int, default=0,
+                        help="Ignore recorded arrival times and keep this many requests in flight")
+    parser.add_argument('--planning-mode', choices=['sequential', 'parallel', 'whole_trip'], default=None,
+                        help="Override the planning mode of every replayed request")
+    parser.add_argument('--strict', action='store_true',
+                        help="Fail calls whose prompt/query was not recorded instead of using a same-type response")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--verbose', action='store_true', help="Show the app's own log output")
+    return parser.parse_args(argv)
+
+
+JOB_POLL_INTERVAL = 0.05
+
+
+async def replay_concierge(client: httpx.AsyncClient, body: Dict[str, Any]) -> Tuple[int, bool]:
+    response = await client.post('/api/concierge', json=body)
+    return response.status_code, response.status_code == 200
+
+
+async def replay_stream(client: httpx.AsyncClient, body: Dict[str, Any]) -> Tuple[int, bool]:
+    """Read the NDJSON stream to its end; an "error" event counts as a failure"""
+    ok = True
+    async with client.stream('POST', '/api/concierge/stream', json=body) as response:
+        if response.status_code != 200:
+            return response.status_code, False
+        async for line in response.aiter_lines():
+            if line and json.loads(line).get('event') == 'error':
+                ok = False
+    return response.status_code, ok
+
+
+async def replay_job(client: httpx.AsyncClient, body: Dict[str, Any]) -> Tuple[int, bool]:
+    """Submit the job and poll it until it completes or fails, so latency covers the whole generation"""
+    response = await client.post('/api/concierge/jobs', json=body)
+    if response.status_code != 202:
+        return response.status_code, False
+    status_url = response.json()['status_url']
+    while True:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        poll = await client.get(status_url)
+        if poll.status_code != 200:
+            return poll.status_code, False
+        job = poll.json()
+        if job['status'] in ('completed', 'failed'):
+            return response.status_code, job['status'] == 'completed'
+
+
+# Recorded endpoint -> how to re-drive it; anything else is reported as unsupported
+REPLAYERS: Dict[str, Callable[[httpx.AsyncClient, Dict[str, Any]], Awaitable[Tuple[int, bool]]]] = {
+    '/api/concierge': replay_concierge,
+    '/api/concierge/stream': replay_stream,
+    '/api/concierge/jobs': replay_job,
+}
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        'p50': round(percentile(latencies, 50), 3),
+        'p95': round(percentile(latencies, 95), 3),
+        'p99': round(percentile(latencies, 99), 3),
+        'max': round(latencies[-1], 3) if latencies else 0.0
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    os.environ['CASSETTE_MODE'] = 'replay'
+    os.environ['CASSETTE_PATH'] = os.path.abspath(args.cassette)
+    os.environ['CASSETTE_SPEED'] = str(args.speed)
+    os.environ['CASSETTE_FALLBACK'] = 'false' if args.strict else 'true'
+    # The caches are off under a cassette anyway; events would add unrelated work
+    os.environ['TAVILY_CACHE_ENABLED'] = 'false'
+    os.environ['LLM_CACHE_ENABLED'] = 'false'
+    os.environ['BOOKING_EVENTS_SOURCE'] = ''
+    os.environ['PREGENERATION_ENABLED'] = 'false'
+    # Offline: there is no Ollama to warm up
+    os.environ['MODEL_WARMUP_ENABLED'] = 'false'
+    import main
+    from services.cassette import get_cassette
+
+    await main.startup_event()
+    cassette = get_cassette()
+    entries = []
+    unsupported: Dict[str, int] = {}
+    for entry in cassette.requests:
+        if entry['endpoint'] not in REPLAYERS:
+            unsupported[entry['endpoint']] = unsupported.get(entry['endpoint'], 0) + 1
+            continue
+        body = dict(entry['body'])
+        if args.planning_mode:
+            body['planning_mode'] = args.planning_mode
+        entries.append((entry['offset'], entry['endpoint'], body))
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async def send(client: httpx.AsyncClient, endpoint: str, body: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            status, ok = await REPLAYERS[endpoint](client, body)
+        except httpx.HTTPError:
+            status, ok = 0, False
+        result = results.setdefault(endpoint, {'latencies': [], 'statuses': {}, 'failed': 0})
+        result['latencies'].append(time.perf_counter() - started)
+        result['statuses'][status] = result['statuses'].get(status, 0) + 1
+        if not ok:
+            result['failed'] += 1
+
+    try:
+        # Unhandled app errors become 500s, as behind a real server, instead of ending the replay
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url='http://replay', timeout=None) as client:
+            started = time.perf_counter()
+            if args.concurrency > 0:
+                pending = iter(entries)
+
+                async def worker():
+                    for _, endpoint, body in pending:
+                        await send(client, endpoint, body)
+
+                await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+            else:
+                # Keep the recorded arrival pattern, compressed by --speed
+                first = entries[0][0] if entries else 0.0
+
+                async def arrive(offset: float, endpoint: str, body: Dict[str, Any]):
+                    if args.speed > 0:
+                        await asyncio.sleep((offset - first) / args.speed)
+                    await send(client, endpoint, body)
+
+                await asyncio.gather(*[arrive(*entry) for entry in entries])
+            elapsed = time.perf_counter() - started
+    finally:
+        await main.shutdown_event()
+
+    latencies = sorted(latency for result in results.values() for latency in result['latencies'])
+    statuses: Dict[int, int] = {}
+    for result in results.values():
+        for status, count in result['statuses'].items():
+            statuses[status] = statuses.get(status, 0) + count
+    return {
+        'requests': len(latencies),
+        'statuses': statuses,
+        'failed': sum(result['failed'] for result in results.values()),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_s': latency_summary(latencies),
+        'endpoints': {
+            endpoint: {
+                'requests': len(result['latencies']),
+                'statuses': result['statuses'],
+                'failed': result['failed'],
+                'latency_s': latency_summary(sorted(result['latencies']))
+            }
+            for endpoint, result in sorted(results.items())
+        },
+        'unsupported': unsupported,
+        'cassette': cassette.stats()
+    }
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    app_output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with app_output:
+        report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"📼 Replayed {report['requests']} requests from {args.cassette}")
+    print("=" * 60)
+    print(f"   Status codes: {report['statuses']} ({report['failed']} failed)")
+    print(f"   Throughput:   {report['requests_per_s']} req/s over {report['elapsed_s']}s")
+    latency = report['latency_s']
+    print(f"   Latency:      p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s  max {latency['max']}s")
+    for endpoint, result in report['endpoints'].items():
+        latency = result['latency_s']
+        print(f"   {endpoint}: {result['requests']} requests, {result['failed']} failed, "
+              f"p50 {latency['p50']}s  p95 {latency['p95']}s")
+    for endpoint, count in report['unsupported'].items():
+        print(f"   ⚠️  Skipped {count} recorded requests to {endpoint} (replay not supported)")
+    stats = report['cassette']
+    print(f"   Cassette:     {stats['exact_hits']} exact, {stats['fallback_hits']} same-type fallback, "
+          f"{stats['misses']} missing")
+
+
+if __name__ == "__main__":
+    main_cli()
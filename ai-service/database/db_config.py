@@ -1,6 +1,12 @@
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,9 +19,272 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME', 'airbnb')
 }
 
+# Pool configuration
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+# Connections idle for longer than this are pinged before being handed out
+DB_POOL_HEALTHCHECK_AFTER = float(os.getenv('DB_POOL_HEALTHCHECK_AFTER', '30'))
+
+# Booking/property join queries, run as server-side prepared statements
+PREPARED_QUERIES = {
+    'booking_context': """
+                SELECT b.id, \
+                       b.property_id, \
+                       b.user_id, \
+                       b.check_in, \
+                       b.check_out, \
+                       b.guests, \
+                       b.total_price, \
+                       b.status, \
+                       p.title as property_title, \
+                       p.location, \
+                       p.type, \
+                       p.amenities
+                FROM bookings b
+                         INNER JOIN properties p ON b.property_id = p.id
+                WHERE b.id = %s \
+                """,
+    'booking_with_property': """
+                SELECT b.id    as booking_id, \
+                       b.check_in, \
+                       b.check_out, \
+                       b.guests, \
+                       b.status, \
+                       b.user_id, \
+                       p.id    as property_id, \
+                       p.title as property_name, \
+                       p.type  as property_type, \
+                       p.location, \
+                       p.description, \
+                       p.price_per_night, \
+                       p.bedrooms, \
+                       p.bathrooms, \
+                       p.amenities, \
+                       u.name  as traveler_name, \
+                       u.email as traveler_email
+                FROM bookings b
+                         JOIN properties p ON b.property_id = p.id
+                         JOIN users u ON b.user_id = u.id
+                WHERE b.id = %s \
+                """
+}
+
+# Columns a user-bookings listing can select, by output name. Large blobs
+# (images) are left out of DEFAULT_USER_BOOKING_COLUMNS and only read on request.
+USER_BOOKING_COLUMNS = {
+    'booking_id': 'b.id',
+    'check_in': 'b.check_in',
+    'check_out': 'b.check_out',
+    'guests': 'b.guests',
+    'status': 'b.status',
+    'total_price': 'b.total_price',
+    'property_id': 'p.id',
+    'property_name': 'p.title',
+    'location': 'p.location',
+    'property_type': 'p.type',
+    'images': 'p.images'
+}
+DEFAULT_USER_BOOKING_COLUMNS = [name for name in USER_BOOKING_COLUMNS if name != 'images']
+USER_BOOKINGS_PAGE_SIZE = int(os.getenv('USER_BOOKINGS_PAGE_SIZE', '200'))
+
+# Batch booking lookups pad their id list up to one of these sizes, so only a
+# few IN (...) statements are ever prepared per connection. Longer lists are
+# split into chunks of the largest size.
+BOOKING_BATCH_SIZES = (4, 16, 64)
+for _size in BOOKING_BATCH_SIZES:
+    PREPARED_QUERIES[f'booking_contexts_{_size}'] = PREPARED_QUERIES['booking_context'].replace(
+        'WHERE b.id = %s', f"WHERE b.id IN ({', '.join(['%s'] * _size)})"
+    )
+
+
+class PooledConnection:
+    """A pooled MySQL connection plus the statements already prepared on it"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = {}
+        self.last_used = time.monotonic()
+
+    def execute_prepared(self, name: str, params: tuple):
+        """
+        Execute one of PREPARED_QUERIES, preparing it on first use
+
+        The prepared cursor is kept on the connection, so later checkouts skip
+        the prepare round trip entirely.
+        """
+        cursor = self.statements.get(name)
+        if cursor is None:
+            cursor = self.connection.cursor(prepared=True, dictionary=True)
+            self.statements[name] = cursor
+        cursor.execute(PREPARED_QUERIES[name], params)
+        return cursor
+
+    def healthy(self) -> bool:
+        """Ping the server if the connection has been idle for a while"""
+        if time.monotonic() - self.last_used < DB_POOL_HEALTHCHECK_AFTER:
+            return True
+        try:
+            self.connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def close(self):
+        for cursor in self.statements.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+        self.statements = {}
+        try:
+            self.connection.close()
+        except Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Process-wide MySQL connection pool
+
+    Connections are opened lazily up to `size`. Checkout blocks for at most
+    `timeout` seconds when every connection is in use and raises PoolError
+    after that. Waiters are woken both when a connection is checked in and
+    when one is discarded, since a freed slot lets them open a new one.
+    """
+
+    def __init__(self, config: dict, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        # Idle connections, most recently used last
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        # Signalled whenever a connection is checked in or a slot frees up
+        self._available = threading.Condition(self._lock)
+        self._open = 0
+        self._stats = {
+            'checkouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'exhausted': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0
+        }
+
+    def _release_slot(self):
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def _connect(self) -> PooledConnection:
+        try:
+            connection = mysql.connector.connect(**self.config)
+        except Error:
+            self._release_slot()
+            raise
+        with self._lock:
+            self._stats['connections_created'] += 1
+        return PooledConnection(connection)
+
+    def _acquire(self, deadline: float) -> Optional[PooledConnection]:
+        """An idle connection, or None after reserving a slot for a new one"""
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.size:
+                    self._open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['exhausted'] += 1
+                    raise PoolError(
+                        f"No MySQL connection available after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                self._available.wait(remaining)
+
+    def checkout(self) -> PooledConnection:
+        started = time.monotonic()
+        while True:
+            pooled = self._acquire(started + self.timeout)
+            if pooled is None:
+                pooled = self._connect()
+                break
+            if pooled.healthy():
+                break
+            # Stale connection: drop it and try again with a fresh one
+            self.discard(pooled)
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+        return pooled
+
+    def checkin(self, pooled: PooledConnection):
+        pooled.last_used = time.monotonic()
+        with self._available:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    def discard(self, pooled: PooledConnection):
+        pooled.close()
+        with self._lock:
+            self._stats['connections_discarded'] += 1
+        self._release_slot()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection, returning it to the pool afterwards"""
+        pooled = self.checkout()
+        try:
+            yield pooled
+        except Error:
+            # The connection may be in an unknown state after a driver error
+            self.discard(pooled)
+            raise
+        except BaseException:
+            self.checkin(pooled)
+            raise
+        else:
+            self.checkin(pooled)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['open'] = self._open
+            stats['idle'] = len(self._idle)
+        stats['in_use'] = stats['open'] - stats['idle']
+        stats['wait_time_avg'] = (
+            stats['wait_time_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        )
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG)
+                print(f"MySQL connection pool ready (size {_pool.size})")
+    return _pool
+
 
 def get_db_connection():
-    """Create and return a database connection"""
+    """
+    Create and return a standalone (unpooled) database connection
+
+    Kept for scripts; the service goes through get_pool(). Pair with close_connection().
+    """
     try:
         connection = mysql.connector.connect(**DB_CONFIG)
         if connection.is_connected():
@@ -27,125 +296,208 @@ def get_db_connection():
 
 
 def close_connection(connection):
-    """Close database connection"""
+    """Close a connection from get_db_connection()"""
     if connection and connection.is_connected():
         connection.close()
         print("MySQL connection closed")
 
 
+def get_pool_stats() -> dict:
+    """Pool statistics: checkouts, wait time, exhaustion count, open/idle connections"""
+    return get_pool().stats()
+
+
+def fetch_booking_context(booking_id: int):
+    """
+    Fetch the booking and property fields the concierge needs
+    Returns: dict or None
+    """
+    with get_pool().connection() as pooled:
+        cursor = pooled.execute_prepared('booking_context', (booking_id,))
+        rows = cursor.fetchall()
+        return rows[0] if rows else None
+
+
+def booking_batch_chunks(booking_ids):
+    """
+    Split ids into (prepared query name, params) pairs for the batch lookup
+
+    Each chunk is padded to a BOOKING_BATCH_SIZES size by repeating its last
+    id, which IN (...) ignores.
+    """
+    ids = list(dict.fromkeys(booking_ids))
+    largest = BOOKING_BATCH_SIZES[-1]
+    for start in range(0, len(ids), largest):
+        chunk = ids[start:start + largest]
+        size = next(size for size in BOOKING_BATCH_SIZES if size >= len(chunk))
+        yield f'booking_contexts_{size}', tuple(chunk + [chunk[-1]] * (size - len(chunk)))
+
+
+def fetch_booking_contexts(booking_ids):
+    """
+    Fetch booking contexts for many bookings, one WHERE b.id IN (...) query per chunk
+    Returns: list of dicts, same fields as fetch_booking_context; unknown ids are left out
+    """
+    rows = []
+    if not booking_ids:
+        return rows
+    with get_pool().connection() as pooled:
+        for name, params in booking_batch_chunks(booking_ids):
+            cursor = pooled.execute_prepared(name, params)
+            rows.extend(cursor.fetchall())
+    return rows
+
+
 def get_booking_with_property(booking_id: int):
     """
     Fetch booking details with property information
     Returns: dict with booking and property data or None
     """
-    connection = get_db_connection()
-    if not connection:
-        return None
-
     try:
-        cursor = connection.cursor(dictionary=True)
-        query = """
-                SELECT b.id    as booking_id, \
-                       b.check_in, \
-                       b.check_out, \
-                       b.guests, \
-                       b.status, \
-                       b.user_id, \
-                       p.id    as property_id, \
-                       p.title as property_name, \
-                       p.type  as property_type, \
-                       p.location, \
-                       p.description, \
-                       p.price_per_night, \
-                       p.bedrooms, \
-                       p.bathrooms, \
-                       p.amenities, \
-                       u.name  as traveler_name, \
-                       u.email as traveler_email
-                FROM bookings b
-                         JOIN properties p ON b.property_id = p.id
-                         JOIN users u ON b.user_id = u.id
-                WHERE b.id = %s \
-                """
-        cursor.execute(query, (booking_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        with get_pool().connection() as pooled:
+            cursor = pooled.execute_prepared('booking_with_property', (booking_id,))
+            rows = cursor.fetchall()
+            return rows[0] if rows else None
     except Error as e:
         print(f"Error fetching booking: {e}")
         return None
-    finally:
-        close_connection(connection)
 
 
-def get_user_bookings(user_id: int, status: str = None):
+def user_bookings_page_query(columns=None, status: bool = False, after: bool = False) -> str:
     """
-    Fetch all bookings for a user
+    SQL for one keyset page of a user's bookings, newest check-in first
+
+    Params, in order: user_id, [status], [check_in, check_in, booking_id], limit.
+    Pages are ordered by (check_in, id) so each one starts right after the
+    previous page's last row; an index on bookings (user_id, check_in, id)
+    serves the query without a sort.
+
+    Args:
+        columns: Names from USER_BOOKING_COLUMNS; defaults to everything but images
+        status: Filter on b.status
+        after: Continue after a (check_in, booking_id) position
+    """
+    names = list(columns or DEFAULT_USER_BOOKING_COLUMNS)
+    unknown = [name for name in names if name not in USER_BOOKING_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown booking columns: {', '.join(unknown)}")
+    # The keyset needs both sort columns in every row
+    for required in ('booking_id', 'check_in'):
+        if required not in names:
+            names.append(required)
+
+    select = ", ".join(f"{USER_BOOKING_COLUMNS[name]} AS {name}" for name in names)
+    conditions = ["b.user_id = %s"]
+    if status:
+        conditions.append("b.status = %s")
+    if after:
+        conditions.append("(b.check_in < %s OR (b.check_in = %s AND b.id < %s))")
+    return (
+        f"SELECT {select} FROM bookings b JOIN properties p ON b.property_id = p.id "
+        f"WHERE {' AND '.join(conditions)} ORDER BY b.check_in DESC, b.id DESC LIMIT %s"
+    )
+
+
+def user_bookings_page_params(user_id: int, status: Optional[str], after: Optional[Tuple[Any, int]],
+                              limit: int) -> tuple:
+    """Parameters for user_bookings_page_query, in the same order"""
+    params = [user_id]
+    if status:
+        params.append(status)
+    if after:
+        check_in, booking_id = after
+        params.extend([check_in, check_in, booking_id])
+    params.append(limit)
+    return tuple(params)
+
+
+def encode_bookings_cursor(row: Dict[str, Any]) -> str:
+    """Opaque position after row, for the next page"""
+    check_in = row['check_in']
+    check_in = check_in.isoformat() if hasattr(check_in, 'isoformat') else str(check_in)
+    return f"{check_in[:10]}_{row['booking_id']}"
+
+
+def decode_bookings_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Inverse of encode_bookings_cursor
+    Raises: ValueError for a malformed cursor
+    """
+    check_in, _, booking_id = cursor.partition('_')
+    datetime.strptime(check_in, '%Y-%m-%d')
+    return check_in, int(booking_id)
+
+
+def fetch_user_bookings_page(user_id: int, status: str = None, columns=None,
+                             after: Optional[Tuple[Any, int]] = None,
+                             limit: int = USER_BOOKINGS_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Fetch one keyset page of a user's bookings, newest check-in first
+
+    Rows are read from an unbuffered cursor, so the driver holds no more than
+    the page. The connection goes back to the pool between pages, so walking
+    a long history does not pin it.
+
     Args:
         user_id: User ID
         status: Optional status filter ('Pending', 'Accepted', 'Cancelled')
+        columns: Names from USER_BOOKING_COLUMNS; images only when asked for
+        after: (check_in, booking_id) of the previous page's last row
+        limit: Page size
     Returns: list of booking dictionaries
     """
-    connection = get_db_connection()
-    if not connection:
-        return []
+    query = user_bookings_page_query(columns, bool(status), after is not None)
+    params = user_bookings_page_params(user_id, status, after, limit)
+    with get_pool().connection() as pooled:
+        # Not prepared: the column list varies per caller
+        cursor = pooled.connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
 
+
+def iter_user_bookings(user_id: int, status: str = None, columns=None,
+                       page_size: int = USER_BOOKINGS_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Every booking of a user, newest check-in first, one keyset page at a time
+
+    Memory stays at one page however many bookings the user has.
+    """
+    after = None
+    while True:
+        rows = fetch_user_bookings_page(user_id, status, columns, after, page_size)
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]['check_in'], rows[-1]['booking_id'])
+
+
+def get_user_bookings(user_id: int, status: str = None, columns=None):
+    """
+    Fetch all bookings for a user
+    Args:
+        user_id: User ID
+        status: Optional status filter ('Pending', 'Accepted', 'Cancelled')
+        columns: Names from USER_BOOKING_COLUMNS; all of them, images included, by default
+    Returns: list of booking dictionaries
+
+    Prefer iter_user_bookings or fetch_user_bookings_page for users with
+    long histories.
+    """
     try:
-        cursor = connection.cursor(dictionary=True)
-        if status:
-            query = """
-                    SELECT b.id    as booking_id, \
-                           b.check_in, \
-                           b.check_out, \
-                           b.guests, \
-                           b.status, \
-                           b.total_price, \
-                           p.title as property_name, \
-                           p.location, \
-                           p.type  as property_type, \
-                           p.images
-                    FROM bookings b
-                             JOIN properties p ON b.property_id = p.id
-                    WHERE b.user_id = %s \
-                      AND b.status = %s
-                    ORDER BY b.check_in DESC \
-                    """
-            cursor.execute(query, (user_id, status))
-        else:
-            query = """
-                    SELECT b.id    as booking_id, \
-                           b.check_in, \
-                           b.check_out, \
-                           b.guests, \
-                           b.status, \
-                           b.total_price, \
-                           p.title as property_name, \
-                           p.location, \
-                           p.type  as property_type, \
-                           p.images
-                    FROM bookings b
-                             JOIN properties p ON b.property_id = p.id
-                    WHERE b.user_id = %s
-                    ORDER BY b.check_in DESC \
-                    """
-            cursor.execute(query, (user_id,))
-
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        return list(iter_user_bookings(user_id, status, columns or list(USER_BOOKING_COLUMNS)))
     except Error as e:
         print(f"Error fetching user bookings: {e}")
         return []
-    finally:
-        close_connection(connection)
 
 
 def test_connection():
     """Test database connection"""
-    connection = get_db_connection()
-    if connection:
-        try:
-            cursor = connection.cursor()
+    try:
+        with get_pool().connection() as pooled:
+            cursor = pooled.connection.cursor()
             cursor.execute("SELECT DATABASE();")
             db_name = cursor.fetchone()
             print(f"Connected to database: {db_name[0]}")
@@ -160,13 +512,11 @@ def test_connection():
             print(f"Total properties: {property_count}")
 
             cursor.close()
-            return True
-        except Error as e:
-            print(f"Error testing connection: {e}")
-            return False
-        finally:
-            close_connection(connection)
-    return False
+        print(f"Pool stats: {get_pool_stats()}")
+        return True
+    except Error as e:
+        print(f"Error testing connection: {e}")
+        return False
 
 
 if __name__ == "__main__":
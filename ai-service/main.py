@@ -1,9 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+import asyncio
+import json
 import sys
 import os
+import time
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -12,12 +17,40 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.schemas import (
     AgentRequest,
     AgentResponse,
+    BatchAgentRequest,
     BookingContext,
     Preferences,
-    PartyType
+    JobStatus
 )
 from services.agent_service import AIAgentService
-from database.db_config import get_db_connection
+from services.job_service import JobManager, ItineraryJob, JobQueueFullError
+from services.booking_events import BookingEventConsumer, create_event_source
+from services.booking_cache import BookingCache
+from services.pregeneration_service import PregenerationService
+from services.preferences import normalize_preferences
+from services.preference_extraction import extract_preferences
+from services.batch_service import BatchPlanner
+from services.metrics import (
+    REGISTRY,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    DB_FETCH_SECONDS,
+    InstrumentedThreadPoolExecutor,
+    MetricsMiddleware,
+    monitor_event_loop_lag,
+    parse_summary
+)
+from services.tracing import span, start_recording
+from services.cassette import get_cassette
+from database.db_config import (
+    USER_BOOKING_COLUMNS,
+    USER_BOOKINGS_PAGE_SIZE,
+    decode_bookings_cursor,
+    encode_bookings_cursor,
+    fetch_booking_context,
+    fetch_booking_contexts,
+    fetch_user_bookings_page,
+    get_pool_stats
+)
 
 app = FastAPI(
     title="AI Travel Concierge API",
@@ -38,23 +71,113 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Initialize AI Agent
 agent_service = None
+job_manager = None
+booking_events = None
+booking_cache = None
+pregeneration = None
+batch_planner = None
+loop_lag_monitor = None
+
+# Load the Ollama model at startup; /ready stays 503 until it is resident
+MODEL_WARMUP_ENABLED = os.getenv('MODEL_WARMUP_ENABLED', 'true').lower() == 'true'
+
+# Largest batch /api/concierge/batch accepts
+BATCH_MAX_BOOKINGS = int(os.getenv('BATCH_MAX_BOOKINGS', '100'))
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize AI Agent on startup"""
-    global agent_service
+    global agent_service, job_manager, booking_events, booking_cache, pregeneration, batch_planner, loop_lag_monitor
     try:
+        # Blocking work (DB, SQLite caches) goes through asyncio.to_thread; size
+        # and instrument that pool so saturation shows up on /metrics
+        asyncio.get_running_loop().set_default_executor(
+            InstrumentedThreadPoolExecutor(
+                max_workers=int(os.getenv('THREAD_POOL_WORKERS', str(min(32, (os.cpu_count() or 1) + 4)))),
+                thread_name_prefix='ai-service'
+            )
+        )
+        loop_lag_monitor = asyncio.create_task(
+            monitor_event_loop_lag(float(os.getenv('LOOP_LAG_INTERVAL', '0.5')))
+        )
+
         agent_service = AIAgentService()
         print("✅ AI Agent Service initialized successfully")
+        if MODEL_WARMUP_ENABLED:
+            agent_service.warmer.start()
+
+        job_manager = JobManager(
+            workers=int(os.getenv('JOB_WORKERS', '2')),
+            result_ttl=float(os.getenv('JOB_RESULT_TTL', '3600')),
+            max_queue=int(os.getenv('JOB_QUEUE_SIZE', '100'))
+        )
+        job_manager.start()
+
+        # Batch endpoint: bookings in flight at once, and how far apart
+        # check-ins may be to share one context gather
+        batch_planner = BatchPlanner(
+            agent_service,
+            concurrency=int(os.getenv('BATCH_CONCURRENCY', '4')),
+            window_days=int(os.getenv('BATCH_DATE_WINDOW_DAYS', '7'))
+        )
+
+        # Optional booking event feed (Kafka or a local stand-in)
+        event_source = create_event_source()
+        if event_source is not None:
+            booking_events = BookingEventConsumer(event_source)
+
+            # Booking rows are cached only while events can invalidate them
+            # (and never under a cassette, which must see every lookup);
+            # subscribed first so pregeneration rebuilds from fresh rows
+            if os.getenv('BOOKING_CACHE_ENABLED', 'true').lower() == 'true' and get_cassette() is None:
+                booking_cache = BookingCache(
+                    ttl=float(os.getenv('BOOKING_CACHE_TTL', '600')),
+                    max_entries=int(os.getenv('BOOKING_CACHE_MAX_ENTRIES', '10000'))
+                )
+                booking_events.subscribe(booking_cache.handle_event)
+
+            if os.getenv('PREGENERATION_ENABLED', 'false').lower() == 'true':
+                pregeneration = PregenerationService(
+                    agent_service,
+                    build_agent_inputs,
+                    store_path=os.getenv(
+                        'PREGENERATION_STORE_PATH',
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'pregenerated.sqlite3')
+                    ),
+                    ttl=float(os.getenv('PREGENERATION_TTL', str(7 * 24 * 3600))),
+                    workers=int(os.getenv('PREGENERATION_WORKERS', '1'))
+                )
+                booking_events.subscribe(pregeneration.handle_event)
+                pregeneration.start()
+
+            booking_events.start()
     except Exception as e:
         print(f"❌ Failed to initialize AI Agent: {e}")
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and release the agent's HTTP clients"""
+    if loop_lag_monitor is not None:
+        loop_lag_monitor.cancel()
+    if booking_events is not None:
+        await booking_events.stop()
+    if pregeneration is not None:
+        await pregeneration.stop()
+    if job_manager is not None:
+        await job_manager.stop()
+    if agent_service is not None:
+        await agent_service.close()
+    if get_cassette() is not None:
+        get_cassette().close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -63,7 +186,13 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics",
             "concierge": "/api/concierge (POST)",
+            "concierge_stream": "/api/concierge/stream (POST, NDJSON)",
+            "concierge_jobs": "/api/concierge/jobs (POST), /api/concierge/jobs/{job_id} (GET)",
+            "concierge_batch": "/api/concierge/batch (POST, NDJSON)",
+            "user_bookings": "/api/users/{user_id}/bookings (GET, keyset paged), /api/users/{user_id}/bookings/stream (GET, NDJSON)",
             "docs": "/docs"
         }
     }
@@ -75,53 +204,200 @@ async def health_check():
     return {
         "status": "healthy",
         "agent_initialized": agent_service is not None,
+        "db_pool": get_pool_stats(),
+        "tavily_cache": agent_service.tavily.cache.stats() if agent_service and agent_service.tavily.cache else None,
+        "llm_cache": agent_service.llm_cache.stats() if agent_service and agent_service.llm_cache else None,
+        "jobs": job_manager.stats() if job_manager else None,
+        "coalescing": agent_service.itinerary_flights.stats() if agent_service else None,
+        "destination_context": agent_service.destination_context.stats() if agent_service and agent_service.destination_context else None,
+        "booking_events": booking_events.stats() if booking_events else None,
+        "booking_cache": booking_cache.stats() if booking_cache else None,
+        "pregeneration": pregeneration.stats() if pregeneration else None,
+        "batch": batch_planner.stats() if batch_planner else None,
+        "cassette": get_cassette().stats() if get_cassette() else None,
+        "llm_parse": parse_summary(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness for load balancers: 200 once the Ollama model is resident, 503 until then
+
+    Reports the model's load time and keep-alive state.
+    """
+    if agent_service is None:
+        return JSONResponse({"ready": False, "reason": "AI Agent service not initialized"}, status_code=503)
+    if not MODEL_WARMUP_ENABLED:
+        return {"ready": True, "warmup": "disabled"}
+
+    status = agent_service.warmer.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 def fetch_booking_from_db(booking_id: int):
     """Fetch booking details from MySQL database"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor(dictionary=True)
-
-        # Fetch booking with property details
-        query = """
-                SELECT b.id, \
-                       b.property_id, \
-                       b.user_id, \
-                       b.check_in, \
-                       b.check_out, \
-                       b.guests, \
-                       b.total_price, \
-                       b.status, \
-                       p.title as property_title, \
-                       p.location, \
-                       p.type, \
-                       p.amenities
-                FROM bookings b
-                         INNER JOIN properties p ON b.property_id = p.id
-                WHERE b.id = %s \
-                """
-
-        cursor.execute(query, (booking_id,))
-        booking = cursor.fetchone()
-
-        cursor.close()
-        connection.close()
-
-        if not booking:
-            return None
-
-        return booking
-
+        return fetch_booking_context(booking_id)
     except Exception as e:
         print(f"❌ Error fetching booking from database: {e}")
         raise
 
 
+async def load_booking(booking_id: int) -> Tuple[Optional[dict], bool]:
+    """
+    Fetch the booking off the event loop, through the record/replay cassette when one is active
+
+    Returns (row, cached); cached rows come from booking_cache without touching MySQL.
+    """
+    # mysql.connector is blocking, so run it off the event loop
+    fetch = lambda: asyncio.to_thread(fetch_booking_from_db, booking_id)
+    cassette = get_cassette()
+    if cassette is not None:
+        fetch_live = fetch
+        fetch = lambda: cassette.call('booking', 'booking', {'booking_id': booking_id}, fetch_live)
+    if booking_cache is None:
+        return await fetch(), False
+    return await booking_cache.get(booking_id, fetch)
+
+
+def fetch_bookings_from_db(booking_ids: List[int]):
+    """Fetch many bookings from MySQL in one batched query"""
+    try:
+        return fetch_booking_contexts(booking_ids)
+    except Exception as e:
+        print(f"❌ Error fetching bookings from database: {e}")
+        raise
+
+
+async def load_bookings(booking_ids: List[int]) -> Dict[int, dict]:
+    """Fetch many bookings off the event loop; returns rows keyed by booking id"""
+    async def fetch(ids: List[int]) -> List[dict]:
+        fetch_live = lambda: asyncio.to_thread(fetch_bookings_from_db, ids)
+        cassette = get_cassette()
+        if cassette is None:
+            return await fetch_live()
+        return await cassette.call('booking', 'bookings', {'booking_ids': ids}, fetch_live)
+
+    started = time.perf_counter()
+    try:
+        with span('db', bookings=len(booking_ids)) as db_span:
+            if booking_cache is None:
+                rows = {row['id']: row for row in await fetch(booking_ids)}
+            else:
+                rows, cached = await booking_cache.get_many(booking_ids, fetch)
+                db_span.set(cached=cached)
+    except Exception:
+        DB_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="error")
+        raise
+    DB_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="found" if rows else "not_found")
+    return rows
+
+
+def record_request(endpoint: str, request: AgentRequest):
+    """Log the incoming request on the cassette so the traffic can be replayed"""
+    cassette = get_cassette()
+    if cassette is not None:
+        cassette.record_request(endpoint, request.model_dump())
+
+
+async def build_agent_inputs(request: AgentRequest) -> Tuple[BookingContext, Preferences]:
+    """
+    Load the booking and merge structured and free-text preferences
+
+    Raises HTTPException(404) when the booking does not exist.
+    """
+    # Fetch booking details from database
+    print(f"📋 Fetching booking {request.booking_id} from database...")
+    started = time.perf_counter()
+    try:
+        with span('db', booking_id=request.booking_id) as db_span:
+            booking_data, cached = await load_booking(request.booking_id)
+            db_span.set(cached=cached)
+    except Exception:
+        DB_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="error")
+        raise
+    DB_FETCH_SECONDS.observe(
+        time.perf_counter() - started,
+        outcome="cached" if cached else ("found" if booking_data else "not_found")
+    )
+
+    if not booking_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Booking {request.booking_id} not found"
+        )
+
+    return agent_inputs_from_booking(request, booking_data)
+
+
+def agent_inputs_from_booking(request: AgentRequest, booking_data: dict) -> Tuple[BookingContext, Preferences]:
+    """Turn a booking row and the request's preferences into the agent's inputs"""
+    # Parse booking data
+    check_in = booking_data['check_in']
+    check_out = booking_data['check_out']
+
+    # Convert to string format if they're date objects
+    if hasattr(check_in, 'strftime'):
+        check_in_str = check_in.strftime('%Y-%m-%d')
+    else:
+        check_in_str = str(check_in)
+
+    if hasattr(check_out, 'strftime'):
+        check_out_str = check_out.strftime('%Y-%m-%d')
+    else:
+        check_out_str = str(check_out)
+
+    # Everything the free text says about the party and preferences, in one pass
+    extracted = extract_preferences(request.free_text)
+
+    # Default: all guests are adults unless the free text mentions kids
+    party_type = extracted.party_type(booking_data['guests'])
+
+    # Create booking context with correct field names
+    booking_context = BookingContext(
+        booking_id=booking_data['id'],
+        location=booking_data['location'],
+        check_in=check_in_str,
+        check_out=check_out_str,
+        party_type=party_type
+    )
+
+    # Use provided preferences or create defaults
+    if request.preferences:
+        preferences = request.preferences
+    else:
+        preferences = Preferences(
+            budget='medium',
+            interests=['culture', 'food', 'nature'],
+            dietary_restrictions=[],
+            mobility_needs='none'
+        )
+
+    # Add dietary restrictions, interests and mobility needs found in the free text
+    preferences = extracted.apply_to(preferences)
+
+    # Sorted, deduplicated preferences so equivalent requests hit the LLM cache
+    preferences = normalize_preferences(preferences)
+
+    print(f"🎯 Generating itinerary for {booking_context.location}")
+    print(f"   Dates: {check_in_str} to {check_out_str}")
+    print(f"   Party: {party_type.adults} adults, {party_type.children} children")
+    print(f"   Interests: {preferences.interests}")
+    print(f"   Dietary: {preferences.dietary_restrictions}")
+
+    return booking_context, preferences
+
+
 @app.post("/api/concierge", response_model=AgentResponse)
-async def generate_itinerary(request: AgentRequest):
+async def generate_itinerary(request: AgentRequest, response: Response, debug: bool = False):
     """
     Generate personalized travel itinerary
 
@@ -130,150 +406,55 @@ async def generate_itinerary(request: AgentRequest):
     - user_id: ID of the user
     - free_text: Optional free-text preferences
     - preferences: Optional structured preferences (budget, interests, etc.)
+
+    Stage timings are returned in the Server-Timing header; pass ?debug=true
+    to also get them as a `timings` list in the body.
     """
 
     if agent_service is None:
         raise HTTPException(status_code=503, detail="AI Agent service not initialized")
 
-    try:
-        # Fetch booking details from database
-        print(f"📋 Fetching booking {request.booking_id} from database...")
-        booking_data = fetch_booking_from_db(request.booking_id)
-
-        if not booking_data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Booking {request.booking_id} not found"
-            )
-
-        # Parse booking data
-        check_in = booking_data['check_in']
-        check_out = booking_data['check_out']
-
-        # Convert to string format if they're date objects
-        if hasattr(check_in, 'strftime'):
-            check_in_str = check_in.strftime('%Y-%m-%d')
-        else:
-            check_in_str = str(check_in)
-
-        if hasattr(check_out, 'strftime'):
-            check_out_str = check_out.strftime('%Y-%m-%d')
-        else:
-            check_out_str = str(check_out)
-
-        # Determine party composition
-        total_guests = booking_data['guests']
-        # Default: assume all adults unless specified in free_text
-        adults = total_guests
-        children = 0
-        infants = 0
-
-        # Try to parse children from free_text
-        if request.free_text:
-            free_text_lower = request.free_text.lower()
-            if 'kid' in free_text_lower or 'child' in free_text_lower:
-                # Simple heuristic: if kids mentioned, assume at least 1 child
-                children = 1
-                adults = max(1, total_guests - children)
-
-        # Create PartyType
-        party_type = PartyType(
-            adults=adults,
-            children=children,
-            infants=infants
-        )
-
-        # Create booking context with correct field names
-        booking_context = BookingContext(
-            booking_id=booking_data['id'],
-            location=booking_data['location'],
-            check_in=check_in_str,
-            check_out=check_out_str,
-            party_type=party_type
-        )
+    recorder = start_recording()
+    record_request('/api/concierge', request)
 
-        # Use provided preferences or create defaults
-        if request.preferences:
-            preferences = request.preferences
-        else:
-            preferences = Preferences(
-                budget='medium',
-                interests=['culture', 'food', 'nature'],
-                dietary_restrictions=[],
-                mobility_needs='none'
-            )
+    def with_timings(itinerary: AgentResponse) -> AgentResponse:
+        if recorder is None:
+            return itinerary
+        response.headers['Server-Timing'] = recorder.server_timing()
+        if debug:
+            # Coalesced and pre-generated responses are shared, so never mutate them
+            return itinerary.model_copy(update={'timings': recorder.to_list()})
+        return itinerary
 
-        # Extract preferences from free_text if provided
-        if request.free_text:
-            free_text_lower = request.free_text.lower()
-
-            # Detect dietary restrictions
-            dietary_keywords = {
-                'vegan': 'vegan',
-                'vegetarian': 'vegetarian',
-                'gluten-free': 'gluten-free',
-                'gluten free': 'gluten-free',
-                'halal': 'halal',
-                'kosher': 'kosher',
-                'dairy-free': 'dairy-free',
-                'dairy free': 'dairy-free'
-            }
-            for keyword, restriction in dietary_keywords.items():
-                if keyword in free_text_lower and restriction not in preferences.dietary_restrictions:
-                    preferences.dietary_restrictions.append(restriction)
-
-            # Detect interests
-            interest_keywords = {
-                'culture': ['culture', 'museum', 'art', 'history'],
-                'food': ['food', 'restaurant', 'dining', 'cuisine'],
-                'nature': ['nature', 'outdoor', 'hiking', 'park', 'beach'],
-                'adventure': ['adventure', 'thrill', 'sport'],
-                'relaxation': ['relax', 'spa', 'calm', 'peaceful'],
-                'nightlife': ['nightlife', 'bar', 'club', 'party'],
-                'shopping': ['shopping', 'mall', 'boutique']
-            }
-            detected_interests = []
-            for interest, keywords in interest_keywords.items():
-                if any(kw in free_text_lower for kw in keywords):
-                    detected_interests.append(interest)
-
-            # Merge detected interests with existing ones
-            if detected_interests:
-                preferences.interests = list(set(preferences.interests + detected_interests))
-
-            # Detect mobility needs
-            if 'wheelchair' in free_text_lower or 'accessible' in free_text_lower:
-                preferences.mobility_needs = 'wheelchair'
-            elif 'limited mobility' in free_text_lower or 'no long walk' in free_text_lower:
-                preferences.mobility_needs = 'limited'
-
-        print(f"🎯 Generating itinerary for {booking_context.location}")
-        print(f"   Dates: {check_in_str} to {check_out_str}")
-        print(f"   Party: {adults} adults, {children} children")
-        print(f"   Interests: {preferences.interests}")
-        print(f"   Dietary: {preferences.dietary_restrictions}")
-
-        # Create properly structured AgentRequest for the service
-        agent_request = AgentRequest(
-            booking_id=request.booking_id,
-            user_id=request.user_id,
-            free_text=request.free_text,
-            preferences=preferences
-        )
+    try:
+        booking_context, preferences = await build_agent_inputs(request)
+
+        # Serve a pre-generated itinerary when it was planned for exactly this request
+        if pregeneration is not None:
+            with span('pregenerated_lookup') as lookup_span:
+                itinerary = await pregeneration.lookup(
+                    booking_context, preferences, request.free_text, request.planning_mode
+                )
+                lookup_span.set(hit=itinerary is not None)
+            if itinerary is not None:
+                print(f"⚡ Serving pre-generated itinerary for booking {request.booking_id}")
+                return with_timings(itinerary)
 
         # Generate itinerary using AI agent
         print("🤖 Calling AI Agent Service...")
-        itinerary = agent_service.generate_itinerary(
-            booking_context=booking_context,
-            preferences=preferences,
-            free_text=request.free_text
-        )
+        with span('agent'):
+            itinerary = await agent_service.generate_itinerary(
+                booking_context=booking_context,
+                preferences=preferences,
+                free_text=request.free_text,
+                planning_mode=request.planning_mode
+            )
 
         print(f"✅ Itinerary generated successfully!")
         print(f"   Days: {len(itinerary.itinerary)}")
         print(f"   Packing items: {len(itinerary.packing_checklist)}")
 
-        return itinerary
+        return with_timings(itinerary)
 
     except HTTPException:
         raise
@@ -287,6 +468,288 @@ async def generate_itinerary(request: AgentRequest):
         )
 
 
+@app.post("/api/concierge/stream")
+async def stream_itinerary(request: AgentRequest):
+    """
+    Generate an itinerary as a stream of newline-delimited JSON events
+
+    Each line is {"event": ..., "data": ...}: "context" first, then one "day"
+    per DayPlan as it is produced (in completion order, see day_number), then
+    "packing_checklist", "weather_summary", "local_tips",
+    "total_estimated_cost" and a final "complete" with the full AgentResponse.
+    Failures after the stream has started are reported as an "error" event.
+    """
+
+    if agent_service is None:
+        raise HTTPException(status_code=503, detail="AI Agent service not initialized")
+
+    record_request('/api/concierge/stream', request)
+    booking_context, preferences = await build_agent_inputs(request)
+
+    async def event_lines():
+        try:
+            async for event in agent_service.stream_itinerary(
+                booking_context=booking_context,
+                preferences=preferences,
+                free_text=request.free_text,
+                planning_mode=request.planning_mode
+            ):
+                yield json.dumps(jsonable_encoder(event)) + "\n"
+        except Exception as e:
+            print(f"❌ Error streaming itinerary: {e}")
+            yield json.dumps({"event": "error", "data": {"detail": str(e)}}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/api/concierge/batch")
+async def batch_itineraries(request: BatchAgentRequest):
+    """
+    Generate itineraries for many bookings as a stream of newline-delimited JSON events
+
+    All bookings are loaded with one query. Bookings at the same destination
+    whose check-ins fall in the same date window share one context gather,
+    and at most BATCH_CONCURRENCY pipelines run at once.
+
+    Lines are {"event": ..., "data": ...}: "batch" (requested, found and
+    missing ids), "groups" (bookings sharing context), then one "result"
+    (booking_id, source, elapsed_s, itinerary) or "error" (booking_id,
+    detail) per booking in completion order, and a final "complete".
+    """
+
+    if agent_service is None or batch_planner is None:
+        raise HTTPException(status_code=503, detail="AI Agent service not initialized")
+
+    booking_ids = list(dict.fromkeys(request.booking_ids))
+    if len(booking_ids) > BATCH_MAX_BOOKINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_BOOKINGS} bookings per batch, got {len(booking_ids)}"
+        )
+
+    print(f"📋 Fetching {len(booking_ids)} bookings from database...")
+    try:
+        rows = await load_bookings(booking_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load bookings: {str(e)}")
+
+    missing = [booking_id for booking_id in booking_ids if booking_id not in rows]
+    items = [
+        agent_inputs_from_booking(
+            AgentRequest(
+                booking_id=booking_id,
+                user_id=request.user_id,
+                free_text=request.free_text,
+                preferences=request.preferences.model_copy(deep=True) if request.preferences else None,
+                planning_mode=request.planning_mode
+            ),
+            rows[booking_id]
+        )
+        for booking_id in booking_ids if booking_id in rows
+    ]
+
+    async def event_lines():
+        started = time.perf_counter()
+        succeeded = 0
+        failed = len(missing)
+        yield json.dumps({"event": "batch", "data": {
+            "requested": len(booking_ids), "found": len(items), "missing": missing
+        }}) + "\n"
+        for booking_id in missing:
+            yield json.dumps({"event": "error", "data": {
+                "booking_id": booking_id, "detail": f"Booking {booking_id} not found"
+            }}) + "\n"
+
+        try:
+            async for event in batch_planner.run(
+                items, request.free_text, request.planning_mode,
+                lookup=pregeneration.lookup if pregeneration is not None else None
+            ):
+                if event['event'] == 'result':
+                    succeeded += 1
+                elif event['event'] == 'error':
+                    failed += 1
+                yield json.dumps(jsonable_encoder(event)) + "\n"
+        except Exception as e:
+            print(f"❌ Error in batch itinerary run: {e}")
+            yield json.dumps({"event": "error", "data": {"detail": str(e)}}) + "\n"
+
+        print(f"✅ Batch finished: {succeeded} itineraries, {failed} failed")
+        yield json.dumps({"event": "complete", "data": {
+            "succeeded": succeeded, "failed": failed,
+            "elapsed_s": round(time.perf_counter() - started, 3)
+        }}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+
+def fetch_bookings_page_from_db(user_id: int, status: Optional[str], columns: Optional[List[str]],
+                                after: Optional[Tuple[str, int]], limit: int):
+    """Fetch one keyset page of a user's bookings from MySQL"""
+    try:
+        return fetch_user_bookings_page(user_id, status, columns, after, limit)
+    except Exception as e:
+        print(f"❌ Error fetching bookings for user {user_id}: {e}")
+        raise
+
+
+def parse_booking_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated column names from the query string; None keeps the default (no images)"""
+    if not fields:
+        return None
+    columns = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in columns if name not in USER_BOOKING_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(USER_BOOKING_COLUMNS)}"
+        )
+    return columns
+
+
+@app.get("/api/users/{user_id}/bookings")
+async def list_user_bookings(user_id: int, status: Optional[str] = None, fields: Optional[str] = None,
+                             limit: int = Query(default=50, ge=1, le=USER_BOOKINGS_PAGE_SIZE),
+                             cursor: Optional[str] = None):
+    """
+    One page of a user's bookings, newest check-in first
+
+    Pass the returned next_cursor as ?cursor= for the following page; it is
+    null on the last page. fields selects columns (comma-separated); images
+    are only included when listed.
+    """
+    columns = parse_booking_fields(fields)
+    try:
+        after = decode_bookings_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    rows = await asyncio.to_thread(fetch_bookings_page_from_db, user_id, status, columns, after, limit)
+    return {
+        "bookings": jsonable_encoder(rows),
+        "next_cursor": encode_bookings_cursor(rows[-1]) if len(rows) == limit else None
+    }
+
+
+@app.get("/api/users/{user_id}/bookings/stream")
+async def stream_user_bookings(user_id: int, status: Optional[str] = None, fields: Optional[str] = None,
+                               page_size: int = Query(default=USER_BOOKINGS_PAGE_SIZE, ge=1, le=1000)):
+    """
+    Every booking of a user as newline-delimited JSON, newest check-in first
+
+    Lines are {"event": "booking", "data": row}, then a final "complete"
+    with the count, or "error" if the database fails mid-stream. Bookings
+    are read one keyset page at a time, so memory stays at one page however
+    many bookings the user has.
+    """
+    columns = parse_booking_fields(fields)
+
+    async def booking_lines():
+        count = 0
+        after = None
+        try:
+            while True:
+                rows = await asyncio.to_thread(fetch_bookings_page_from_db, user_id, status, columns, after, page_size)
+                for row in rows:
+                    yield json.dumps({"event": "booking", "data": jsonable_encoder(row)}) + "\n"
+                count += len(rows)
+                if len(rows) < page_size:
+                    break
+                after = (rows[-1]['check_in'], rows[-1]['booking_id'])
+        except Exception as e:
+            yield json.dumps({"event": "error", "data": {"detail": str(e)}}) + "\n"
+            return
+        yield json.dumps({"event": "complete", "data": {"count": count}}) + "\n"
+
+    return StreamingResponse(booking_lines(), media_type="application/x-ndjson")
+
+
+async def run_itinerary_job(request: AgentRequest, job: ItineraryJob) -> AgentResponse:
+    """
+    Run the concierge pipeline for a queued job, recording progress on it
+
+    Like /api/concierge, a pre-generated itinerary is served as is and an
+    identical request already in flight is joined rather than run again.
+    """
+    job.update(stage="fetching_booking")
+    booking_context, preferences = await build_agent_inputs(request)
+
+    if pregeneration is not None:
+        itinerary = await pregeneration.lookup(
+            booking_context, preferences, request.free_text, request.planning_mode
+        )
+        if itinerary is not None:
+            print(f"⚡ Serving pre-generated itinerary for job {job.job_id}")
+            return itinerary
+
+    key = agent_service.request_key(booking_context, preferences, request.free_text, request.planning_mode)
+    if agent_service.itinerary_flights.in_flight(key):
+        # No per-stage progress to report: the other request owns the run
+        job.update(stage="joining_identical_request")
+        return await agent_service.generate_itinerary(
+            booking_context, preferences, request.free_text, request.planning_mode
+        )
+
+    job.update(stage="gathering_context")
+    async for event in agent_service.stream_itinerary(
+        booking_context=booking_context,
+        preferences=preferences,
+        free_text=request.free_text,
+        planning_mode=request.planning_mode
+    ):
+        name = event['event']
+        if name == 'context':
+            total_days = event['data']['num_days']
+            job.update(stage="planning_days" if total_days else "trip_extras", total_days=total_days)
+        elif name == 'day':
+            job.update(days_completed=job.days_completed + 1, current_day=event['data'].day_number)
+            if job.days_completed == job.total_days:
+                job.update(stage="trip_extras")
+        elif name == 'local_tips':
+            job.update(stage="estimating_cost")
+        elif name == 'complete':
+            return event['data']
+
+
+@app.post("/api/concierge/jobs", status_code=202)
+async def submit_itinerary_job(request: AgentRequest):
+    """
+    Queue itinerary generation and return a job id immediately
+
+    Poll /api/concierge/jobs/{job_id} for progress and the final itinerary.
+    """
+
+    if agent_service is None or job_manager is None:
+        raise HTTPException(status_code=503, detail="AI Agent service not initialized")
+
+    record_request('/api/concierge/jobs', request)
+    try:
+        job = job_manager.submit(lambda job: run_itinerary_job(request, job))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    print(f"📥 Queued itinerary job {job.job_id} for booking {request.booking_id}")
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/concierge/jobs/{job.job_id}"
+    }
+
+
+@app.get("/api/concierge/jobs/{job_id}", response_model=JobStatus)
+async def get_itinerary_job(job_id: str):
+    """Status, progress (stage and day) and, once completed, the itinerary of a job"""
+
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="AI Agent service not initialized")
+
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+
+    return job.to_dict()
+
+
 if __name__ == "__main__":
     import uvicorn
 
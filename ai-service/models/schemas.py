@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import date
 
 
@@ -58,6 +58,10 @@ class AgentRequest(BaseModel):
     user_id : int
     free_text : Optional[str]
     preferences: Optional[Preferences] = None
+    planning_mode: Optional[Literal["sequential", "parallel", "whole_trip"]] = Field(
+        default=None,
+        description="Day planning strategy; defaults to the DAY_PLANNING_MODE setting"
+    )
     # user_id: int
     # free_text: Optional[str] = 'none' # Make it truly optional with default None
 
@@ -77,6 +81,21 @@ class AgentRequest(BaseModel):
     #     }
 
 
+class BatchAgentRequest(BaseModel):
+    """Request for itineraries for many bookings at once"""
+    booking_ids: List[int] = Field(min_length=1, description="Bookings to plan; duplicates are planned once")
+    user_id: int
+    free_text: Optional[str] = None
+    preferences: Optional[Preferences] = Field(
+        default=None,
+        description="Preferences applied to every booking in the batch"
+    )
+    planning_mode: Optional[Literal["sequential", "parallel", "whole_trip"]] = Field(
+        default=None,
+        description="Day planning strategy; defaults to the DAY_PLANNING_MODE setting"
+    )
+
+
 # ============================================
 # OUTPUT MODELS (Response)
 # ============================================
@@ -197,6 +216,76 @@ class AgentResponse(BaseModel):
         default=None,
         description="Estimated total trip cost"
     )
+    timings: Optional[List[Dict[str, Any]]] = Field(
+        default=None,
+        description="Per-stage spans (start offset, duration, sizes); only set for debug requests"
+    )
+
+
+class JobStatus(BaseModel):
+    """Status of an asynchronous itinerary job"""
+    job_id: str
+    status: str = Field(description="queued, running, completed or failed")
+    stage: str = Field(
+        description="Current pipeline stage: queued, fetching_booking, gathering_context, "
+                    "planning_days, trip_extras, estimating_cost, completed"
+    )
+    total_days: Optional[int] = Field(default=None, description="Days to plan, once known")
+    days_completed: int = Field(default=0, description="Days planned so far")
+    current_day: Optional[int] = Field(default=None, description="Most recently planned day")
+    created_at: str
+    updated_at: str
+    result: Optional[AgentResponse] = Field(default=None, description="Itinerary once completed")
+    error: Optional[str] = None
+
+
+# ============================================
+# LLM OUTPUT MODELS (structured generation)
+# ============================================
+# The JSON the model is asked to produce. Their JSON schemas are sent to
+# Ollama as the output format, and responses are validated against them
+# before being turned into ActivityCard / RestaurantRec.
+
+class PlannedActivity(BaseModel):
+    """One activity as generated by the model"""
+    title: str
+    description: str
+    duration: str
+    location: str
+
+
+class PlannedRestaurant(BaseModel):
+    """One restaurant as generated by the model"""
+    name: str
+    cuisine: str
+    why: str
+    location: str
+
+
+class DayPlanOutput(BaseModel):
+    """Generated plan for a single day"""
+    morning: List[PlannedActivity]
+    afternoon: List[PlannedActivity]
+    evening: List[PlannedActivity]
+    restaurants: List[PlannedRestaurant]
+    summary: str
+
+
+class WholeTripDayOutput(DayPlanOutput):
+    """One day of a whole-trip generation"""
+    day_number: int
+
+
+class WholeTripOutput(BaseModel):
+    """Generated plan for every day of the trip"""
+    days: List[WholeTripDayOutput]
+
+
+class TripExtrasOutput(BaseModel):
+    """Generated packing checklist, weather summary and local tips"""
+    packing_checklist: List[str]
+    weather_summary: str
+    local_tips: List[str]
 
 
 # ============================================
@@ -5,8 +5,11 @@ Uses LangChain + Ollama + Tavily
 from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable
+import asyncio
+import hashlib
 import json
+import time
 import os
 from dotenv import load_dotenv
 
@@ -17,30 +20,121 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.schemas import (
     AgentRequest, AgentResponse, DayPlan, ActivityCard,
-    RestaurantRec, Preferences, BookingContext
+    RestaurantRec, Preferences, BookingContext,
+    DayPlanOutput, WholeTripOutput, TripExtrasOutput
 )
+from pydantic import ValidationError
 from services.tavily_service import TavilyService
+from services.llm_cache import LLMResponseCache
+from services.preferences import normalize_preferences
+from services.single_flight import SingleFlight
+from services.destination_context import DestinationContextStore, normalize_location, merge_results
+from services.metrics import LLM_CALL_SECONDS, LLM_PROMPT_EVAL_TOKENS, LLM_GENERATED_TOKENS, LLM_PARSE_TOTAL
+from services.tracing import span
+from services.cassette import get_cassette
+from services.model_warmer import ModelWarmer, parse_keep_alive
+from services.json_repair import repair_json
 
 load_dotenv()
 
+PLANNING_MODES = ('sequential', 'parallel', 'whole_trip')
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_PATH = os.getenv(
+    'LLM_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'llm_cache.sqlite3')
+)
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '256'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000'))
+
+# Destination-scoped context shared across bookings
+DESTINATION_CONTEXT_ENABLED = os.getenv('DESTINATION_CONTEXT_ENABLED', 'true').lower() == 'true'
+DESTINATION_CONTEXT_TTL = float(os.getenv('DESTINATION_CONTEXT_TTL', str(6 * 3600)))
+DESTINATION_CONTEXT_MAX_ENTRIES = int(os.getenv('DESTINATION_CONTEXT_MAX_ENTRIES', '2000'))
+
+# Constrained decoding for JSON steps: "json" makes Ollama emit valid JSON,
+# "schema" also sends the expected JSON schema (Ollama 0.5+), "off" leaves
+# the output free-form
+STRUCTURED_OUTPUT = os.getenv('STRUCTURED_OUTPUT', 'json').lower()
+
 class AIAgentService:
     def __init__(self):
         # Initialize Ollama LLM
         ollama_model = os.getenv('OLLAMA_MODEL', 'llama3.2:latest')
+        ollama_base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+        # Sent with every generation so the model stays loaded between requests
+        keep_alive = parse_keep_alive(os.getenv('OLLAMA_KEEP_ALIVE', '30m'))
         self.llm = Ollama(
             model=ollama_model,
             temperature=0.7,
-            base_url=os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+            base_url=ollama_base_url,
+            keep_alive=keep_alive
+        )
+
+        # Loads the model at startup and pings it while idle (started by the app)
+        self.warmer = ModelWarmer(
+            ollama_base_url,
+            ollama_model,
+            keep_alive=keep_alive,
+            ping_interval=float(os.getenv('OLLAMA_KEEP_WARM_INTERVAL', '240'))
         )
 
         # Initialize Tavily service
         self.tavily = TavilyService()
 
+        # Record/replay of Ollama generations (CASSETTE_MODE)
+        self.cassette = get_cassette()
+
+        # Identical concurrent requests share one pipeline run
+        self.itinerary_flights = SingleFlight("itinerary")
+        # Pipelines currently running; background work yields while this is non-zero
+        self.active_pipelines = 0
+
+        # Caches sit above the cassette; with one active every call must reach
+        # it, or a recording misses the calls the caches served
+        self.llm_cache = None
+        if LLM_CACHE_ENABLED and self.cassette is None:
+            self.llm_cache = LLMResponseCache(
+                LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_ENTRIES
+            )
+
+        self.destination_context = None
+        if DESTINATION_CONTEXT_ENABLED and self.cassette is None:
+            self.destination_context = DestinationContextStore(
+                DESTINATION_CONTEXT_TTL, DESTINATION_CONTEXT_MAX_ENTRIES
+            )
+
+        # Context lookups run concurrently; a slow category must not hold up the others
+        self.lookup_timeout = float(os.getenv('TAVILY_LOOKUP_TIMEOUT', '8'))
+        self.gather_deadline = float(os.getenv('CONTEXT_GATHER_DEADLINE', '12'))
+
+        # Day planning: "parallel" fans days out up to the Ollama server's
+        # OLLAMA_NUM_PARALLEL, "sequential" keeps the one-call-at-a-time loop,
+        # "whole_trip" asks for every day in a single generation
+        self.day_planning_mode = os.getenv('DAY_PLANNING_MODE', 'parallel')
+        self.whole_trip_timeout = float(os.getenv('WHOLE_TRIP_TIMEOUT', '300'))
+        self.day_plan_concurrency = max(1, int(os.getenv('OLLAMA_NUM_PARALLEL', '4')))
+        self.day_plan_timeout = float(os.getenv('DAY_PLAN_TIMEOUT', '120'))
+        self.day_plan_semaphore = asyncio.Semaphore(self.day_plan_concurrency)
+        # Plan day 1 on its own before fanning out, so the shared prompt prefix
+        # is already in Ollama's cache when the other days start
+        self.warm_prefix = os.getenv('DAY_PLAN_WARM_PREFIX', 'false').lower() == 'true'
+
         print(f"✅ AI Agent initialized with model: {ollama_model}")
 
-    def generate_itinerary(self, booking_context: BookingContext,
-                          preferences: Preferences,
-                          free_text: Optional[str] = None) -> AgentResponse:
+    async def close(self):
+        """Release HTTP clients and caches held by the service"""
+        await self.warmer.stop()
+        await self.tavily.close()
+        if self.llm_cache:
+            self.llm_cache.close()
+
+    async def generate_itinerary(self, booking_context: BookingContext,
+                                preferences: Preferences,
+                                free_text: Optional[str] = None,
+                                planning_mode: Optional[str] = None) -> AgentResponse:
         """
         Main method to generate complete travel itinerary
 
@@ -48,7 +142,70 @@ class AIAgentService:
             booking_context: BookingContext object with location, dates, party info
             preferences: Preferences object with budget, interests, dietary needs
             free_text: Optional free-text user input
+            planning_mode: Overrides DAY_PLANNING_MODE (sequential, parallel, whole_trip)
+
+        Concurrent calls for the same booking context, preferences, free text
+        and planning mode are coalesced into a single run.
         """
+        preferences = normalize_preferences(preferences)
+        key = self.request_key(booking_context, preferences, free_text, planning_mode)
+
+        async def run() -> AgentResponse:
+            async for event in self.stream_itinerary(booking_context, preferences, free_text, planning_mode):
+                if event['event'] == 'complete':
+                    return event['data']
+
+        return await self.itinerary_flights.do(key, run)
+
+    def request_key(self, booking: BookingContext, prefs: Preferences,
+                     free_text: Optional[str], planning_mode: Optional[str]) -> str:
+        """
+        Canonical identity of an itinerary request
+        """
+        payload = json.dumps({
+            'booking': booking.model_dump(),
+            'preferences': normalize_preferences(prefs).model_dump(),
+            'free_text': " ".join((free_text or "").lower().split()),
+            'planning_mode': planning_mode or self.day_planning_mode
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def stream_itinerary(self, booking_context: BookingContext,
+                               preferences: Preferences,
+                               free_text: Optional[str] = None,
+                               planning_mode: Optional[str] = None,
+                               context_data: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate the itinerary, yielding each section as soon as it is ready
+
+        Yields dicts of the form {"event": name, "data": payload}, in order:
+        "context" (summary of gathered information), one "day" per DayPlan in
+        completion order, "packing_checklist", "weather_summary",
+        "local_tips", "total_estimated_cost", and finally "complete" carrying
+        the full AgentResponse.
+
+        context_data, from gather_context, skips the Tavily lookups; batch
+        runs pass one gathered context to every booking of a group.
+        """
+        self.active_pipelines += 1
+        try:
+            async for event in self._stream_pipeline(
+                booking_context, preferences, free_text, planning_mode, context_data
+            ):
+                yield event
+        finally:
+            self.active_pipelines -= 1
+
+    async def _stream_pipeline(self, booking_context: BookingContext,
+                               preferences: Preferences,
+                               free_text: Optional[str] = None,
+                               planning_mode: Optional[str] = None,
+                               context_data: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        The pipeline stages behind stream_itinerary
+        """
+        # Canonical preferences give identical prompts for equivalent requests
+        preferences = normalize_preferences(preferences)
 
         print(f"\n{'='*60}")
         print(f"Generating itinerary for {booking_context.location}")
@@ -65,83 +222,254 @@ class AIAgentService:
         print(f"📅 Trip duration: {num_days} days")
 
         # Step 2: Gather contextual information using Tavily
-        print("\n📡 Gathering local information...")
-        context_data = self._gather_context(booking_context, preferences, num_days)
+        if context_data is None:
+            print("\n📡 Gathering local information...")
+            with span('context'):
+                context_data = await self._gather_context(booking_context, preferences, num_days)
+        else:
+            print("\n📡 Using shared local information")
+        yield {'event': 'context', 'data': self._summarize_context(booking_context, num_days, context_data)}
 
         # Step 3: Generate day-by-day itinerary
         print("\n🧠 Generating day-by-day itinerary...")
-        itinerary = self._generate_daily_plans(
-            booking_context, preferences, num_days, start_date, context_data
-        )
+        itinerary = []
+        with span('day_plans', days=num_days, mode=planning_mode or self.day_planning_mode):
+            async for day_plan in self._iter_daily_plans(
+                booking_context, preferences, num_days, start_date, context_data, planning_mode
+            ):
+                itinerary.append(day_plan)
+                yield {'event': 'day', 'data': day_plan}
+        itinerary.sort(key=lambda day: day.day_number)
 
-        # Step 4: Generate packing checklist
-        print("\n🎒 Creating packing checklist...")
-        packing_list = self._generate_packing_list(
-            booking_context, preferences, context_data.get('weather', [])
-        )
+        # Steps 4-6: Packing checklist, weather summary and local tips in one generation
+        print("\n🎒 Creating packing checklist, weather summary and local tips...")
+        with span('extras'):
+            extras = await self._generate_trip_extras(booking_context, preferences, context_data)
+
+        packing_list = extras['packing_checklist']
+        yield {'event': 'packing_checklist', 'data': packing_list}
 
-        # Step 5: Extract weather summary
-        weather_summary = self._extract_weather_summary(context_data.get('weather', []))
+        weather_summary = extras['weather_summary']
+        yield {'event': 'weather_summary', 'data': weather_summary}
 
-        # Step 6: Generate local tips
-        local_tips = self._generate_local_tips(booking_context.location, context_data)
+        local_tips = extras['local_tips']
+        yield {'event': 'local_tips', 'data': local_tips}
 
         # Step 7: Generate dynamic cost estimate based on actual itinerary
         print("\n💰 Calculating cost estimate...")
-        cost_estimate = self._estimate_cost(
-            num_days=num_days,
-            budget=preferences.budget,
-            location=booking_context.location,
-            itinerary=itinerary
-        )
+        with span('cost'):
+            cost_estimate = await self._estimate_cost(
+                num_days=num_days,
+                budget=preferences.budget,
+                location=booking_context.location,
+                itinerary=itinerary
+            )
+        yield {'event': 'total_estimated_cost', 'data': cost_estimate}
 
         print("\n✅ Itinerary generation complete!\n")
 
-        return AgentResponse(
+        yield {'event': 'complete', 'data': AgentResponse(
             itinerary=itinerary,
             packing_checklist=packing_list,
             weather_summary=weather_summary,
             local_tips=local_tips,
             total_estimated_cost=cost_estimate
-        )
+        )}
+
+    async def gather_context(self, booking_context: BookingContext, preferences: Preferences) -> Dict[str, Any]:
+        """
+        Tavily context for a booking, reusable across stream_itinerary calls
+
+        Pass a booking spanning the whole date window to cover several
+        bookings at the same destination.
+        """
+        preferences = normalize_preferences(preferences)
+        num_days = (datetime.strptime(booking_context.check_out, "%Y-%m-%d")
+                    - datetime.strptime(booking_context.check_in, "%Y-%m-%d")).days
+        with span('context', shared=True):
+            return await self._gather_context(booking_context, preferences, num_days)
+
+    def _summarize_context(self, booking: BookingContext, num_days: int,
+                           context_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Short summary of the gathered context, sent before any day is planned
+        """
+        return {
+            'location': booking.location,
+            'check_in': booking.check_in,
+            'check_out': booking.check_out,
+            'num_days': num_days,
+            'counts': {category: len(results) for category, results in context_data.items()},
+            'highlights': [
+                poi.get('title', 'N/A') for poi in context_data.get('pois', [])[:5]
+            ],
+            'events': [
+                event.get('title', 'N/A') for event in context_data.get('events', [])[:3]
+            ]
+        }
 
-    def _gather_context(self, booking: BookingContext, prefs: Preferences, num_days: int) -> Dict[str, Any]:
+    async def _gather_context(self, booking: BookingContext, prefs: Preferences, num_days: int) -> Dict[str, Any]:
         """
         Gather all contextual information using Tavily
+
+        The five lookups are issued concurrently. Each one is bounded by
+        lookup_timeout and the whole phase by gather_deadline; a category that
+        fails or runs late is cancelled and contributes an empty list.
         """
         has_children = booking.party_type.children > 0
         needs_wheelchair = prefs.mobility_needs == "wheelchair"
 
-        context = {
-            'events': self.tavily.search_local_events(
-                booking.location, booking.check_in, booking.check_out
-            ),
-            'pois': self.tavily.search_points_of_interest(
-                booking.location, prefs.interests, has_children, needs_wheelchair
-            ),
-            'restaurants': self.tavily.search_restaurants(
-                booking.location, prefs.dietary_restrictions, prefs.budget, has_children
-            ),
-            'weather': self.tavily.get_weather_forecast(
-                booking.location, booking.check_in, booking.check_out
-            ),
-            'transportation': self.tavily.search_transportation(booking.location)
+        if self.destination_context is not None:
+            lookups = self._layered_lookups(booking, prefs, has_children, needs_wheelchair)
+        else:
+            lookups = {
+                'events': self.tavily.search_local_events(
+                    booking.location, booking.check_in, booking.check_out
+                ),
+                'pois': self.tavily.search_points_of_interest(
+                    booking.location, prefs.interests, has_children, needs_wheelchair
+                ),
+                'restaurants': self.tavily.search_restaurants(
+                    booking.location, prefs.dietary_restrictions, prefs.budget, has_children
+                ),
+                'weather': self.tavily.get_weather_forecast(
+                    booking.location, booking.check_in, booking.check_out
+                ),
+                'transportation': self.tavily.search_transportation(booking.location)
+            }
+
+        started = time.monotonic()
+        tasks = {
+            category: asyncio.create_task(asyncio.wait_for(lookup, self.lookup_timeout))
+            for category, lookup in lookups.items()
         }
 
+        await asyncio.wait(tasks.values(), timeout=self.gather_deadline)
+
+        context = {}
+        for category, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                print(f"  ⚠ {category} lookup missed the gather deadline, continuing without it")
+                context[category] = []
+            elif task.exception() is not None:
+                error = task.exception()
+                if isinstance(error, asyncio.TimeoutError):
+                    print(f"  ⚠ {category} lookup timed out, continuing without it")
+                else:
+                    print(f"  ⚠ {category} lookup failed: {error}")
+                context[category] = []
+            else:
+                context[category] = task.result()
+
         print(f"  ✓ Found {len(context['events'])} local events")
         print(f"  ✓ Found {len(context['pois'])} points of interest")
         print(f"  ✓ Found {len(context['restaurants'])} restaurants")
         print(f"  ✓ Found {len(context['weather'])} weather sources")
+        print(f"  ⏱ Context gathered in {time.monotonic() - started:.2f}s")
 
         return context
 
-    def _generate_daily_plans(self, booking: BookingContext, prefs: Preferences,
-                             num_days: int, start_date: datetime,
-                             context_data: Dict[str, Any]) -> List[DayPlan]:
+    def _layered_lookups(self, booking: BookingContext, prefs: Preferences,
+                         has_children: bool, needs_wheelchair: bool) -> Dict[str, Awaitable]:
         """
-        Generate detailed day-by-day plans using LLM
+        Context lookups served from the destination store where possible
+
+        Events, transportation, interest-based POIs and budget-based
+        restaurants depend only on the destination and month, so they come
+        from the shared store. Only the preference-specific queries (family or
+        wheelchair POIs, dietary or family restaurants) run per request and
+        are layered in front of the shared results. Weather stays per request
+        because it depends on the exact dates.
         """
-        itinerary = []
+        store = self.destination_context
+        destination = normalize_location(booking.location)
+        month = booking.check_in[:7]
+        interests = ",".join(prefs.interests[:3])
+
+        async def layered(shared: Awaitable, specific: Optional[Awaitable]) -> List[Dict[str, Any]]:
+            if specific is None:
+                return await shared
+            shared_results, specific_results = await asyncio.gather(shared, specific)
+            return merge_results(specific_results, shared_results)
+
+        pois_specific = None
+        if has_children or needs_wheelchair:
+            pois_specific = self.tavily.search_points_of_interest(
+                booking.location, prefs.interests, has_children, needs_wheelchair
+            )
+
+        restaurants_specific = None
+        if prefs.dietary_restrictions or has_children:
+            restaurants_specific = self.tavily.search_restaurants(
+                booking.location, prefs.dietary_restrictions, prefs.budget, has_children
+            )
+
+        return {
+            'events': store.get_or_fetch(
+                destination, month, 'events', '',
+                lambda: self.tavily.search_local_events(booking.location, booking.check_in, booking.check_out)
+            ),
+            'pois': layered(
+                store.get_or_fetch(
+                    destination, month, 'pois', interests,
+                    lambda: self.tavily.search_points_of_interest(booking.location, prefs.interests)
+                ),
+                pois_specific
+            ),
+            'restaurants': layered(
+                store.get_or_fetch(
+                    destination, month, 'restaurants', prefs.budget,
+                    lambda: self.tavily.search_restaurants(booking.location, [], prefs.budget)
+                ),
+                restaurants_specific
+            ),
+            'weather': self.tavily.get_weather_forecast(
+                booking.location, booking.check_in, booking.check_out
+            ),
+            'transportation': store.get_or_fetch(
+                destination, month, 'transportation', '',
+                lambda: self.tavily.search_transportation(booking.location)
+            )
+        }
+
+    async def _iter_daily_plans(self, booking: BookingContext, prefs: Preferences,
+                                num_days: int, start_date: datetime,
+                                context_data: Dict[str, Any],
+                                planning_mode: Optional[str] = None) -> AsyncIterator[DayPlan]:
+        """
+        Yield day plans as they finish
+
+        Sequential mode yields in day order. Parallel mode runs at most
+        day_plan_concurrency days at a time and yields in completion order;
+        days that fail or miss day_plan_timeout fall back to the default
+        day data. Whole-trip mode plans every day in one generation and only
+        re-plans, per day, the days that fail validation.
+        """
+        mode = planning_mode or self.day_planning_mode
+        if mode not in PLANNING_MODES:
+            raise ValueError(f"Unknown planning mode '{mode}', expected one of {', '.join(PLANNING_MODES)}")
+
+        if mode == 'whole_trip' and num_days > 0:
+            async for day_plan in self._iter_whole_trip_plans(
+                booking, prefs, num_days, start_date, context_data
+            ):
+                yield day_plan
+            return
+
+        if mode == 'parallel' and num_days > 1:
+            day_numbers = list(range(1, num_days + 1))
+            if self.warm_prefix:
+                print(f"  📝 Planning Day 1 to warm the prompt prefix...")
+                yield await self._generate_single_day_bounded(1, start_date, booking, prefs, context_data)
+                day_numbers = day_numbers[1:]
+
+            print(f"  📝 Planning {len(day_numbers)} days, {self.day_plan_concurrency} at a time...")
+            async for day_plan in self._iter_days_bounded(
+                day_numbers, start_date, booking, prefs, context_data
+            ):
+                yield day_plan
+            return
 
         for day_num in range(num_days):
             current_date = start_date + timedelta(days=day_num)
@@ -149,7 +477,7 @@ class AIAgentService:
             print(f"  📝 Planning Day {day_num + 1} ({current_date.strftime('%Y-%m-%d')})...")
 
             # Generate activities for this day
-            day_plan = self._generate_single_day(
+            day_plan = await self._generate_single_day(
                 day_num + 1,
                 current_date,
                 booking,
@@ -157,15 +485,213 @@ class AIAgentService:
                 context_data
             )
 
-            itinerary.append(day_plan)
+            yield day_plan
 
-        return itinerary
+    async def _iter_days_bounded(self, day_numbers: List[int], start_date: datetime,
+                                 booking: BookingContext, prefs: Preferences,
+                                 context_data: Dict[str, Any]) -> AsyncIterator[DayPlan]:
+        """
+        Plan the given days concurrently and yield them in completion order
+        """
+        tasks = [
+            asyncio.create_task(self._generate_single_day_bounded(
+                day_number, start_date + timedelta(days=day_number - 1), booking, prefs, context_data
+            ))
+            for day_number in day_numbers
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # A consumer that stops early must not leave days running
+            for task in tasks:
+                task.cancel()
+
+    async def _iter_whole_trip_plans(self, booking: BookingContext, prefs: Preferences,
+                                     num_days: int, start_date: datetime,
+                                     context_data: Dict[str, Any]) -> AsyncIterator[DayPlan]:
+        """
+        Plan the whole trip in one generation, re-planning invalid days one by one
 
-    def _generate_single_day(self, day_number: int, date: datetime,
-                            booking: BookingContext, prefs: Preferences,
-                            context_data: Dict[str, Any]) -> DayPlan:
+        The generation takes a day_plan_semaphore slot like any day, so
+        concurrent whole-trip requests stay within OLLAMA_NUM_PARALLEL; the
+        timeout starts once the slot is held.
         """
-        Generate plan for a single day using LLM
+        print(f"  📝 Planning all {num_days} days in one generation...")
+        try:
+            async with self.day_plan_semaphore:
+                planned = await asyncio.wait_for(
+                    self._generate_whole_trip(booking, prefs, num_days, start_date, context_data),
+                    self.whole_trip_timeout
+                )
+        except asyncio.TimeoutError:
+            print(f"    ⚠ Whole-trip generation timed out, planning each day separately")
+            planned = {}
+        except Exception as e:
+            print(f"    ⚠ Whole-trip generation failed: {e}, planning each day separately")
+            planned = {}
+
+        for day_number in sorted(planned):
+            yield planned[day_number]
+
+        missing = [day_number for day_number in range(1, num_days + 1) if day_number not in planned]
+        if missing:
+            print(f"    ⚠ Re-planning days {missing} individually")
+            async for day_plan in self._iter_days_bounded(missing, start_date, booking, prefs, context_data):
+                yield day_plan
+
+    async def _generate_whole_trip(self, booking: BookingContext, prefs: Preferences,
+                                   num_days: int, start_date: datetime,
+                                   context_data: Dict[str, Any]) -> Dict[int, DayPlan]:
+        """
+        Generate every day of the trip with a single LLM call
+
+        Returns the days that validated, keyed by day number. Days that are
+        missing or malformed are left out so the caller can re-plan them.
+        """
+        dates = [start_date + timedelta(days=day_num) for day_num in range(num_days)]
+        day_list = "\n".join([
+            f"- Day {day_num + 1}: {date.strftime('%A, %B %d, %Y')}"
+            for day_num, date in enumerate(dates)
+        ])
+
+        prompt = PromptTemplate(
+            input_variables=["num_days", "days", "location", "interests", "budget", "party",
+                             "dietary", "mobility", "pois", "restaurants", "events"],
+            template="""You are an expert travel planner. Create a complete {num_days}-day itinerary for travelers.
+
+Location: {location}
+Party: {party}
+Interests: {interests}
+Budget: {budget}
+Dietary restrictions: {dietary}
+Mobility needs: {mobility}
+
+Trip days:
+{days}
+
+Available attractions and activities:
+{pois}
+
+Available restaurants:
+{restaurants}
+
+Local events:
+{events}
+
+For EVERY day create a realistic plan with:
+1. MORNING (9 AM - 12 PM): 1-2 activities
+2. AFTERNOON (12 PM - 5 PM): 1-2 activities
+3. EVENING (5 PM - 9 PM): 1 activity
+4. DINING: 2-3 restaurant recommendations
+
+Consider:
+- Children need shorter activities and frequent breaks
+- Budget constraints ({budget})
+- Dietary restrictions ({dietary})
+- Mobility needs ({mobility})
+- Do not repeat the same attraction or restaurant on different days
+- Logical geographic flow within each day
+
+Format your response as JSON with this structure, one entry per day:
+{{
+  "days": [
+    {{
+      "day_number": 1,
+      "morning": [{{"title": "...", "description": "...", "duration": "...", "location": "..."}}],
+      "afternoon": [{{"title": "...", "description": "...", "duration": "...", "location": "..."}}],
+      "evening": [{{"title": "...", "description": "...", "duration": "...", "location": "..."}}],
+      "restaurants": [{{"name": "...", "cuisine": "...", "why": "...", "location": "..."}}],
+      "summary": "Brief summary of the day's theme"
+    }}
+  ]
+}}
+
+Only return valid JSON, no other text."""
+        )
+
+        formatted_prompt = prompt.format(
+            num_days=num_days,
+            days=day_list,
+            **self._planning_inputs(booking, prefs, context_data)
+        )
+
+        has_days = lambda data: isinstance(data, dict) and bool(data.get('days'))
+        response = await self._invoke_llm(
+            formatted_prompt, 'whole_trip', self._output_format(WholeTripOutput),
+            validate=self._validates(WholeTripOutput, has_days)
+        )
+
+        try:
+            data, _ = self._parse_structured(response, WholeTripOutput, 'whole_trip', usable=has_days)
+        except ValueError as e:
+            print(f"    ⚠ Could not parse whole-trip JSON: {e}")
+            return {}
+
+        days = data.get('days') if isinstance(data, dict) else None
+        if not isinstance(days, list):
+            print(f"    ⚠ Whole-trip response has no 'days' list")
+            return {}
+
+        planned = {}
+        for index, day_data in enumerate(days):
+            if not isinstance(day_data, dict):
+                continue
+
+            day_number = day_data.get('day_number', index + 1)
+            if not isinstance(day_number, int) or not 1 <= day_number <= num_days or day_number in planned:
+                continue
+
+            slots = [day_data.get(slot, []) for slot in ('morning', 'afternoon', 'evening', 'restaurants')]
+            if not all(isinstance(slot, list) for slot in slots) or not any(slots[:3]):
+                print(f"    ⚠ Day {day_number} in whole-trip response is incomplete")
+                continue
+
+            try:
+                planned[day_number] = self._build_day_plan(
+                    day_number, dates[day_number - 1], day_data, prefs, booking
+                )
+            except ValidationError as e:
+                print(f"    ⚠ Day {day_number} failed DayPlan validation: {e}")
+
+        print(f"    ✓ Whole-trip generation produced {len(planned)}/{num_days} valid days")
+        return planned
+
+    async def _generate_single_day_bounded(self, day_number: int, date: datetime,
+                                           booking: BookingContext, prefs: Preferences,
+                                           context_data: Dict[str, Any]) -> DayPlan:
+        """
+        Plan one day under the shared concurrency limit, falling back on failure
+
+        The timeout only starts once the day holds a slot, so queued days are
+        not penalised for waiting behind earlier ones.
+        """
+        with span('day', day=day_number) as day_span:
+            async with self.day_plan_semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self._generate_single_day(day_number, date, booking, prefs, context_data),
+                        self.day_plan_timeout
+                    )
+                except asyncio.TimeoutError:
+                    print(f"    ⚠ Day {day_number} timed out, using smart fallback")
+                    day_span.set(fallback='timeout')
+                except Exception as e:
+                    print(f"    ⚠ Day {day_number} failed: {e}, using smart fallback")
+                    day_span.set(fallback='error')
+
+        return self._build_day_plan(
+            day_number,
+            date,
+            self._create_default_day_data(day_number, booking, prefs),
+            prefs,
+            booking
+        )
+
+    def _planning_inputs(self, booking: BookingContext, prefs: Preferences,
+                         context_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Prompt variables shared by every day-planning prompt
         """
         # Prepare context for LLM
         pois_summary = "\n".join([
@@ -183,28 +709,57 @@ class AIAgentService:
             for event in context_data['events'][:3]
         ])
 
+        party_str = f"{booking.party_type.adults} adults"
+        if booking.party_type.children > 0:
+            party_str += f", {booking.party_type.children} children"
+        if booking.party_type.infants > 0:
+            party_str += f", {booking.party_type.infants} infants"
+
+        dietary_str = ", ".join(prefs.dietary_restrictions) if prefs.dietary_restrictions else "None"
+
+        return {
+            'location': booking.location,
+            'interests': ", ".join(prefs.interests),
+            'budget': prefs.budget,
+            'party': party_str,
+            'dietary': dietary_str,
+            'mobility': prefs.mobility_needs,
+            'pois': pois_summary,
+            'restaurants': restaurants_summary,
+            'events': events_summary
+        }
+
+    async def _generate_single_day(self, day_number: int, date: datetime,
+                                  booking: BookingContext, prefs: Preferences,
+                                  context_data: Dict[str, Any]) -> DayPlan:
+        """
+        Generate plan for a single day using LLM
+
+        Everything that is the same for every day of the trip comes first and
+        the day number and date come last, so Ollama can reuse the evaluated
+        prompt prefix (its KV cache) from one day to the next.
+        """
         # Create prompt for day planning
         prompt = PromptTemplate(
             input_variables=["day_number", "location", "interests", "budget", "party",
                            "dietary", "mobility", "pois", "restaurants", "events", "date"],
-            template="""You are an expert travel planner. Create a detailed day plan for travelers.
-
-Day {day_number} - {date}
-Location: {location}
-Party: {party}
-Interests: {interests}
-Budget: {budget}
-Dietary restrictions: {dietary}
-Mobility needs: {mobility}
+            template="""You are an expert travel planner. Create a detailed day plan for travelers visiting {location}.
 
 Available attractions and activities:
 {pois}
 
+Local events:
+{events}
+
 Available restaurants:
 {restaurants}
 
-Local events:
-{events}
+Travelers:
+Party: {party}
+Interests: {interests}
+Budget: {budget}
+Dietary restrictions: {dietary}
+Mobility needs: {mobility}
 
 Create a realistic day plan with:
 1. MORNING (9 AM - 12 PM): 1-2 activities
@@ -236,40 +791,202 @@ Format your response as JSON with this structure:
   "summary": "Brief summary of the day's theme"
 }}
 
+Day to plan: Day {day_number} - {date}
 Only return valid JSON, no other text."""
         )
 
-        # Prepare variables
-        party_str = f"{booking.party_type.adults} adults"
-        if booking.party_type.children > 0:
-            party_str += f", {booking.party_type.children} children"
-        if booking.party_type.infants > 0:
-            party_str += f", {booking.party_type.infants} infants"
-
-        dietary_str = ", ".join(prefs.dietary_restrictions) if prefs.dietary_restrictions else "None"
-
         # Call LLM
         formatted_prompt = prompt.format(
             day_number=day_number,
             date=date.strftime("%A, %B %d, %Y"),
-            location=booking.location,
-            interests=", ".join(prefs.interests),
-            budget=prefs.budget,
-            party=party_str,
-            dietary=dietary_str,
-            mobility=prefs.mobility_needs,
-            pois=pois_summary,
-            restaurants=restaurants_summary,
-            events=events_summary
+            **self._planning_inputs(booking, prefs, context_data)
         )
 
-        response = self.llm.invoke(formatted_prompt)
+        response = await self._invoke_llm(
+            formatted_prompt, 'day_plan', self._output_format(DayPlanOutput),
+            validate=self._validates(DayPlanOutput, self._has_activities)
+        )
 
         # Parse LLM response
         day_plan = self._parse_day_plan(day_number, date, response, prefs, booking)
 
         return day_plan
 
+    async def _invoke_llm(self, prompt: str, call_type: str, output_format: Any = None,
+                          validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Run one Ollama generation without blocking the event loop
+
+        Args:
+            prompt: Fully rendered prompt
+            call_type: Which pipeline step is calling (day_plan, whole_trip, extras, packing, weather, tips, cost)
+            output_format: Ollama "format" for this call ("json" or a JSON schema), see _output_format
+            validate: Whether a response may be cached; truncated or off-schema
+                responses are returned but not stored, so the next request retries
+        """
+        with span(f'llm.{call_type}', prompt_chars=len(prompt)) as llm_span:
+            if self.llm_cache is not None:
+                key = LLMResponseCache.make_key(self.llm.model, self._output_params(output_format), prompt)
+                started = time.perf_counter()
+                cached = await self.llm_cache.get(key)
+                if cached is not None:
+                    LLM_CALL_SECONDS.observe(time.perf_counter() - started, call_type=call_type, source="cache", outcome="hit")
+                    llm_span.set(source='cache', response_chars=len(cached))
+                    print(f"    ✓ LLM cache hit ({call_type})")
+                    return cached
+
+            started = time.perf_counter()
+            try:
+                response = await self._generate(prompt, call_type, llm_span, output_format)
+            except BaseException as e:
+                # Cancellation here means the step's timeout expired
+                outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+                LLM_CALL_SECONDS.observe(time.perf_counter() - started, call_type=call_type, source="ollama", outcome=outcome)
+                raise
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started, call_type=call_type, source="ollama", outcome="ok")
+            llm_span.set(source='ollama', response_chars=len(response))
+
+            if self.llm_cache is not None:
+                if response.strip() and (validate is None or validate(response)):
+                    await self.llm_cache.set(key, response)
+                else:
+                    print(f"    ⚠ Not caching unusable {call_type} response")
+            return response
+
+    def _validates(self, model_cls, usable=None) -> Callable[[str], bool]:
+        """Cache check for a structured step: complete JSON that matches model_cls (and passes usable)"""
+        def check(response: str) -> bool:
+            try:
+                data = self._extract_json(response)
+                model_cls.model_validate(data)
+            except (ValueError, ValidationError):
+                return False
+            return usable is None or usable(data)
+        return check
+
+    def _output_format(self, model_cls) -> Any:
+        """Ollama "format" for a step whose response should match model_cls (None when STRUCTURED_OUTPUT=off)"""
+        if STRUCTURED_OUTPUT == 'schema':
+            return model_cls.model_json_schema()
+        if STRUCTURED_OUTPUT == 'json':
+            return 'json'
+        return None
+
+    def _output_params(self, output_format: Any = None) -> Dict[str, Any]:
+        """Generation settings that can change the output; keep_alive only affects residency"""
+        params = dict(self.llm._default_params)
+        params.pop('keep_alive', None)
+        if output_format is not None:
+            params['format'] = output_format
+        return params
+
+    async def _generate(self, prompt: str, call_type: str, llm_span, output_format: Any = None) -> str:
+        """Call Ollama, through the record/replay cassette when one is active"""
+        if self.cassette is None:
+            return await self._ollama_generate(prompt, call_type, llm_span, output_format)
+        return await self.cassette.call(
+            'ollama', call_type,
+            {'model': self.llm.model, 'options': self._output_params(output_format), 'prompt': prompt},
+            lambda: self._ollama_generate(prompt, call_type, llm_span, output_format)
+        )
+
+    async def _ollama_generate(self, prompt: str, call_type: str, llm_span, output_format: Any = None) -> str:
+        """
+        One Ollama generation, recording its token counts
+
+        prompt_eval_count only counts prompt tokens Ollama had to evaluate, so
+        a prefix reused from its cache shows up as a lower count.
+        """
+        self.warmer.touch()
+        if output_format is not None:
+            result = await self.llm.agenerate([prompt], format=output_format)
+        else:
+            result = await self.llm.agenerate([prompt])
+        generation = result.generations[0][0]
+        info = generation.generation_info or {}
+        prompt_eval_count = info.get('prompt_eval_count') or 0
+        eval_count = info.get('eval_count') or 0
+        LLM_PROMPT_EVAL_TOKENS.inc(prompt_eval_count, call_type=call_type)
+        LLM_GENERATED_TOKENS.inc(eval_count, call_type=call_type)
+        llm_span.set(prompt_eval_count=prompt_eval_count, eval_count=eval_count)
+        return generation.text
+
+    def _extract_json(self, llm_response: str) -> Any:
+        """
+        Pull the JSON object out of an LLM response
+
+        Raises:
+            ValueError: no JSON object in the response
+            json.JSONDecodeError: the object found is not valid JSON
+        """
+        # Clean response - remove markdown code blocks if present
+        response_clean = llm_response.strip()
+        if response_clean.startswith('```json'):
+            response_clean = response_clean[7:]
+        if response_clean.startswith('```'):
+            response_clean = response_clean[3:]
+        if response_clean.endswith('```'):
+            response_clean = response_clean[:-3]
+
+        # Try to extract JSON from response
+        json_start = response_clean.find('{')
+        json_end = response_clean.rfind('}') + 1
+
+        if json_start == -1 or json_end <= json_start:
+            raise ValueError("No JSON object found in LLM response")
+
+        return json.loads(response_clean[json_start:json_end])
+
+    def _parse_structured(self, llm_response: str, model_cls, call_type: str, usable=None):
+        """
+        Decode a JSON response and check it against its output model
+
+        Returns (data, valid) where valid tells whether data matched model_cls;
+        off-schema data is still returned for the lenient builders. Truncated
+        or malformed JSON is repaired when the salvaged part passes usable
+        (default: a non-empty object). Every outcome is counted in
+        LLM_PARSE_TOTAL.
+
+        Raises:
+            ValueError / json.JSONDecodeError: as _extract_json, when nothing usable could be salvaged
+        """
+        try:
+            data = self._extract_json(llm_response)
+        except ValueError as e:
+            # JSONDecodeError is a ValueError too
+            outcome = "decode_error" if isinstance(e, json.JSONDecodeError) else "no_json"
+            try:
+                data, repairs = repair_json(llm_response, expect='object')
+            except ValueError:
+                LLM_PARSE_TOTAL.inc(call_type=call_type, outcome=outcome)
+                raise e
+            if not (usable or self._non_empty_object)(data):
+                LLM_PARSE_TOTAL.inc(call_type=call_type, outcome=outcome)
+                raise e
+            LLM_PARSE_TOTAL.inc(call_type=call_type, outcome="repaired")
+            print(f"    🔧 Repaired {call_type} JSON ({len(repairs)} fixes): {'; '.join(repairs[:5])}")
+            return data, False
+
+        try:
+            model_cls.model_validate(data)
+        except ValidationError as e:
+            LLM_PARSE_TOTAL.inc(call_type=call_type, outcome="lenient")
+            print(f"    ⚠ {call_type} JSON does not match {model_cls.__name__} ({e.error_count()} errors), parsing leniently")
+            return data, False
+        LLM_PARSE_TOTAL.inc(call_type=call_type, outcome="success")
+        return data, True
+
+    @staticmethod
+    def _non_empty_object(data: Any) -> bool:
+        return isinstance(data, dict) and bool(data)
+
+    @staticmethod
+    def _has_activities(data: Any) -> bool:
+        """A salvaged day plan is only worth keeping when at least one activity survived"""
+        return isinstance(data, dict) and any(
+            isinstance(data.get(slot), list) and data[slot] for slot in ('morning', 'afternoon', 'evening')
+        )
+
     def _parse_day_plan(self, day_number: int, date: datetime,
                        llm_response: str, prefs: Preferences,
                        booking: BookingContext) -> DayPlan:
@@ -277,31 +994,29 @@ Only return valid JSON, no other text."""
         Parse LLM response into structured DayPlan
         """
         try:
-            # Clean response - remove markdown code blocks if present
-            response_clean = llm_response.strip()
-            if response_clean.startswith('```json'):
-                response_clean = response_clean[7:]
-            if response_clean.startswith('```'):
-                response_clean = response_clean[3:]
-            if response_clean.endswith('```'):
-                response_clean = response_clean[:-3]
-
-            # Try to extract JSON from response
-            json_start = response_clean.find('{')
-            json_end = response_clean.rfind('}') + 1
-
-            if json_start != -1 and json_end > json_start:
-                json_str = response_clean[json_start:json_end]
-                data = json.loads(json_str)
+            data, valid = self._parse_structured(
+                llm_response, DayPlanOutput, 'day_plan', usable=self._has_activities
+            )
+            if not isinstance(data, dict):
+                raise ValueError("Day plan is not a JSON object")
+            if valid:
                 print(f"    ✓ Successfully parsed day plan JSON")
-            else:
-                # Fallback to default structure
-                print(f"    ⚠ No JSON found, creating default activities")
-                data = self._create_default_day_data(day_number, booking, prefs)
         except json.JSONDecodeError as e:
             print(f"    ⚠ JSON decode error: {e}, using smart fallback")
             data = self._create_default_day_data(day_number, booking, prefs)
+        except ValueError:
+            # Fallback to default structure
+            print(f"    ⚠ No JSON found, creating default activities")
+            data = self._create_default_day_data(day_number, booking, prefs)
 
+        return self._build_day_plan(day_number, date, data, prefs, booking)
+
+    def _build_day_plan(self, day_number: int, date: datetime,
+                        data: Dict[str, Any], prefs: Preferences,
+                        booking: BookingContext) -> DayPlan:
+        """
+        Convert parsed day data into a DayPlan
+        """
         # Convert to ActivityCard and RestaurantRec objects
         price_tier_map = {"low": "$", "medium": "$$", "high": "$$$"}
         price_tier = price_tier_map.get(prefs.budget, "$$")
@@ -428,8 +1143,101 @@ Only return valid JSON, no other text."""
             daily_summary=data.get('summary', f'Day {day_number} exploration')
         )
 
-    def _generate_packing_list(self, booking: BookingContext,
-                              prefs: Preferences, weather_data: List[Dict]) -> List[str]:
+    async def _generate_trip_extras(self, booking: BookingContext, prefs: Preferences,
+                                    context_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate packing checklist, weather summary and local tips in one LLM call
+
+        Any section that is missing or malformed in the combined response is
+        produced by its dedicated generator instead.
+        """
+        weather_data = context_data.get('weather', [])
+
+        weather_content = " ".join([
+            w.get('content', '')[:300] for w in weather_data[:2]
+        ]) or "Not available"
+
+        transport_info = " ".join([
+            t.get('content', '')[:200] for t in context_data.get('transportation', [])[:2]
+        ])
+
+        prompt = f"""You are an expert travel planner preparing travelers for a trip to {booking.location}.
+
+Trip details:
+- Duration: {booking.check_in} to {booking.check_out}
+- Party: {booking.party_type.adults} adults, {booking.party_type.children} children
+- Interests: {', '.join(prefs.interests)}
+- Mobility needs: {prefs.mobility_needs}
+
+Weather information:
+{weather_content}
+
+Local transportation:
+{transport_info}
+
+Provide:
+1. packing_checklist: 10-15 essential, specific and practical items to pack
+2. weather_summary: the weather in 1-2 sentences, with temperature range and conditions
+3. local_tips: 5 practical tips covering best times to visit attractions, local transportation, money-saving, cultural etiquette and safety
+
+Format your response as JSON with this structure:
+{{
+  "packing_checklist": ["...", "..."],
+  "weather_summary": "...",
+  "local_tips": ["...", "..."]
+}}
+
+Only return valid JSON, no other text."""
+
+        response = await self._invoke_llm(
+            prompt, 'extras', self._output_format(TripExtrasOutput),
+            validate=self._validates(TripExtrasOutput)
+        )
+
+        try:
+            data, _ = self._parse_structured(response, TripExtrasOutput, 'extras')
+            if not isinstance(data, dict):
+                raise ValueError("Combined response is not a JSON object")
+        except ValueError as e:
+            print(f"    ⚠ Could not parse combined extras JSON: {e}, generating sections separately")
+            data = {}
+
+        def clean_list(value, min_length):
+            if not isinstance(value, list):
+                return []
+            return [
+                item.strip() for item in value
+                if isinstance(item, str) and len(item.strip()) > min_length
+            ]
+
+        packing_list = clean_list(data.get('packing_checklist'), 3)[:15]
+        if not packing_list:
+            print("    ⚠ Packing checklist missing, generating separately")
+            packing_list = await self._generate_packing_list(booking, prefs, weather_data)
+
+        weather_summary = data.get('weather_summary')
+        if not weather_data:
+            # Same message the dedicated generator gives without search results
+            weather_summary = await self._extract_weather_summary(weather_data)
+        elif not isinstance(weather_summary, str) or not weather_summary.strip():
+            print("    ⚠ Weather summary missing, generating separately")
+            weather_summary = await self._extract_weather_summary(weather_data)
+        else:
+            weather_summary = weather_summary.strip()
+
+        local_tips = clean_list(data.get('local_tips'), 10)[:5]
+        if not local_tips:
+            print("    ⚠ Local tips missing, generating separately")
+            local_tips = await self._generate_local_tips(booking.location, context_data)
+
+        return {
+            'packing_checklist': packing_list,
+            'weather_summary': weather_summary,
+            'local_tips': local_tips
+        }
+
+    async def _generate_packing_list(self, booking: BookingContext,
+                                    prefs: Preferences, weather_data: List[Dict]) -> List[str]:
         """
         Generate weather-aware packing checklist using LLM
         """
@@ -449,7 +1257,7 @@ Trip details:
 Provide 10-15 essential items to pack. Be specific and practical.
 Return as a simple list, one item per line, no numbering."""
 
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm(prompt, 'packing')
 
         # Parse response into list
         items = [
@@ -460,7 +1268,7 @@ Return as a simple list, one item per line, no numbering."""
 
         return items[:15]  # Limit to 15 items
 
-    def _extract_weather_summary(self, weather_data: List[Dict]) -> str:
+    async def _extract_weather_summary(self, weather_data: List[Dict]) -> str:
         """
         Extract weather summary from Tavily results
         """
@@ -477,10 +1285,10 @@ Return as a simple list, one item per line, no numbering."""
 
 Be concise and mention key information like temperature range and conditions."""
 
-        summary = self.llm.invoke(prompt)
+        summary = await self._invoke_llm(prompt, 'weather')
         return summary.strip()
 
-    def _generate_local_tips(self, location: str, context_data: Dict) -> List[str]:
+    async def _generate_local_tips(self, location: str, context_data: Dict) -> List[str]:
         """
         Generate local tips and insider information
         """
@@ -501,7 +1309,7 @@ Tips should cover:
 
 Return as a list, one tip per line, no numbering."""
 
-        response = self.llm.invoke(prompt)
+        response = await self._invoke_llm(prompt, 'tips')
 
         tips = [
             line.strip().lstrip('-•*').strip()
@@ -545,8 +1353,8 @@ Return as a list, one tip per line, no numbering."""
             "summary": f"Day {day_number}: Exploring {interests_str} in {location}"
         }
 
-    def _estimate_cost(self, num_days: int, budget: str,
-                      location: str, itinerary: List[DayPlan]) -> str:
+    async def _estimate_cost(self, num_days: int, budget: str,
+                            location: str, itinerary: List[DayPlan]) -> str:
         """
         Generate dynamic cost estimate using LLM based on actual activities
         """
@@ -643,7 +1451,7 @@ $XXX-$YYY per person
 IMPORTANT: Return ONLY the cost range in format "$XXX-$YYY per person", nothing else."""
 
         try:
-            response = self.llm.invoke(prompt)
+            response = await self._invoke_llm(prompt, 'cost')
             response = response.strip()
 
             # Extract cost range using regex
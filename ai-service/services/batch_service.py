@@ -0,0 +1,191 @@
+"""
+Batch itinerary generation
+Plans itineraries for many bookings in one call: bookings at the same
+destination in the same date window share one context gather, and the
+pipelines run through a bounded pool with each result reported as it finishes
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import AgentResponse, BookingContext, Preferences
+from services.destination_context import normalize_location
+from services.preferences import normalize_preferences
+
+BatchItem = Tuple[BookingContext, Preferences]
+
+
+def group_bookings(items: List[BatchItem], window_days: int) -> List[List[BatchItem]]:
+    """
+    Group bookings that can share one context gather
+
+    Bookings share a group when they have the same destination and the same
+    preferences and party kind (the lookups depend on both), and their
+    check-ins fall within window_days of the group's earliest check-in.
+    """
+    def group_key(item: BatchItem) -> tuple:
+        booking, prefs = item
+        return (
+            normalize_location(booking.location),
+            normalize_preferences(prefs).model_dump_json(),
+            booking.party_type.children > 0
+        )
+
+    groups: List[List[BatchItem]] = []
+    current_key = None
+    window_start = None
+    for item in sorted(items, key=lambda item: (group_key(item), item[0].check_in)):
+        check_in = datetime.strptime(item[0].check_in, "%Y-%m-%d")
+        key = group_key(item)
+        if key != current_key or (check_in - window_start).days > window_days:
+            groups.append([])
+            current_key = key
+            window_start = check_in
+        groups[-1].append(item)
+    return groups
+
+
+def window_booking(group: List[BatchItem]) -> BookingContext:
+    """One booking spanning the group's whole date window, for the shared lookups"""
+    first = group[0][0]
+    return first.model_copy(update={
+        'check_in': min(booking.check_in for booking, _ in group),
+        'check_out': max(booking.check_out for booking, _ in group)
+    })
+
+
+class BatchPlanner:
+    def __init__(self, agent, concurrency: int = 4, window_days: int = 7):
+        """
+        Args:
+            agent: AIAgentService used to generate itineraries
+            concurrency: Booking pipelines allowed to run at once across all batches
+            window_days: Check-ins at most this many days apart share context
+        """
+        self.agent = agent
+        self.concurrency = concurrency
+        self.window_days = window_days
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.batches = 0
+        self.bookings = 0
+        self.groups = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.pregenerated = 0
+
+    async def run(self, items: List[BatchItem], free_text: Optional[str] = None,
+                  planning_mode: Optional[str] = None,
+                  lookup: Optional[Callable[..., Awaitable[Optional[AgentResponse]]]] = None
+                  ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Plan every booking, yielding events as results come in
+
+        Yields {"event": "groups", ...} first, then one "result" or "error"
+        per booking in completion order.
+
+        Args:
+            items: (BookingContext, Preferences) per booking
+            free_text: Free text shared by the batch
+            planning_mode: Day planning mode for every booking
+            lookup: Optional pre-generated itinerary lookup, tried before planning
+        """
+        groups = group_bookings(items, self.window_days)
+        self.batches += 1
+        self.bookings += len(items)
+        self.groups += len(groups)
+        yield {'event': 'groups', 'data': [
+            {
+                'destination': group[0][0].location,
+                'check_in': window_booking(group).check_in,
+                'check_out': window_booking(group).check_out,
+                'booking_ids': [booking.booking_id for booking, _ in group]
+            }
+            for group in groups
+        ]}
+
+        contexts: Dict[int, asyncio.Task] = {}
+
+        def group_context(index: int) -> asyncio.Task:
+            """The group's shared context gather, started by the first booking that needs it"""
+            if index not in contexts:
+                group = groups[index]
+                contexts[index] = asyncio.create_task(
+                    self.agent.gather_context(window_booking(group), group[0][1])
+                )
+            return contexts[index]
+
+        plans = [
+            asyncio.create_task(self._plan(booking, prefs, free_text, planning_mode,
+                                           lambda index=index: group_context(index), lookup))
+            for index, group in enumerate(groups)
+            for booking, prefs in group
+        ]
+
+        try:
+            for next_result in asyncio.as_completed(plans):
+                yield await next_result
+        finally:
+            # The client may have gone away; do not keep planning for nobody
+            pending = plans + list(contexts.values())
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _plan(self, booking: BookingContext, prefs: Preferences, free_text: Optional[str],
+                    planning_mode: Optional[str], context: Callable[[], "asyncio.Task"],
+                    lookup: Optional[Callable[..., Awaitable[Optional[AgentResponse]]]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            if lookup is not None:
+                itinerary = await lookup(booking, prefs, free_text, planning_mode)
+                if itinerary is not None:
+                    self.pregenerated += 1
+                    self.succeeded += 1
+                    return self._result(booking, itinerary, 'pregenerated', started)
+
+            # Gathering inside the pool keeps Tavily traffic bounded as well
+            async with self.semaphore:
+                try:
+                    # Shielded: one booking being cancelled must not cancel its group's gather
+                    context_data = await asyncio.shield(context())
+                except Exception as e:
+                    print(f"  ⚠ Shared context for {booking.location} failed: {e}, gathering per booking")
+                    context_data = None
+
+                async for event in self.agent.stream_itinerary(
+                    booking, prefs, free_text, planning_mode, context_data=context_data
+                ):
+                    if event['event'] == 'complete':
+                        self.succeeded += 1
+                        return self._result(booking, event['data'], 'generated', started)
+            raise RuntimeError("pipeline ended without an itinerary")
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ Batch itinerary for booking {booking.booking_id} failed: {e}")
+            return {'event': 'error', 'data': {'booking_id': booking.booking_id, 'detail': str(e)}}
+
+    @staticmethod
+    def _result(booking: BookingContext, itinerary: AgentResponse, source: str, started: float) -> Dict[str, Any]:
+        return {'event': 'result', 'data': {
+            'booking_id': booking.booking_id,
+            'source': source,
+            'elapsed_s': round(time.perf_counter() - started, 3),
+            'itinerary': itinerary
+        }}
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "window_days": self.window_days,
+            "batches": self.batches,
+            "bookings": self.bookings,
+            "groups": self.groups,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pregenerated": self.pregenerated
+        }
@@ -0,0 +1,150 @@
+"""
+Read-through booking cache
+Keeps booking context rows by booking_id so repeated concierge requests skip
+MySQL; entries are dropped as soon as a booking or property event arrives
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.single_flight import SingleFlight
+
+
+class BookingCache:
+    def __init__(self, ttl: float = 600, max_entries: int = 10000):
+        """
+        Args:
+            ttl: Seconds a row is served without an event; a safety net for
+                missed events, not the freshness mechanism
+            max_entries: LRU bound on cached bookings
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # property_id -> cached booking ids, for property events
+        self._by_property: Dict[int, Set[int]] = {}
+        self._flights = SingleFlight("booking_cache")
+        # Bumped by every invalidation; a fetch that overlapped one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.discarded_fills = 0
+
+    def _lookup(self, booking_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(booking_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(booking_id)
+            return None
+        self._entries.move_to_end(booking_id)
+        return entry[1]
+
+    def _store(self, row: Dict[str, Any], generation: int):
+        """Cache row unless an invalidation happened since its fetch started"""
+        if generation != self._generation:
+            self.discarded_fills += 1
+            return
+        booking_id = row['id']
+        self._remove(booking_id)
+        self._entries[booking_id] = (time.monotonic() + self.ttl, row)
+        if row.get('property_id') is not None:
+            self._by_property.setdefault(row['property_id'], set()).add(booking_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, booking_id: int):
+        entry = self._entries.pop(booking_id, None)
+        if entry is None:
+            return
+        property_id = entry[1].get('property_id')
+        bookings = self._by_property.get(property_id)
+        if bookings is not None:
+            bookings.discard(booking_id)
+            if not bookings:
+                del self._by_property[property_id]
+
+    async def get(self, booking_id: int,
+                  fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Return (row, cached) for booking_id, calling fetch on a miss
+
+        Concurrent misses for the same booking share one fetch. Missing
+        bookings are not cached.
+        """
+        row = self._lookup(booking_id)
+        if row is not None:
+            self.hits += 1
+            return row, True
+
+        self.misses += 1
+
+        async def fill():
+            generation = self._generation
+            row = await fetch()
+            if row:
+                self._store(row, generation)
+            return row
+
+        return await self._flights.do(str(booking_id), fill), False
+
+    async def get_many(self, booking_ids: List[int],
+                       fetch_many: Callable[[List[int]], Awaitable[List[Dict[str, Any]]]]
+                       ) -> Tuple[Dict[int, Dict[str, Any]], int]:
+        """
+        Return ({booking_id: row}, hits), fetching all misses with one fetch_many call
+        """
+        rows = {}
+        missing = []
+        for booking_id in booking_ids:
+            row = self._lookup(booking_id)
+            if row is None:
+                missing.append(booking_id)
+            else:
+                rows[booking_id] = row
+        self.hits += len(rows)
+        self.misses += len(missing)
+
+        if missing:
+            generation = self._generation
+            for row in await fetch_many(missing):
+                self._store(row, generation)
+                rows[row['id']] = row
+        return rows, len(booking_ids) - len(missing)
+
+    def invalidate_booking(self, booking_id: int):
+        self._generation += 1
+        self.invalidations += 1
+        self._remove(booking_id)
+
+    def invalidate_property(self, property_id: int):
+        self._generation += 1
+        self.invalidations += 1
+        for booking_id in list(self._by_property.get(property_id, ())):
+            self._remove(booking_id)
+
+    async def handle_event(self, event: Dict[str, Any]):
+        """BookingEventConsumer subscriber: drop whatever the event may have changed"""
+        if event['type'] == 'property_updated':
+            if event.get('property_id') is not None:
+                self.invalidate_property(event['property_id'])
+        elif event.get('booking_id') is not None:
+            self.invalidate_booking(event['booking_id'])
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flights.coalesced,
+            "invalidations": self.invalidations,
+            "discarded_fills": self.discarded_fills,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
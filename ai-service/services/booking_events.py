@@ -0,0 +1,222 @@
+"""
+Booking event feed
+Consumes booking/property events from the backend's Kafka topics, or from a
+file-based or in-process stand-in broker, and dispatches them to subscribers
+"""
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BOOKING_EVENTS_SOURCE = os.getenv('BOOKING_EVENTS_SOURCE', '').lower()
+BOOKING_EVENTS_TOPICS = [
+    topic.strip() for topic in os.getenv('BOOKING_EVENTS_TOPICS', 'booking-service').split(',') if topic.strip()
+]
+BOOKING_EVENTS_FILE = os.getenv('BOOKING_EVENTS_FILE', 'booking_events.jsonl')
+KAFKA_BROKERS = os.getenv('KAFKA_BROKERS', 'localhost:9092')
+KAFKA_GROUP_ID = os.getenv('KAFKA_GROUP_ID', 'ai-service')
+
+# Backend operations ("Booking-Created", "Put-Property", ...) mapped to event types
+EVENT_TYPES = {
+    'booking_created': 'booking_created',
+    'post_booking': 'booking_created',
+    'create_booking': 'booking_created',
+    'booking_accepted': 'booking_accepted',
+    'accept_booking': 'booking_accepted',
+    'booking_updated': 'booking_updated',
+    'put_booking': 'booking_updated',
+    'update_booking': 'booking_updated',
+    'booking_cancelled': 'booking_cancelled',
+    'cancel_booking': 'booking_cancelled',
+    'delete_booking': 'booking_cancelled',
+    'property_updated': 'property_updated',
+    'put_property': 'property_updated',
+    'update_property': 'property_updated',
+    'property_deleted': 'property_updated',
+    'delete_property': 'property_updated'
+}
+
+
+def parse_booking_event(raw: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalise a raw broker message into a booking event
+
+    Accepts the backend's {"operation": "...", "id": ..., "details": {...}}
+    messages as well as {"type": "...", "booking_id": ...}. Returns a dict
+    with type, booking_id, property_id and status, or None for messages that
+    are not booking/property events.
+    """
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(raw, dict):
+        return None
+
+    operation = str(raw.get('type') or raw.get('event') or raw.get('operation') or '')
+    operation = operation.strip().lower().replace('-', '_').replace(' ', '_')
+    event_type = EVENT_TYPES.get(operation)
+
+    details = raw.get('details') if isinstance(raw.get('details'), dict) else {}
+    status = str(raw.get('status') or details.get('status') or '').upper() or None
+
+    # A booking update that carries a status is really an accept or cancel
+    if event_type == 'booking_updated' and status in ('ACCEPTED', 'CANCELLED'):
+        event_type = 'booking_accepted' if status == 'ACCEPTED' else 'booking_cancelled'
+    if event_type is None:
+        return None
+
+    def as_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    if event_type == 'property_updated':
+        booking_id = None
+        property_id = as_int(raw.get('property_id') or raw.get('id') or details.get('id'))
+    else:
+        booking_id = as_int(raw.get('booking_id') or raw.get('id') or details.get('id'))
+        property_id = as_int(raw.get('property_id') or details.get('property_id'))
+
+    if booking_id is None and property_id is None:
+        return None
+
+    return {
+        'type': event_type,
+        'booking_id': booking_id,
+        'property_id': property_id,
+        'status': status
+    }
+
+
+class InProcessEventSource:
+    """In-memory stand-in broker; publish() from the same process"""
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    def publish(self, message: Any):
+        self._queue.put_nowait(message)
+
+    async def messages(self) -> AsyncIterator[Any]:
+        while True:
+            yield await self._queue.get()
+
+    async def close(self):
+        pass
+
+
+class FileEventSource:
+    """File-based stand-in broker: tails a JSON-lines file, one message per line"""
+
+    def __init__(self, path: str, poll_interval: float = 0.5, from_beginning: bool = True):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_beginning = from_beginning
+
+    async def messages(self) -> AsyncIterator[Any]:
+        position = 0
+        if not self.from_beginning and os.path.exists(self.path):
+            position = os.path.getsize(self.path)
+
+        while True:
+            lines = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    f.seek(position)
+                    chunk = f.read()
+                # Only consume complete lines; a partial last line is read next time
+                consumed = chunk.rfind('\n') + 1
+                lines = chunk[:consumed].splitlines()
+                position += len(chunk[:consumed].encode('utf-8'))
+
+            for line in lines:
+                if line.strip():
+                    yield line
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self):
+        pass
+
+
+class KafkaEventSource:
+    """Kafka consumer for the backend's topics (requires aiokafka)"""
+
+    def __init__(self, topics: List[str], brokers: str, group_id: str):
+        try:
+            from aiokafka import AIOKafkaConsumer
+        except ImportError:
+            raise RuntimeError("aiokafka is required for BOOKING_EVENTS_SOURCE=kafka (pip install aiokafka)")
+
+        self.consumer = AIOKafkaConsumer(*topics, bootstrap_servers=brokers, group_id=group_id)
+
+    async def messages(self) -> AsyncIterator[Any]:
+        await self.consumer.start()
+        async for message in self.consumer:
+            yield message.value
+
+    async def close(self):
+        await self.consumer.stop()
+
+
+def create_event_source():
+    """Build the event source selected by BOOKING_EVENTS_SOURCE, or None when disabled"""
+    if BOOKING_EVENTS_SOURCE == 'kafka':
+        return KafkaEventSource(BOOKING_EVENTS_TOPICS, KAFKA_BROKERS, KAFKA_GROUP_ID)
+    if BOOKING_EVENTS_SOURCE == 'file':
+        return FileEventSource(BOOKING_EVENTS_FILE)
+    if BOOKING_EVENTS_SOURCE == 'memory':
+        return InProcessEventSource()
+    return None
+
+
+class BookingEventConsumer:
+    """Reads an event source and fans parsed booking events out to subscribers"""
+
+    def __init__(self, source):
+        self.source = source
+        self.subscribers: List[Callable[[Dict[str, Any]], Awaitable[None]]] = []
+        self.received = 0
+        self.dispatched = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+        self.subscribers.append(handler)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        print(f"✅ Booking event consumer started ({type(self.source).__name__})")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.source.close()
+
+    async def _run(self):
+        async for message in self.source.messages():
+            self.received += 1
+            event = parse_booking_event(message)
+            if event is None:
+                continue
+            self.dispatched += 1
+            for handler in self.subscribers:
+                try:
+                    await handler(event)
+                except Exception as e:
+                    print(f"⚠ Booking event handler failed for {event}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "source": type(self.source).__name__,
+            "received": self.received,
+            "dispatched": self.dispatched
+        }
@@ -0,0 +1,122 @@
+"""
+Disk-backed TTL cache on SQLite
+Survives restarts, bounded by entry count with least-recently-used eviction
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+
+class SQLiteTTLCache:
+    def __init__(self, path: str, max_entries: int = 5000, name: str = "cache"):
+        """
+        Args:
+            path: SQLite file to store entries in (created if missing)
+            max_entries: LRU bound; least recently read entries are evicted past it
+            name: Label used in log output and stats
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at as time.time()), or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a JSON-serialisable value for ttl seconds"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones past max_entries"""
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def delete(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
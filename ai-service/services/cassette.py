@@ -0,0 +1,193 @@
+"""
+Record/replay cassette for external calls
+Captures Tavily searches, Ollama generations, booking rows and incoming
+concierge requests with their timings, and serves them back offline
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "record", "replay", or empty to disable
+CASSETTE_MODE = os.getenv('CASSETTE_MODE', '').lower()
+CASSETTE_PATH = os.getenv(
+    'CASSETTE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'cassette.jsonl.gz')
+)
+# Replay latency: 1 = as recorded, 10 = ten times faster, 0 = no delay
+CASSETTE_SPEED = float(os.getenv('CASSETTE_SPEED', '1'))
+# When a prompt or query has changed since recording, fall back to the next
+# recorded response of the same call type instead of failing
+CASSETTE_FALLBACK = os.getenv('CASSETTE_FALLBACK', 'true').lower() == 'true'
+
+
+class CassetteMissError(KeyError):
+    """Replay found no recorded response for a call"""
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str, speed: float = 1.0, fallback: bool = True):
+        """
+        Args:
+            path: JSON-lines file, gzip-compressed when it ends in .gz
+            mode: "record" appends entries, "replay" serves them back
+            speed: Replay latency divisor (0 disables the delay)
+            fallback: In replay, serve a same-type response when the exact call was not recorded
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.fallback = fallback
+        self.started = time.monotonic()
+        self.recorded = 0
+        self.exact_hits = 0
+        self.fallback_hits = 0
+        self.misses = 0
+
+        # replay indexes: exact key -> entries in recorded order, kind/group -> entries
+        self._by_key: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._by_group: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self.requests: List[dict] = []
+
+        self._lock = threading.Lock()
+        self._file = None
+        if mode == 'record':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = self._open('at')
+        else:
+            self._load()
+
+    def _open(self, file_mode: str):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, file_mode, encoding='utf-8')
+        return open(self.path, file_mode, encoding='utf-8')
+
+    def _load(self):
+        with self._open('rt') as f:
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Half-written last line of a recording that was killed
+                        print(f"⚠ Cassette {self.path}: skipped a truncated entry")
+                        continue
+                    if entry['kind'] == 'request':
+                        self.requests.append(entry)
+                        continue
+                    self._by_key[entry['key']].append(entry)
+                    self._by_group[(entry['kind'], entry.get('group', ''))].append(entry)
+            except EOFError:
+                # gzip stream without its trailer: the recording was not closed
+                print(f"⚠ Cassette {self.path} was not closed cleanly, using the entries before the cut")
+        print(f"📼 Cassette loaded: {sum(len(q) for q in self._by_key.values())} responses, "
+              f"{len(self.requests)} requests from {self.path}")
+
+    @staticmethod
+    def make_key(kind: str, request: Dict[str, Any]) -> str:
+        payload = json.dumps({"kind": kind, "request": request}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, default=str, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            # Flushed per entry so a crashed recording is still readable
+            self._file.flush()
+            self.recorded += 1
+
+    def _next(self, queue: Deque[dict]) -> dict:
+        """Serve recorded responses in order, repeating the last one once exhausted"""
+        entry = queue[0]
+        if len(queue) > 1:
+            queue.popleft()
+        return entry
+
+    async def call(self, kind: str, group: str, request: Dict[str, Any],
+                   live: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Record or replay one external call
+
+        Args:
+            kind: tavily, ollama or booking
+            group: Call type used for fallback matching (Tavily category, LLM call type)
+            request: Everything that determines the response
+            live: The real call, used when recording
+        """
+        key = self.make_key(kind, request)
+        if self.mode == 'record':
+            started = time.monotonic()
+            response = await live()
+            self._write({
+                'kind': kind, 'group': group, 'key': key, 'request': request, 'response': response,
+                'offset': round(started - self.started, 4), 'elapsed': round(time.monotonic() - started, 4)
+            })
+            return response
+
+        queue = self._by_key.get(key)
+        if queue:
+            self.exact_hits += 1
+        elif self.fallback and self._by_group.get((kind, group)):
+            queue = self._by_group[(kind, group)]
+            self.fallback_hits += 1
+        else:
+            self.misses += 1
+            raise CassetteMissError(f"No recorded {kind} response for {group}: {json.dumps(request, default=str)[:120]}")
+
+        entry = self._next(queue)
+        if self.speed > 0 and entry['elapsed'] > 0:
+            await asyncio.sleep(entry['elapsed'] / self.speed)
+        return entry['response']
+
+    def record_request(self, endpoint: str, body: Dict[str, Any]):
+        """Log an incoming concierge request so a replay can re-drive the same traffic"""
+        if self.mode == 'record':
+            self._write({'kind': 'request', 'endpoint': endpoint, 'body': body,
+                         'offset': round(time.monotonic() - self.started, 4)})
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded": self.recorded,
+            "exact_hits": self.exact_hits,
+            "fallback_hits": self.fallback_hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette selected by CASSETTE_MODE, or None when disabled"""
+    global _cassette
+    if not CASSETTE_MODE:
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_SPEED, CASSETTE_FALLBACK)
+                print(f"📼 Cassette {CASSETTE_MODE} mode: {CASSETTE_PATH}")
+    return _cassette
@@ -0,0 +1,175 @@
+"""
+Destination-level context store
+Tavily results that depend only on the destination and month are fetched once
+and shared by every booking for that destination
+"""
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.single_flight import SingleFlight
+
+# Common shorthand for the same city
+LOCATION_ALIASES = {
+    'sf': 'san francisco',
+    'san fran': 'san francisco',
+    'nyc': 'new york',
+    'new york city': 'new york',
+    'la': 'los angeles',
+    'dc': 'washington',
+    'washington dc': 'washington',
+    'washington d c': 'washington',
+    'vegas': 'las vegas',
+    'philly': 'philadelphia'
+}
+
+
+# State and country spellings that name the same region
+US_STATES = {
+    'al': 'alabama', 'ak': 'alaska', 'az': 'arizona', 'ar': 'arkansas', 'ca': 'california',
+    'co': 'colorado', 'ct': 'connecticut', 'de': 'delaware', 'fl': 'florida', 'ga': 'georgia',
+    'hi': 'hawaii', 'id': 'idaho', 'il': 'illinois', 'in': 'indiana', 'ia': 'iowa',
+    'ks': 'kansas', 'ky': 'kentucky', 'la': 'louisiana', 'me': 'maine', 'md': 'maryland',
+    'ma': 'massachusetts', 'mi': 'michigan', 'mn': 'minnesota', 'ms': 'mississippi', 'mo': 'missouri',
+    'mt': 'montana', 'ne': 'nebraska', 'nv': 'nevada', 'nh': 'new hampshire', 'nj': 'new jersey',
+    'nm': 'new mexico', 'ny': 'new york', 'nc': 'north carolina', 'nd': 'north dakota', 'oh': 'ohio',
+    'ok': 'oklahoma', 'or': 'oregon', 'pa': 'pennsylvania', 'ri': 'rhode island', 'sc': 'south carolina',
+    'sd': 'south dakota', 'tn': 'tennessee', 'tx': 'texas', 'ut': 'utah', 'vt': 'vermont',
+    'va': 'virginia', 'wa': 'washington', 'wv': 'west virginia', 'wi': 'wisconsin', 'wy': 'wyoming',
+    'dc': 'district of columbia', 'd c': 'district of columbia'
+}
+COUNTRY_ALIASES = {
+    'us': 'united states', 'u s': 'united states', 'usa': 'united states', 'u s a': 'united states',
+    'united states of america': 'united states', 'america': 'united states',
+    'uk': 'united kingdom', 'u k': 'united kingdom', 'gb': 'united kingdom', 'great britain': 'united kingdom',
+    'uae': 'united arab emirates', 'holland': 'netherlands', 'the netherlands': 'netherlands',
+    'deutschland': 'germany', 'espana': 'spain', 'italia': 'italy'
+}
+REGION_ALIASES = {**US_STATES, **COUNTRY_ALIASES}
+
+# Well-known destinations a bare city name or a country-only region almost
+# always means: city -> (region, country). Ambiguous names (Portland,
+# Springfield) are deliberately absent and key on the city alone.
+KNOWN_CITY_REGIONS = {
+    'san francisco': ('california', 'united states'),
+    'los angeles': ('california', 'united states'),
+    'san diego': ('california', 'united states'),
+    'new york': ('new york', 'united states'),
+    'washington': ('district of columbia', 'united states'),
+    'las vegas': ('nevada', 'united states'),
+    'philadelphia': ('pennsylvania', 'united states'),
+    'chicago': ('illinois', 'united states'),
+    'seattle': ('washington', 'united states'),
+    'austin': ('texas', 'united states'),
+    'boston': ('massachusetts', 'united states'),
+    'miami': ('florida', 'united states'),
+    'paris': ('france', 'france'),
+    'london': ('united kingdom', 'united kingdom'),
+    'tokyo': ('japan', 'japan'),
+    'rome': ('italy', 'italy'),
+    'barcelona': ('spain', 'spain'),
+    'lisbon': ('portugal', 'portugal'),
+    'amsterdam': ('netherlands', 'netherlands'),
+    'berlin': ('germany', 'germany')
+}
+
+
+def _normalize_part(part: str) -> str:
+    part = unicodedata.normalize('NFKD', part).encode('ascii', 'ignore').decode('ascii')
+    part = re.sub(r'[^a-z0-9 ]+', ' ', part.lower())
+    return ' '.join(part.split())
+
+
+def normalize_location(location: str) -> str:
+    """
+    Canonical destination key for a free-form location string
+
+    The city (before the first comma) and the most specific region after it
+    are stripped of accents, case and punctuation, with city aliases and
+    state/country abbreviations resolved, so "San Francisco, CA",
+    "san francisco, California, USA" and "SF" share "san francisco|california"
+    while "Portland, OR" and "Portland, ME" stay apart. A bare city (or one
+    given only its country) takes its region from KNOWN_CITY_REGIONS, and
+    keys on the city alone when it is not listed there.
+    """
+    parts = [_normalize_part(part) for part in (location or '').split(',')]
+    city = LOCATION_ALIASES.get(parts[0], parts[0])
+    regions = [REGION_ALIASES.get(part, part) for part in parts[1:] if part]
+    known_region, known_country = KNOWN_CITY_REGIONS.get(city, (None, None))
+    if known_region and (not regions or regions[0] == known_country):
+        return f"{city}|{known_region}"
+    return f"{city}|{regions[0]}" if regions else city
+
+
+def merge_results(*result_lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Concatenate result lists in order, dropping repeats of the same URL or title"""
+    merged = []
+    seen = set()
+    for results in result_lists:
+        for result in results:
+            identity = result.get('url') or result.get('title')
+            if identity in seen:
+                continue
+            seen.add(identity)
+            merged.append(result)
+    return merged
+
+
+class DestinationContextStore:
+    def __init__(self, ttl: float = 6 * 3600, max_entries: int = 2000):
+        """
+        Args:
+            ttl: Seconds a destination entry stays fresh
+            max_entries: LRU bound on stored entries
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._flights = SingleFlight("destination_context")
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, destination: str, month: str, category: str, variant: str,
+                           fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Return shared results for (destination, month, category, variant)
+
+        Concurrent misses for the same key share a single fetch. Empty results
+        are not stored, so a failed lookup is retried by the next request.
+        """
+        key = (destination, month, category, variant)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+
+        async def fill():
+            results = await fetch()
+            if results:
+                self._entries[key] = (time.monotonic() + self.ttl, results)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return results
+
+        return await self._flights.do("|".join(key), fill)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "destinations": len({key[0] for key in self._entries}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flights.coalesced,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,128 @@
+"""
+Background job queue for itinerary generation
+A bounded pool of asyncio workers drains the queue; finished jobs are kept for a TTL
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class ItineraryJob:
+    """One queued itinerary request and its progress"""
+
+    def __init__(self, run: Callable[["ItineraryJob"], Awaitable[Any]]):
+        self.job_id = uuid.uuid4().hex
+        self.run = run
+        self.status = "queued"
+        self.stage = "queued"
+        self.total_days: Optional[int] = None
+        self.days_completed = 0
+        self.current_day: Optional[int] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+
+    def update(self, stage: Optional[str] = None, **fields):
+        """Record progress; called by the job's runner"""
+        if stage is not None:
+            self.stage = stage
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.updated_at = datetime.now()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "total_days": self.total_days,
+            "days_completed": self.days_completed,
+            "current_day": self.current_day,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class JobManager:
+    def __init__(self, workers: int = 2, result_ttl: float = 3600, max_queue: int = 100):
+        """
+        Args:
+            workers: Number of jobs processed concurrently
+            result_ttl: Seconds a finished job stays retrievable
+            max_queue: Queued jobs accepted before submit() refuses new ones
+        """
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.queue: "asyncio.Queue[ItineraryJob]" = asyncio.Queue(maxsize=max_queue)
+        self.jobs: Dict[str, ItineraryJob] = {}
+        self._tasks = []
+
+    def start(self):
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+        print(f"✅ Job manager started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, run: Callable[[ItineraryJob], Awaitable[Any]]) -> ItineraryJob:
+        """Queue a job; run(job) is awaited by a worker and its return value stored as the result"""
+        self._prune()
+        job = ItineraryJob(run)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.queue.maxsize} jobs waiting)")
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ItineraryJob]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        """Forget finished jobs older than result_ttl"""
+        cutoff = time.monotonic() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            job.update(status="running", stage="starting")
+            try:
+                result = await job.run(job)
+                job.update(status="completed", stage="completed", result=result)
+            except asyncio.CancelledError:
+                job.update(status="failed", error="Job cancelled during shutdown")
+                raise
+            except Exception as e:
+                print(f"❌ Job {job.job_id} failed: {e}")
+                detail = getattr(e, "detail", None) or str(e)
+                job.update(status="failed", error=detail)
+            finally:
+                job.finished_at = time.monotonic()
+                self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self.queue.qsize(), "jobs": counts}
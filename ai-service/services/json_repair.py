@@ -0,0 +1,276 @@
+"""
+Tolerant JSON parsing for LLM output
+Recovers truncated or slightly malformed JSON instead of discarding the whole
+generation: closes unterminated arrays and objects, drops broken elements and
+the one element the input was cut inside, and reports every repair it made
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_LITERALS = {
+    'true': True, 'false': False, 'null': None,
+    # Python spellings models sometimes produce
+    'True': True, 'False': False, 'None': None
+}
+_WHITESPACE = ' \t\r\n'
+# A quote followed by one of these (after whitespace) ends a string;
+# anything else means the model forgot to escape it
+_STRING_END_FOLLOWERS = ',:}]'
+
+
+class _Truncated(Exception):
+    """The input ended inside a value"""
+
+
+class _Broken(Exception):
+    """A value that cannot be parsed where it stands"""
+
+
+class _RepairParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repairs: List[str] = []
+        # Set once the input is found to end inside a value
+        self.truncated = False
+        # Set once the element the cut fell inside has been dropped; the
+        # arrays and objects around it are then only closed, not dropped
+        self.cut_handled = False
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def _at_end(self) -> bool:
+        return self.pos >= len(self.text)
+
+    def parse_value(self, path: str) -> Any:
+        char = self._peek()
+        if not char:
+            raise _Truncated()
+        if char == '{':
+            return self._parse_object(path)
+        if char == '[':
+            return self._parse_array(path)
+        if char == '"':
+            return self._parse_string(path)
+        if char == '-' or char.isdigit():
+            return self._parse_number()
+        return self._parse_literal(path)
+
+    def _parse_object(self, path: str) -> dict:
+        self.pos += 1
+        result = {}
+        while True:
+            char = self._peek()
+            if not char:
+                self.truncated = True
+                self.repairs.append(f"closed truncated object at {path or '$'}")
+                return result
+            if char == '}':
+                self.pos += 1
+                return result
+            if char == ',':
+                self.pos += 1
+                self.repairs.append(f"removed stray comma in {path or '$'}")
+                continue
+            if char != '"':
+                self.repairs.append(f"dropped unparseable member in {path or '$'}")
+                self._skip_broken('}')
+                continue
+
+            key = None
+            try:
+                key = self._parse_string(path)
+                if self._peek() != ':':
+                    if self._at_end():
+                        raise _Truncated()
+                    raise _Broken()
+                self.pos += 1
+                value = self.parse_value(f"{path}.{key}")
+            except _Truncated:
+                self.truncated = True
+                self.repairs.append(f"dropped truncated member {path}.{key or '?'}")
+                return result
+            except _Broken:
+                self.repairs.append(f"dropped unparseable member {path}.{key or '?'}")
+                self._skip_broken('}')
+                continue
+
+            result[key] = value
+            self._after_member(path, '}')
+
+    def _parse_array(self, path: str) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            char = self._peek()
+            if not char:
+                # Cut between elements: every element so far is complete
+                self.truncated = True
+                self.cut_handled = True
+                self.repairs.append(f"closed truncated array at {path or '$'}")
+                return result
+            if char == ']':
+                self.pos += 1
+                return result
+            if char == ',':
+                self.pos += 1
+                self.repairs.append(f"removed stray comma in {path or '$'}")
+                continue
+
+            element_path = f"{path}[{len(result)}]"
+            try:
+                value = self.parse_value(element_path)
+            except _Truncated:
+                self.truncated = True
+                self.cut_handled = True
+                self.repairs.append(f"dropped truncated element {element_path}")
+                return result
+            except _Broken:
+                self.repairs.append(f"dropped unparseable element {element_path}")
+                self._skip_broken(']')
+                continue
+
+            if self.truncated and not self.cut_handled:
+                # The input ended inside this element and nothing deeper was
+                # dropped: it is incomplete even though its first members parsed
+                self.cut_handled = True
+                self.repairs.append(f"dropped truncated element {element_path}")
+                return result
+            result.append(value)
+            self._after_member(path, ']')
+
+    def _after_member(self, path: str, closer: str):
+        """Consume the separator after a member, repairing trailing and missing commas"""
+        char = self._peek()
+        if char == ',':
+            self.pos += 1
+            if self._peek() == closer:
+                self.repairs.append(f"removed trailing comma in {path or '$'}")
+        elif char and char != closer:
+            # Two members back to back: act as if the comma was there
+            self.repairs.append(f"inserted missing comma in {path or '$'}")
+
+    def _skip_broken(self, closer: str):
+        """Skip to the next separator or the closing bracket of the current container"""
+        depth = 0
+        in_string = False
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if in_string:
+                if char == '\\':
+                    self.pos += 1
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                if depth == 0:
+                    return
+                depth -= 1
+            elif char == ',' and depth == 0:
+                self.pos += 1
+                return
+            self.pos += 1
+
+    def _parse_string(self, path: str) -> str:
+        self.pos += 1
+        chunks = []
+        while True:
+            if self._at_end():
+                raise _Truncated()
+            char = self.text[self.pos]
+            if char == '\\':
+                if self.pos + 1 >= len(self.text):
+                    raise _Truncated()
+                chunks.append(self.text[self.pos:self.pos + 2])
+                self.pos += 2
+                continue
+            if char == '"':
+                follower = self.pos + 1
+                while follower < len(self.text) and self.text[follower] in _WHITESPACE:
+                    follower += 1
+                if follower >= len(self.text) or self.text[follower] in _STRING_END_FOLLOWERS:
+                    self.pos += 1
+                    break
+                self.repairs.append(f"escaped stray quote in {path or '$'}")
+                chunks.append('\\"')
+                self.pos += 1
+                continue
+            chunks.append(char)
+            self.pos += 1
+
+        raw = ''.join(chunks)
+        try:
+            # strict=False accepts raw newlines and tabs inside the string
+            return json.loads(f'"{raw}"', strict=False)
+        except json.JSONDecodeError:
+            self.repairs.append(f"kept invalid escape sequence in {path or '$'}")
+            return raw.replace('\\"', '"')
+
+    def _parse_number(self) -> Any:
+        match = _NUMBER.match(self.text, self.pos)
+        if not match:
+            raise _Truncated() if self.pos + 1 >= len(self.text) else _Broken()
+        self.pos = match.end()
+        if self._at_end():
+            # The number may have been cut short
+            raise _Truncated()
+        token = match.group()
+        return float(token) if any(c in token for c in '.eE') else int(token)
+
+    def _parse_literal(self, path: str) -> Any:
+        for word, value in _LITERALS.items():
+            if self.text.startswith(word, self.pos):
+                self.pos += len(word)
+                if word[0].isupper():
+                    self.repairs.append(f"replaced Python literal {word} in {path or '$'}")
+                return value
+            remainder = self.text[self.pos:]
+            if remainder and word.startswith(remainder):
+                raise _Truncated()
+        raise _Broken()
+
+
+def repair_json(text: str, expect: Optional[str] = None) -> Tuple[Any, List[str]]:
+    """
+    Parse the first JSON object or array in text, repairing what it can
+
+    When the input was cut off, only the innermost array element the cut
+    fell inside is dropped; the objects and arrays around it keep their
+    complete members.
+
+    Args:
+        text: LLM response, possibly with prose or code fences around the JSON
+        expect: "object" to start at the first "{" (so a bracket in leading
+            prose is skipped), "array" for the first "[", None for whichever
+            comes first
+
+    Returns:
+        (value, repairs) where repairs describes each fix, empty when the
+        JSON was already valid
+
+    Raises:
+        ValueError: no object or array in the text
+    """
+    openers = {'object': '{', 'array': '['}.get(expect, '{[')
+    starts = [index for index in (text.find(opener) for opener in openers) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object found in LLM response")
+
+    parser = _RepairParser(text)
+    parser.pos = min(starts)
+    try:
+        value = parser.parse_value('')
+    except (_Truncated, _Broken):
+        raise ValueError("No JSON object found in LLM response")
+    return value, parser.repairs
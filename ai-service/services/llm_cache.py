@@ -0,0 +1,88 @@
+"""
+Content-addressed cache for LLM generations
+In-memory LRU tier in front of a disk tier (SQLiteTTLCache)
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cache_store import SQLiteTTLCache
+
+
+class LLMResponseCache:
+    def __init__(self, path: str, ttl: float, memory_entries: int = 256, disk_entries: int = 5000):
+        """
+        Args:
+            path: SQLite file for the disk tier
+            ttl: Seconds a generation stays valid
+            memory_entries: Size of the in-memory LRU tier
+            disk_entries: LRU bound of the disk tier
+        """
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        # key -> (expires_at, response); expires_at is time.time(), as on disk
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.disk = SQLiteTTLCache(path, disk_entries, name="llm")
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, options: Dict[str, Any], prompt: str) -> str:
+        """Hash of model name, generation options and the rendered prompt"""
+        payload = json.dumps(
+            {"model": model, "options": options, "prompt": prompt},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._memory[key]
+
+        entry = await asyncio.to_thread(self.disk.get_entry, key)
+        if entry is not None:
+            response, expires_at = entry
+            self.disk_hits += 1
+            # Promoted with the disk entry's own expiry, not a fresh TTL
+            self._remember(key, response, expires_at)
+            return response
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, response: str):
+        self._remember(key, response, time.time() + self.ttl)
+        await asyncio.to_thread(self.disk.set, key, response, self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "disk": self.disk.stats()
+        }
+
+    def close(self):
+        self.disk.close()
@@ -0,0 +1,337 @@
+"""
+Pipeline metrics in the Prometheus text exposition format
+Counters, gauges and histograms with labels, no external dependencies
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def items(self) -> List[Tuple[Dict[str, str], float]]:
+        """Every label set with its current value"""
+        with self._lock:
+            return [(dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # per label set: [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        if not self.labelnames:
+            self._values[()] = [0] * len(self.buckets) + [0.0, 0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed seconds of its block"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for index, bound in enumerate(self.buckets):
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {int(state[index])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(state[-1])}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# ============================================
+# PIPELINE METRICS
+# ============================================
+
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "concierge_http_requests_in_flight", "HTTP requests currently being served"
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "concierge_http_request_seconds", "HTTP request latency", ("method", "path", "status")
+))
+DB_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "concierge_db_fetch_seconds", "Booking lookup latency, including thread-pool wait", ("outcome",)
+))
+TAVILY_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "concierge_tavily_request_seconds", "Tavily search latency per category", ("category", "source", "outcome")
+))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "concierge_llm_call_seconds", "LLM generation latency per pipeline step", ("call_type", "source", "outcome")
+))
+LLM_PROMPT_EVAL_TOKENS = REGISTRY.register(Counter(
+    "concierge_llm_prompt_eval_tokens_total", "Prompt tokens Ollama evaluated (cached prefix tokens excluded)",
+    ("call_type",)
+))
+LLM_GENERATED_TOKENS = REGISTRY.register(Counter(
+    "concierge_llm_generated_tokens_total", "Tokens Ollama generated", ("call_type",)
+))
+MODEL_RESIDENT = REGISTRY.register(Gauge(
+    "concierge_model_resident", "1 while the Ollama model is loaded and the service is ready"
+))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "concierge_model_load_seconds", "How long the last Ollama model load took"
+))
+LLM_PARSE_TOTAL = REGISTRY.register(Counter(
+    "concierge_llm_parse_total", "Structured LLM response parse results", ("call_type", "outcome")
+))
+
+# Parse outcomes where the generation's content was lost
+PARSE_FAILURE_OUTCOMES = ("decode_error", "no_json")
+EVENT_LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "concierge_event_loop_lag_seconds", "Delay between a scheduled wake-up and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+))
+EVENT_LOOP_LAG_LAST = REGISTRY.register(Gauge(
+    "concierge_event_loop_lag_last_seconds", "Most recent event-loop lag sample"
+))
+THREAD_POOL_WORKERS = REGISTRY.register(Gauge(
+    "concierge_thread_pool_max_workers", "Size of the default thread pool used for blocking calls"
+))
+THREAD_POOL_ACTIVE = REGISTRY.register(Gauge(
+    "concierge_thread_pool_active", "Blocking calls currently running in the thread pool"
+))
+THREAD_POOL_QUEUED = REGISTRY.register(Gauge(
+    "concierge_thread_pool_queued", "Blocking calls waiting for a free thread"
+))
+THREAD_POOL_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "concierge_thread_pool_wait_seconds", "Time a blocking call waited for a free thread",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+))
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor reporting active and queued work, used as the loop's default executor"""
+
+    def __init__(self, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        THREAD_POOL_WORKERS.set(self._max_workers)
+
+    def submit(self, fn, *args, **kwargs):
+        queued_at = time.perf_counter()
+        THREAD_POOL_QUEUED.inc()
+
+        def run():
+            THREAD_POOL_QUEUED.dec()
+            THREAD_POOL_ACTIVE.inc()
+            THREAD_POOL_WAIT_SECONDS.observe(time.perf_counter() - queued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                THREAD_POOL_ACTIVE.dec()
+
+        return super().submit(run)
+
+
+def parse_summary() -> Dict[str, dict]:
+    """Per call type: parse outcome counts and the share of generations that were lost"""
+    summary: Dict[str, dict] = {}
+    for labels, value in LLM_PARSE_TOTAL.items():
+        counts = summary.setdefault(labels["call_type"], {"outcomes": {}})["outcomes"]
+        counts[labels["outcome"]] = int(value)
+    for entry in summary.values():
+        total = sum(entry["outcomes"].values())
+        failed = sum(entry["outcomes"].get(outcome, 0) for outcome in PARSE_FAILURE_OUTCOMES)
+        entry["failure_rate"] = round(failed / total, 3) if total else 0.0
+    return summary
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Sample how late the loop wakes a sleeping task; run as a background task"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - started - interval)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting in-flight requests and timing them end to end
+
+    Runs around the whole ASGI call, so streamed responses stay in flight
+    until their last chunk is sent. Paths are labelled by route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"], path=_route_template(scope), status=str(status["code"])
+            )
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route ("/api/concierge/jobs/{job_id}"); unmatched paths share one label"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    method = scope.get("method")
+    candidates = [
+        route for route in getattr(scope.get("app"), "routes", [])
+        if getattr(route, "endpoint", None) is endpoint
+    ]
+    for route in candidates:
+        methods = getattr(route, "methods", None)
+        if not methods or method in methods:
+            return route.path
+    return candidates[0].path if candidates else "unmatched"
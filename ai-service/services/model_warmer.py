@@ -0,0 +1,156 @@
+"""
+Ollama model warm-up and keep-alive
+Loads the model before traffic arrives, keeps it resident while idle, and
+reports readiness for load balancers
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Union
+
+import httpx
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics import MODEL_RESIDENT, MODEL_LOAD_SECONDS
+
+
+def parse_keep_alive(value: str) -> Union[int, str]:
+    """Ollama accepts seconds as a number or a duration string ("30m", "-1" keeps it loaded forever)"""
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _model_names(name: str) -> set:
+    """Ollama reports "llama3.2" as "llama3.2:latest"; accept either spelling"""
+    return {name, name if ':' in name else f"{name}:latest"}
+
+
+class ModelWarmer:
+    def __init__(self, base_url: str, model: str, keep_alive: Union[int, str] = '30m',
+                 ping_interval: float = 240, retry_interval: float = 5, timeout: float = 300):
+        """
+        Args:
+            base_url: Ollama server URL
+            model: Model to keep loaded (OLLAMA_MODEL)
+            keep_alive: How long Ollama keeps the model loaded after each call
+            ping_interval: Ping after this many idle seconds so the model is not unloaded (0 disables)
+            retry_interval: Seconds between warm-up attempts while Ollama is unreachable
+            timeout: HTTP timeout for a load, which can take a while on cold disks
+        """
+        self.model = model
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.retry_interval = retry_interval
+        self.client = httpx.AsyncClient(base_url=base_url, timeout=timeout)
+
+        self.ready = False
+        self.load_seconds: Optional[float] = None
+        self.loaded_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.last_activity = time.monotonic()
+        self.pings = 0
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self):
+        """Note a real generation; the idle ping only fires when there were none"""
+        self.last_activity = time.monotonic()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        print(f"🔥 Warming up {self.model} (keep_alive={self.keep_alive})")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.client.aclose()
+
+    async def _load(self) -> float:
+        """
+        Ask Ollama to load the model; returns the load time in seconds
+
+        An empty prompt loads the model without generating anything.
+        """
+        started = time.perf_counter()
+        response = await self.client.post('/api/generate', json={
+            'model': self.model, 'prompt': '', 'keep_alive': self.keep_alive, 'stream': False
+        })
+        response.raise_for_status()
+        # load_duration (ns) is Ollama's own measurement; zero when it was already loaded
+        load_duration = response.json().get('load_duration')
+        self.touch()
+        return load_duration / 1e9 if load_duration else time.perf_counter() - started
+
+    async def is_resident(self) -> bool:
+        """True when /api/ps lists the model as loaded"""
+        response = await self.client.get('/api/ps')
+        response.raise_for_status()
+        names = _model_names(self.model)
+        return any(
+            entry.get('name') in names or entry.get('model') in names
+            for entry in response.json().get('models', [])
+        )
+
+    async def _warm_until_ready(self):
+        while True:
+            try:
+                load_seconds = await self._load()
+                if await self.is_resident():
+                    self.load_seconds = round(load_seconds, 3)
+                    self.loaded_at = datetime.now()
+                    self.ready = True
+                    self.last_error = None
+                    MODEL_RESIDENT.set(1)
+                    MODEL_LOAD_SECONDS.set(self.load_seconds)
+                    print(f"✅ Model {self.model} resident (load {self.load_seconds}s)")
+                    return
+                self.last_error = "model not listed by /api/ps after load"
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                print(f"⚠ Model warm-up failed: {self.last_error}, retrying in {self.retry_interval}s")
+            await asyncio.sleep(self.retry_interval)
+
+    async def _run(self):
+        await self._warm_until_ready()
+        if not self.ping_interval:
+            return
+
+        while True:
+            await asyncio.sleep(max(1.0, self.ping_interval - (time.monotonic() - self.last_activity)))
+            if time.monotonic() - self.last_activity < self.ping_interval:
+                continue
+            try:
+                if await self.is_resident():
+                    # Any request with keep_alive restarts Ollama's unload timer
+                    await self._load()
+                    self.pings += 1
+                    continue
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                print(f"⚠ Keep-warm ping failed: {self.last_error}")
+
+            # Evicted (or Ollama restarted): not ready until it is loaded again
+            self.ready = False
+            MODEL_RESIDENT.set(0)
+            self.reloads += 1
+            await self._warm_until_ready()
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "model": self.model,
+            "keep_alive": self.keep_alive,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "idle_seconds": round(time.monotonic() - self.last_activity, 1),
+            "keep_warm_pings": self.pings,
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        }
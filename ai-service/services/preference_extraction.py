@@ -0,0 +1,181 @@
+"""
+Free-text preference extraction
+Compiles a keyword lexicon into one word-bounded regex and turns a traveler's
+free text into a preference delta in a single pass
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import PartyType, Preferences
+
+# category -> canonical value -> keywords. Multi-word keywords match with any
+# run of spaces or hyphens between the words, and every keyword also matches
+# its common inflections (INFLECTIONS). Within "mobility" and "party" the first
+# listed value wins when several are mentioned.
+DEFAULT_LEXICON: Dict[str, Dict[str, List[str]]] = {
+    'dietary': {
+        'vegan': ['vegan'],
+        'vegetarian': ['vegetarian'],
+        'gluten-free': ['gluten free', 'celiac', 'coeliac'],
+        'halal': ['halal'],
+        'kosher': ['kosher'],
+        'dairy-free': ['dairy free', 'lactose intolerant']
+    },
+    'interests': {
+        'culture': ['culture', 'museum', 'art', 'history', 'historic'],
+        'food': ['food', 'foodie', 'restaurant', 'dining', 'cuisine'],
+        'nature': ['nature', 'outdoor', 'hike', 'hiking', 'park', 'beach'],
+        'adventure': ['adventure', 'thrill', 'sport'],
+        'relaxation': ['relax', 'relaxation', 'spa', 'calm', 'peaceful'],
+        'nightlife': ['nightlife', 'bar', 'club', 'clubbing', 'party'],
+        'shopping': ['shopping', 'mall', 'boutique']
+    },
+    'mobility': {
+        'wheelchair': ['wheelchair', 'accessible'],
+        'limited': ['limited mobility', 'no long walk', 'cannot walk far', "can't walk far"]
+    },
+    'party': {
+        'children': ['kid', 'child', 'children', 'toddler']
+    }
+}
+
+# Optional endings accepted after any keyword ("museums", "beaches", "relaxing")
+INFLECTIONS = ('s', 'es', 'ed', 'ing')
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return re.sub(r'[\s\-]+', ' ', keyword.strip().lower())
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """
+    One regex for many keywords, nested by shared prefix
+
+    "park", "party" and "peaceful" become p(?:ar(?:k|ty)|eaceful), so the
+    engine tries each character once instead of once per keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_regex(trie)
+
+
+def _node_regex(node: Dict[str, dict]) -> str:
+    branches = [
+        (r'[\s\-]+' if char == ' ' else re.escape(char)) + _node_regex(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    # Greedy, so the longest keyword wins ("children" over "child")
+    return '(?:' + '|'.join(branches) + ')' + ('?' if ends_here else '')
+
+
+class PreferenceDelta(BaseModel):
+    """What free text adds to the structured preferences and party"""
+    dietary_restrictions: List[str] = Field(default_factory=list)
+    interests: List[str] = Field(default_factory=list)
+    mobility_needs: Optional[str] = None
+    has_children: bool = False
+
+    def apply_to(self, preferences: Preferences) -> Preferences:
+        """Copy of preferences with the detected restrictions and interests added"""
+        update = {
+            'dietary_restrictions': preferences.dietary_restrictions + [
+                restriction for restriction in self.dietary_restrictions
+                if restriction not in preferences.dietary_restrictions
+            ],
+            'interests': preferences.interests + self.interests
+        }
+        if self.mobility_needs:
+            update['mobility_needs'] = self.mobility_needs
+        return preferences.model_copy(update=update)
+
+    def party_type(self, total_guests: int) -> PartyType:
+        """Split the booked guests; a mention of kids counts as one child"""
+        if self.has_children:
+            return PartyType(adults=max(1, total_guests - 1), children=1)
+        return PartyType(adults=total_guests)
+
+
+class PreferenceExtractor:
+    def __init__(self, lexicon: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        """
+        Args:
+            lexicon: category -> canonical value -> keywords, DEFAULT_LEXICON when omitted
+        """
+        self.lexicon = lexicon or DEFAULT_LEXICON
+        # normalized keyword -> (category, canonical value)
+        self._lookup: Dict[str, tuple] = {}
+        # category -> value -> position, for "first listed wins" categories
+        self._priority: Dict[str, Dict[str, int]] = {}
+        for category, values in self.lexicon.items():
+            self._priority[category] = {value: index for index, value in enumerate(values)}
+            for value, keywords in values.items():
+                for keyword in keywords:
+                    self._lookup[_normalize_keyword(keyword)] = (category, value)
+
+        # Matched against lowercased text: cheaper than re.IGNORECASE
+        suffixes = '|'.join(INFLECTIONS)
+        self.pattern = re.compile(rf"\b({_trie_regex(self._lookup)})(?:{suffixes})?\b")
+
+    def extract(self, text: Optional[str]) -> PreferenceDelta:
+        """Scan text once and return what it says about diet, interests, mobility and kids"""
+        found: Dict[str, List[str]] = {}
+        if text:
+            for keyword in set(self.pattern.findall(text.lower())):
+                # Single words match verbatim; phrases may have odd spacing or hyphens
+                category, value = self._lookup.get(keyword) or self._lookup[_normalize_keyword(keyword)]
+                values = found.setdefault(category, [])
+                if value not in values:
+                    values.append(value)
+
+        return PreferenceDelta(
+            dietary_restrictions=self._in_lexicon_order('dietary', found),
+            interests=self._in_lexicon_order('interests', found),
+            mobility_needs=self._first('mobility', found),
+            has_children=bool(found.get('party'))
+        )
+
+    def extract_batch(self, texts: Iterable[Optional[str]]) -> List[PreferenceDelta]:
+        """extract() over many texts, reusing the compiled pattern"""
+        return [self.extract(text) for text in texts]
+
+    def _in_lexicon_order(self, category: str, found: Dict[str, List[str]]) -> List[str]:
+        priority = self._priority.get(category, {})
+        return sorted(found.get(category, []), key=priority.get)
+
+    def _first(self, category: str, found: Dict[str, List[str]]) -> Optional[str]:
+        values = self._in_lexicon_order(category, found)
+        return values[0] if values else None
+
+
+_default_extractor: Optional[PreferenceExtractor] = None
+
+
+def get_extractor() -> PreferenceExtractor:
+    """Process-wide extractor for DEFAULT_LEXICON, compiled on first use"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = PreferenceExtractor()
+    return _default_extractor
+
+
+def extract_preferences(text: Optional[str]) -> PreferenceDelta:
+    return get_extractor().extract(text)
+
+
+def extract_preferences_batch(texts: Iterable[Optional[str]]) -> List[PreferenceDelta]:
+    return get_extractor().extract_batch(texts)
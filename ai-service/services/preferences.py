@@ -0,0 +1,46 @@
+"""
+Preference normalisation
+Equivalent preferences must render byte-identical prompts so cached generations can be reused
+"""
+from typing import List
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import Preferences
+
+BUDGET_ALIASES = {
+    'low': 'low', 'cheap': 'low', 'budget': 'low', 'affordable': 'low', '$': 'low',
+    'medium': 'medium', 'mid': 'medium', 'moderate': 'medium', 'average': 'medium', '$$': 'medium',
+    'high': 'high', 'luxury': 'high', 'expensive': 'high', 'premium': 'high', '$$$': 'high'
+}
+
+MOBILITY_ALIASES = {
+    '': 'none', 'none': 'none', 'no': 'none',
+    'limited': 'limited', 'limited mobility': 'limited',
+    'wheelchair': 'wheelchair', 'wheelchair accessible': 'wheelchair'
+}
+
+
+def _canonical_list(values: List[str]) -> List[str]:
+    """Lowercase, trim, drop empties and duplicates, sort"""
+    return sorted({v.strip().lower() for v in values if v and v.strip()})
+
+
+def normalize_preferences(prefs: Preferences) -> Preferences:
+    """
+    Return a canonical copy of prefs
+
+    - interests and dietary_restrictions are lowercased, deduplicated and sorted
+    - budget and mobility_needs are mapped onto their canonical values
+    """
+    budget = (prefs.budget or 'medium').strip().lower()
+    mobility = (prefs.mobility_needs or 'none').strip().lower()
+
+    return Preferences(
+        budget=BUDGET_ALIASES.get(budget, budget),
+        interests=_canonical_list(prefs.interests),
+        mobility_needs=MOBILITY_ALIASES.get(mobility, mobility),
+        dietary_restrictions=_canonical_list(prefs.dietary_restrictions)
+    )
@@ -0,0 +1,175 @@
+"""
+Itinerary pre-generation for new and accepted bookings
+Plans an itinerary with default preferences in the background so the
+concierge can answer instantly when the traveler asks for it
+"""
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.schemas import AgentRequest, AgentResponse, BookingContext, Preferences
+from services.cache_store import SQLiteTTLCache
+
+
+class PregenerationService:
+    def __init__(self, agent, build_inputs: Callable[[AgentRequest], Awaitable[Tuple[BookingContext, Preferences]]],
+                 store_path: str, ttl: float = 7 * 24 * 3600, workers: int = 1,
+                 idle_poll_interval: float = 1.0):
+        """
+        Args:
+            agent: AIAgentService used to generate itineraries
+            build_inputs: Turns an AgentRequest into (BookingContext, Preferences),
+                exactly as the interactive endpoint does
+            store_path: SQLite file holding pre-generated itineraries
+            ttl: Seconds a pre-generated itinerary stays servable
+            workers: Background generations allowed at once
+            idle_poll_interval: How often a waiting job rechecks for interactive traffic
+        """
+        self.agent = agent
+        self.build_inputs = build_inputs
+        self.store = SQLiteTTLCache(store_path, name="pregenerated")
+        self.ttl = ttl
+        self.idle_poll_interval = idle_poll_interval
+        self.queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self.workers = workers
+        # Queued but not yet started; a booking already generating can be queued again
+        self._pending = set()
+        # booking_id -> generations running, and changes seen while they ran
+        self._in_flight: Dict[int, int] = {}
+        self._versions: Dict[int, int] = {}
+        self._tasks = []
+        self.scheduled = 0
+        self.generated = 0
+        self.failed = 0
+        self.discarded = 0
+        self.served = 0
+
+    def start(self):
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def handle_event(self, event: Dict[str, Any]):
+        """BookingEventConsumer subscriber"""
+        booking_id = event.get('booking_id')
+        if booking_id is None:
+            return
+
+        if event['type'] in ('booking_created', 'booking_accepted'):
+            self.schedule(booking_id)
+        elif event['type'] in ('booking_updated', 'booking_cancelled'):
+            # Dates or guests may have changed; a stale plan must not be served,
+            # including one a running generation is about to store
+            if booking_id in self._in_flight:
+                self._versions[booking_id] = self._versions.get(booking_id, 0) + 1
+            await self.invalidate(booking_id)
+            if event['type'] == 'booking_updated':
+                self.schedule(booking_id)
+
+    def schedule(self, booking_id: int):
+        if booking_id in self._pending:
+            return
+        self._pending.add(booking_id)
+        self.queue.put_nowait(booking_id)
+        self.scheduled += 1
+        print(f"🗓 Scheduled itinerary pre-generation for booking {booking_id}")
+
+    async def invalidate(self, booking_id: int):
+        key = await asyncio.to_thread(self.store.get, self._booking_key(booking_id))
+        if key is not None:
+            await asyncio.to_thread(self.store.delete, key)
+        await asyncio.to_thread(self.store.delete, self._booking_key(booking_id))
+
+    async def lookup(self, booking_context: BookingContext, preferences: Preferences,
+                     free_text: Optional[str], planning_mode: Optional[str]) -> Optional[AgentResponse]:
+        """Return the pre-generated itinerary if it was planned for exactly this request"""
+        key = self.agent.request_key(booking_context, preferences, free_text, planning_mode)
+        stored = await asyncio.to_thread(self.store.get, key)
+        if stored is None:
+            return None
+        self.served += 1
+        return AgentResponse.model_validate(stored)
+
+    @staticmethod
+    def _booking_key(booking_id: int) -> str:
+        return f"booking:{booking_id}"
+
+    async def _wait_for_idle(self):
+        """Low priority: only start while no interactive pipeline is running"""
+        while self.agent.active_pipelines > 0:
+            await asyncio.sleep(self.idle_poll_interval)
+
+    async def _worker(self):
+        while True:
+            booking_id = await self.queue.get()
+            self._pending.discard(booking_id)
+            try:
+                await self._wait_for_idle()
+                if await self._generate(booking_id):
+                    self.generated += 1
+                else:
+                    self.discarded += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                detail = getattr(e, 'detail', None) or str(e)
+                print(f"⚠ Pre-generation for booking {booking_id} failed: {detail}")
+            finally:
+                self.queue.task_done()
+
+    async def _generate(self, booking_id: int) -> bool:
+        """
+        Plan and store the booking's itinerary
+
+        Returns False when the booking changed while it was being planned; the
+        plan is then dropped (an update has already queued a fresh run).
+        """
+        self._in_flight[booking_id] = self._in_flight.get(booking_id, 0) + 1
+        version = self._versions.get(booking_id, 0)
+        changed = lambda: self._versions.get(booking_id, 0) != version
+        try:
+            # Same defaults the interactive endpoint applies when no preferences are given
+            request = AgentRequest(booking_id=booking_id, user_id=0, free_text=None)
+            booking_context, preferences = await self.build_inputs(request)
+
+            print(f"🗓 Pre-generating itinerary for booking {booking_id}...")
+            itinerary = await self.agent.generate_itinerary(booking_context, preferences, None)
+            if changed():
+                print(f"⚠ Booking {booking_id} changed during pre-generation, discarding the plan")
+                return False
+
+            key = self.agent.request_key(booking_context, preferences, None, None)
+            await asyncio.to_thread(self.store.set, key, itinerary.model_dump(mode='json'), self.ttl)
+            await asyncio.to_thread(self.store.set, self._booking_key(booking_id), key, self.ttl)
+            if changed():
+                # The event's invalidation may have run before these writes landed
+                await self.invalidate(booking_id)
+                print(f"⚠ Booking {booking_id} changed during pre-generation, discarding the plan")
+                return False
+            print(f"✅ Pre-generated itinerary stored for booking {booking_id}")
+            return True
+        finally:
+            self._in_flight[booking_id] -= 1
+            if not self._in_flight[booking_id]:
+                del self._in_flight[booking_id]
+                self._versions.pop(booking_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "scheduled": self.scheduled,
+            "generated": self.generated,
+            "failed": self.failed,
+            "discarded": self.discarded,
+            "served": self.served
+        }
@@ -0,0 +1,52 @@
+"""
+Single-flight request coalescing
+Concurrent calls with the same key share one in-flight computation
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await func() once per key at a time
+
+        Callers arriving while a computation for key is running await that
+        computation and receive its result (or exception). The shared work is
+        shielded, so one caller going away does not cancel it for the others.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._inflight[key] = future
+        self.executed += 1
+
+        def forget(done: asyncio.Future):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Mark the outcome as observed even if every waiter went away
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(forget)
+        return await asyncio.shield(future)
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a computation for key is running right now"""
+        return key in self._inflight
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced
+        }
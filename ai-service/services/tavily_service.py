@@ -1,21 +1,134 @@
-from tavily import TavilyClient
+import httpx
+import asyncio
 import os
+import time
+import sys
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cache_store import SQLiteTTLCache
+from services.metrics import TAVILY_REQUEST_SECONDS
+from services.tracing import span
+from services.cassette import get_cassette
+
 load_dotenv()
 
 TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
+TAVILY_BASE_URL = os.getenv('TAVILY_BASE_URL', 'https://api.tavily.com')
+TAVILY_HTTP_TIMEOUT = float(os.getenv('TAVILY_HTTP_TIMEOUT', '30'))
+
+# Search result cache
+TAVILY_CACHE_ENABLED = os.getenv('TAVILY_CACHE_ENABLED', 'true').lower() == 'true'
+TAVILY_CACHE_PATH = os.getenv(
+    'TAVILY_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'tavily_cache.sqlite3')
+)
+TAVILY_CACHE_MAX_ENTRIES = int(os.getenv('TAVILY_CACHE_MAX_ENTRIES', '5000'))
+
+# Per-category TTLs in seconds: weather goes stale fast, venues and transit barely change
+TAVILY_CACHE_TTLS = {
+    'weather': float(os.getenv('TAVILY_CACHE_TTL_WEATHER', str(3 * 3600))),
+    'events': float(os.getenv('TAVILY_CACHE_TTL_EVENTS', str(24 * 3600))),
+    'restaurants': float(os.getenv('TAVILY_CACHE_TTL_RESTAURANTS', str(3 * 24 * 3600))),
+    'pois': float(os.getenv('TAVILY_CACHE_TTL_POIS', str(7 * 24 * 3600))),
+    'transportation': float(os.getenv('TAVILY_CACHE_TTL_TRANSPORTATION', str(7 * 24 * 3600)))
+}
 
 
 class TavilyService:
     def __init__(self):
-        if not TAVILY_API_KEY:
+        # Replaying a cassette needs no API access
+        self.cassette = get_cassette()
+        if not TAVILY_API_KEY and not (self.cassette and self.cassette.mode == 'replay'):
             raise ValueError("TAVILY_API_KEY not found in environment variables")
-        self.client = TavilyClient(api_key=TAVILY_API_KEY)
+        # One pooled async client per service so lookups share keep-alive connections
+        self.client = httpx.AsyncClient(base_url=TAVILY_BASE_URL, timeout=TAVILY_HTTP_TIMEOUT)
+        self.cache: Optional[SQLiteTTLCache] = None
+        # A cassette must see every search: cached ones would be missing from a recording
+        if TAVILY_CACHE_ENABLED and self.cassette is None:
+            self.cache = SQLiteTTLCache(TAVILY_CACHE_PATH, TAVILY_CACHE_MAX_ENTRIES, name="tavily")
+
+    async def close(self):
+        """Close the underlying HTTP client and cache"""
+        await self.client.aclose()
+        if self.cache:
+            self.cache.close()
+
+    @staticmethod
+    def _cache_key(query: str, max_results: int, search_depth: str) -> str:
+        """Normalise the query so case and spacing differences share an entry"""
+        normalized = " ".join(query.lower().split())
+        return f"{search_depth}|{max_results}|{normalized}"
+
+    async def _search(self, category: str, query: str, max_results: int,
+                      search_depth: str) -> List[Dict[str, Any]]:
+        """
+        Run a Tavily search through the result cache
+
+        Args:
+            category: Cache TTL bucket (weather, events, restaurants, pois, transportation)
+            query: Search query
+            max_results: Number of results requested
+            search_depth: basic or advanced
+        """
+        with span(f'tavily.{category}', query_chars=len(query)) as search_span:
+            if self.cache is not None:
+                key = self._cache_key(query, max_results, search_depth)
+                started = time.perf_counter()
+                cached = await asyncio.to_thread(self.cache.get, key)
+                TAVILY_REQUEST_SECONDS.observe(time.perf_counter() - started, category=category, source="cache",
+                                               outcome="miss" if cached is None else "hit")
+                if cached is not None:
+                    search_span.set(source='cache', results=len(cached))
+                    print(f"Cache hit ({category}): {query}")
+                    return cached
+
+            started = time.perf_counter()
+            try:
+                results = await self._fetch_recorded(category, query, max_results, search_depth)
+            except BaseException as e:
+                # Cancellation here means the lookup deadline expired
+                outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+                TAVILY_REQUEST_SECONDS.observe(time.perf_counter() - started, category=category, source="api", outcome=outcome)
+                raise
+            TAVILY_REQUEST_SECONDS.observe(time.perf_counter() - started, category=category, source="api", outcome="ok")
+            search_span.set(source='api', results=len(results))
+
+            # Empty result sets are usually transient, so keep asking for them
+            if self.cache is not None and results:
+                await asyncio.to_thread(self.cache.set, key, results, TAVILY_CACHE_TTLS[category])
+            return results
+
+    async def _fetch_recorded(self, category: str, query: str, max_results: int,
+                              search_depth: str) -> List[Dict[str, Any]]:
+        """Run the search through the record/replay cassette when one is active"""
+        if self.cassette is None:
+            return await self._fetch(query, max_results, search_depth)
+        return await self.cassette.call(
+            'tavily', category,
+            {'query': query, 'max_results': max_results, 'search_depth': search_depth},
+            lambda: self._fetch(query, max_results, search_depth)
+        )
+
+    async def _fetch(self, query: str, max_results: int, search_depth: str) -> List[Dict[str, Any]]:
+        """
+        Run a single Tavily search and return its results list
 
-    def search_local_events(self, location: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        Mirrors TavilyClient.search, but over a non-blocking HTTP client.
+        """
+        response = await self.client.post('/search', json={
+            "api_key": TAVILY_API_KEY,
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth
+        })
+        response.raise_for_status()
+        return response.json().get('results', [])
+
+    async def search_local_events(self, location: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """
         Search for local events in a location during specific dates
 
@@ -35,20 +148,14 @@ class TavilyService:
             query = f"events and festivals in {location} {start}"
             print(f"Searching events: {query}")
 
-            response = self.client.search(
-                query=query,
-                max_results=5,
-                search_depth="advanced"
-            )
-
-            return response.get('results', [])
+            return await self._search('events', query, max_results=5, search_depth="advanced")
         except Exception as e:
             print(f"Error searching local events: {e}")
             return []
 
-    def search_points_of_interest(self, location: str, interests: List[str],
-                                  has_children: bool = False,
-                                  needs_wheelchair: bool = False) -> List[Dict[str, Any]]:
+    async def search_points_of_interest(self, location: str, interests: List[str],
+                                        has_children: bool = False,
+                                        needs_wheelchair: bool = False) -> List[Dict[str, Any]]:
         """
         Search for tourist attractions and activities based on interests
 
@@ -76,19 +183,13 @@ class TavilyService:
             query = f"top {interest_str} attractions and activities in {location} {modifier_str}"
             print(f"Searching POIs: {query}")
 
-            response = self.client.search(
-                query=query,
-                max_results=10,
-                search_depth="advanced"
-            )
-
-            return response.get('results', [])
+            return await self._search('pois', query, max_results=10, search_depth="advanced")
         except Exception as e:
             print(f"Error searching POIs: {e}")
             return []
 
-    def search_restaurants(self, location: str, dietary_filters: List[str] = None,
-                           budget: str = "medium", has_children: bool = False) -> List[Dict[str, Any]]:
+    async def search_restaurants(self, location: str, dietary_filters: List[str] = None,
+                                 budget: str = "medium", has_children: bool = False) -> List[Dict[str, Any]]:
         """
         Search for restaurants with dietary options
 
@@ -121,18 +222,12 @@ class TavilyService:
 
             print(f"Searching restaurants: {query}")
 
-            response = self.client.search(
-                query=query,
-                max_results=8,
-                search_depth="advanced"
-            )
-
-            return response.get('results', [])
+            return await self._search('restaurants', query, max_results=8, search_depth="advanced")
         except Exception as e:
             print(f"Error searching restaurants: {e}")
             return []
 
-    def get_weather_forecast(self, location: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_weather_forecast(self, location: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """
         Get weather forecast for destination
 
@@ -151,18 +246,12 @@ class TavilyService:
             query = f"weather forecast {location} {start}"
             print(f"Searching weather: {query}")
 
-            response = self.client.search(
-                query=query,
-                max_results=3,
-                search_depth="basic"
-            )
-
-            return response.get('results', [])
+            return await self._search('weather', query, max_results=3, search_depth="basic")
         except Exception as e:
             print(f"Error getting weather: {e}")
             return []
 
-    def search_transportation(self, location: str) -> List[Dict[str, Any]]:
+    async def search_transportation(self, location: str) -> List[Dict[str, Any]]:
         """
         Search for local transportation options
 
@@ -176,57 +265,52 @@ class TavilyService:
             query = f"public transportation and getting around {location}"
             print(f"Searching transportation: {query}")
 
-            response = self.client.search(
-                query=query,
-                max_results=3,
-                search_depth="basic"
-            )
-
-            return response.get('results', [])
+            return await self._search('transportation', query, max_results=3, search_depth="basic")
         except Exception as e:
             print(f"Error searching transportation: {e}")
             return []
 
-    def test_search(self):
+    async def test_search(self):
         """Test the Tavily search functionality"""
         print("\n=== Testing Tavily Search ===\n")
 
         # Test 1: Local events
         print("1. Testing local events search...")
-        events = self.search_local_events("San Francisco", "2025-11-01", "2025-11-05")
+        events = await self.search_local_events("San Francisco", "2025-11-01", "2025-11-05")
         print(f"Found {len(events)} events")
         if events:
             print(f"Sample: {events[0].get('title', 'N/A')}")
 
         # Test 2: POIs
         print("\n2. Testing POIs search...")
-        pois = self.search_points_of_interest("San Francisco", ["culture", "food"], has_children=True)
+        pois = await self.search_points_of_interest("San Francisco", ["culture", "food"], has_children=True)
         print(f"Found {len(pois)} POIs")
         if pois:
             print(f"Sample: {pois[0].get('title', 'N/A')}")
 
         # Test 3: Restaurants
         print("\n3. Testing restaurant search...")
-        restaurants = self.search_restaurants("San Francisco", ["vegan", "gluten-free"], budget="medium")
+        restaurants = await self.search_restaurants("San Francisco", ["vegan", "gluten-free"], budget="medium")
         print(f"Found {len(restaurants)} restaurants")
         if restaurants:
             print(f"Sample: {restaurants[0].get('title', 'N/A')}")
 
         # Test 4: Weather
         print("\n4. Testing weather search...")
-        weather = self.get_weather_forecast("San Francisco", "2025-11-01", "2025-11-05")
+        weather = await self.get_weather_forecast("San Francisco", "2025-11-01", "2025-11-05")
         print(f"Found {len(weather)} weather results")
         if weather:
             print(f"Sample: {weather[0].get('title', 'N/A')[:100]}...")
 
         print("\n=== All tests completed ===\n")
+        await self.close()
 
 
 if __name__ == "__main__":
     # Test the service
     try:
         tavily_service = TavilyService()
-        tavily_service.test_search()
+        asyncio.run(tavily_service.test_search())
     except ValueError as e:
         print(f"Error: {e}")
         print("Please set TAVILY_API_KEY in your .env file")
\ No newline at end of file
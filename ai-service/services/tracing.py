@@ -0,0 +1,116 @@
+"""
+Per-request span recorder
+Times the stages of one request (DB, Tavily, Ollama, planning steps) and
+reports them as a Server-Timing header or a debug payload
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+
+# The recorder for the request being served. asyncio tasks copy the context
+# when they are created, so spans from parallel lookups and day plans land
+# in the same recorder as the request that started them.
+_current: ContextVar[Optional["SpanRecorder"]] = ContextVar('span_recorder', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'start', 'duration', 'attributes')
+
+    def __init__(self, name: str, start: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.duration: Optional[float] = None
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """Attach attributes (sizes, cache source, ...) once they are known"""
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Returned when no recorder is active; every call is a no-op"""
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanRecorder:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Finished spans in start order, offsets and durations in milliseconds"""
+        return [
+            {
+                'name': span.name,
+                'start_ms': round((span.start - self.started) * 1000, 2),
+                'duration_ms': round(span.duration * 1000, 2),
+                **span.attributes
+            }
+            for span in sorted(self.spans, key=lambda span: span.start)
+            if span.duration is not None
+        ]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per span plus the request total"""
+        entries = []
+        for span in self.to_list():
+            details = [f"{key}={value}" for key, value in span.items()
+                       if key not in ('name', 'start_ms', 'duration_ms')]
+            entry = f"{_token(span['name'])};dur={span['duration_ms']}"
+            if details:
+                entry += ';desc="' + " ".join(details).replace('"', "'") + '"'
+            entries.append(entry)
+        entries.append(f"total;dur={round((time.perf_counter() - self.started) * 1000, 2)}")
+        return ", ".join(entries)
+
+
+def _token(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9!#$%&'*+\-.^_`|~]", '_', name)
+
+
+def start_recording() -> Optional[SpanRecorder]:
+    """Attach a new recorder to the current request, or None when tracing is disabled"""
+    if not TRACING_ENABLED:
+        return None
+    recorder = SpanRecorder()
+    _current.set(recorder)
+    return recorder
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """
+    Time the enclosed block as one span of the current request
+
+    Yields an object whose set() adds attributes to the span. Outside a
+    recorded request this only costs a context variable lookup.
+    """
+    recorder = _current.get()
+    if recorder is None:
+        yield _NOOP_SPAN
+        return
+
+    current = Span(name, time.perf_counter(), attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        recorder.spans.append(current)
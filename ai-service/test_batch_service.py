@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import httpx
+
+from models.schemas import AgentResponse, BookingContext, PartyType, Preferences
+from services.batch_service import BatchPlanner, group_bookings
+
+
+def booking(booking_id, location="Paris, France", check_in="2025-11-01", children=0):
+    return BookingContext(booking_id=booking_id, location=location, check_in=check_in,
+                          check_out="2025-11-20", party_type=PartyType(adults=2, children=children))
+
+
+class FakeAgent:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.gathers = []
+
+    async def gather_context(self, booking, prefs):
+        self.gathers.append(booking.location)
+        return {}
+
+    async def stream_itinerary(self, booking, prefs, free_text=None, planning_mode=None, context_data=None):
+        await asyncio.sleep(0.01)
+        if booking.booking_id in self.failing:
+            raise RuntimeError("Ollama unavailable")
+        yield {'event': 'complete', 'data': AgentResponse(itinerary=[], packing_checklist=[], weather_summary="")}
+
+
+def group_ids(items, window_days=7):
+    return sorted(sorted(item[0].booking_id for item in group) for group in group_bookings(items, window_days))
+
+
+def test_grouping_keys():
+    food = Preferences(interests=["food"])
+    items = [
+        (booking(1, "Paris, France"), food),
+        (booking(2, "PARIS,  france"), Preferences(interests=["FOOD"])),
+        (booking(3, "Paris, TX"), food),
+        (booking(4, "Paris, France", children=1), food),
+        (booking(5, "Paris, France"), Preferences(interests=["culture"])),
+        (booking(6, "Paris, France", check_in="2025-11-06"), food),
+        (booking(7, "Paris, France", check_in="2025-11-09"), food)
+    ]
+
+    assert group_ids(items) == [[1, 2, 6], [3], [4], [5], [7]]
+
+
+def test_every_booking_gets_exactly_one_outcome():
+    agent = FakeAgent(failing={3})
+    planner = BatchPlanner(agent, concurrency=2)
+    items = [(booking(booking_id, "Lisbon, Portugal" if booking_id > 3 else "Paris, France"), Preferences())
+             for booking_id in range(1, 7)]
+
+    async def collect():
+        return [event async for event in planner.run(items)]
+
+    events = asyncio.run(collect())
+
+    outcomes = [(event['event'], event['data']['booking_id']) for event in events[1:]]
+    assert events[0]['event'] == 'groups'
+    assert sorted(booking_id for _, booking_id in outcomes) == [1, 2, 3, 4, 5, 6]
+    assert ('error', 3) in outcomes
+    assert sorted(agent.gathers) == ["Lisbon, Portugal", "Paris, France"]
+    assert (planner.succeeded, planner.failed) == (5, 1)
+
+
+def test_batch_endpoint_reports_missing_and_failed_bookings(monkeypatch):
+    import main
+    from benchmarks.booking_store import SQLiteBookingStore
+
+    store = SQLiteBookingStore(bookings=5)
+    agent = FakeAgent(failing={2})
+    monkeypatch.setattr(main, 'fetch_bookings_from_db', store.fetch_booking_contexts)
+    monkeypatch.setattr(main, 'agent_service', agent)
+    monkeypatch.setattr(main, 'batch_planner', BatchPlanner(agent))
+
+    async def post():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            response = await client.post('/api/concierge/batch', json={'booking_ids': [1, 2, 3, 99, 2], 'user_id': 1})
+            return [json.loads(line) for line in response.text.splitlines() if line]
+
+    events = asyncio.run(post())
+
+    outcomes = {}
+    for event in events:
+        if event['event'] in ('result', 'error'):
+            outcomes.setdefault(event['data']['booking_id'], []).append(event['event'])
+    assert outcomes == {1: ['result'], 2: ['error'], 3: ['result'], 99: ['error']}
+    assert events[0]['data']['missing'] == [99]
+    assert events[-1]['event'] == 'complete' and events[-1]['data']['failed'] == 2
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from models.schemas import AgentResponse, BookingContext, PartyType, Preferences
+from services.booking_cache import BookingCache
+from services.booking_events import (
+    BookingEventConsumer, FileEventSource, InProcessEventSource, parse_booking_event
+)
+from services.pregeneration_service import PregenerationService
+
+
+class FakeAgent:
+    """Stands in for AIAgentService: records calls, returns a fixed itinerary"""
+
+    def __init__(self):
+        self.active_pipelines = 0
+        self.calls = []
+
+    def request_key(self, booking, prefs, free_text, planning_mode):
+        return f"{booking.booking_id}|{booking.check_out}|{','.join(prefs.interests)}|{free_text}|{planning_mode}"
+
+    async def generate_itinerary(self, booking, prefs, free_text=None):
+        self.calls.append(booking.booking_id)
+        return AgentResponse(itinerary=[], packing_checklist=["Passport"], weather_summary="Sunny")
+
+
+async def fake_build_inputs(request):
+    booking = BookingContext(
+        booking_id=request.booking_id,
+        location="Paris",
+        check_in="2025-11-01",
+        check_out="2025-11-03",
+        party_type=PartyType(adults=2)
+    )
+    return booking, Preferences(interests=["culture", "food", "nature"])
+
+
+def test_parse_backend_messages():
+    assert parse_booking_event(json.dumps({"operation": "Booking-Created", "id": "7"})) == {
+        "type": "booking_created", "booking_id": 7, "property_id": None, "status": None
+    }
+    accepted = parse_booking_event({"operation": "Put-Booking", "id": 7, "details": {"status": "accepted"}})
+    assert accepted["type"] == "booking_accepted"
+    assert parse_booking_event({"operation": "Put-Property", "id": 3})["property_id"] == 3
+    assert parse_booking_event({"operation": "Get-Profile", "id": 1}) is None
+    assert parse_booking_event(b"not json") is None
+
+
+def test_pregenerates_and_serves_from_in_process_broker():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp:
+            agent = FakeAgent()
+            source = InProcessEventSource()
+            consumer = BookingEventConsumer(source)
+            pregeneration = PregenerationService(
+                agent, fake_build_inputs, os.path.join(tmp, "pregenerated.sqlite3"), idle_poll_interval=0.01
+            )
+            consumer.subscribe(pregeneration.handle_event)
+            pregeneration.start()
+            consumer.start()
+
+            source.publish({"operation": "Booking-Accepted", "id": 42})
+            source.publish({"operation": "Booking-Accepted", "id": 42})
+            await asyncio.sleep(0.1)
+            await pregeneration.queue.join()
+
+            booking, prefs = await fake_build_inputs(type("R", (), {"booking_id": 42})())
+            served = await pregeneration.lookup(booking, prefs, None, None)
+            other_prefs = await pregeneration.lookup(booking, Preferences(interests=["food"]), None, None)
+
+            source.publish({"operation": "Booking-Cancelled", "id": 42})
+            await asyncio.sleep(0.1)
+            after_cancel = await pregeneration.lookup(booking, prefs, None, None)
+
+            await consumer.stop()
+            await pregeneration.stop()
+            return agent.calls, served, other_prefs, after_cancel
+
+    calls, served, other_prefs, after_cancel = asyncio.run(scenario())
+    assert calls == [42]
+    assert served.packing_checklist == ["Passport"]
+    assert other_prefs is None
+    assert after_cancel is None
+
+
+def test_file_broker_reads_complete_lines():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.jsonl")
+            with open(path, "w") as f:
+                f.write(json.dumps({"operation": "Booking-Created", "id": 1}) + "\n")
+                f.write('{"operation": "Booking-Cre')
+
+            received = []
+
+            async def handler(event):
+                received.append(event["booking_id"])
+
+            consumer = BookingEventConsumer(FileEventSource(path, poll_interval=0.01))
+            consumer.subscribe(handler)
+            consumer.start()
+            await asyncio.sleep(0.05)
+            with open(path, "a") as f:
+                f.write('ated", "id": 2}\n')
+            await asyncio.sleep(0.05)
+            await consumer.stop()
+            return received
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_booking_cache_invalidated_by_events():
+    async def scenario():
+        rows = {1: {"id": 1, "property_id": 10, "status": "pending"},
+                2: {"id": 2, "property_id": 10, "status": "accepted"},
+                3: {"id": 3, "property_id": 20, "status": "accepted"}}
+        fetched = []
+
+        def fetch(booking_id):
+            async def fetch_row():
+                fetched.append(booking_id)
+                return dict(rows[booking_id])
+            return fetch_row
+
+        async def fetch_many(booking_ids):
+            fetched.extend(booking_ids)
+            return [dict(rows[booking_id]) for booking_id in booking_ids]
+
+        source = InProcessEventSource()
+        consumer = BookingEventConsumer(source)
+        cache = BookingCache(ttl=60)
+        consumer.subscribe(cache.handle_event)
+        consumer.start()
+
+        await cache.get_many([1, 2, 3], fetch_many)
+        _, cached = await cache.get(1, fetch(1))
+        assert cached and fetched == [1, 2, 3]
+
+        rows[1]["status"] = "accepted"
+        source.publish({"operation": "Booking-Accepted", "id": 1})
+        await asyncio.sleep(0.05)
+        row, cached = await cache.get(1, fetch(1))
+        assert not cached and row["status"] == "accepted"
+
+        source.publish({"operation": "Put-Property", "id": 10})
+        await asyncio.sleep(0.05)
+        found, hits = await cache.get_many([1, 2, 3], fetch_many)
+        await consumer.stop()
+        return fetched, sorted(found), hits
+
+    fetched, found, hits = asyncio.run(scenario())
+    assert fetched == [1, 2, 3, 1, 1, 2]
+    assert found == [1, 2, 3]
+    assert hits == 1
+
+
+def test_update_during_pregeneration_discards_the_stale_plan():
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp:
+            check_outs = {42: "2025-11-03"}
+            release = asyncio.Event()
+            agent = FakeAgent()
+            generate = agent.generate_itinerary
+
+            async def slow_generate(booking, prefs, free_text=None):
+                if len(agent.calls) == 0:
+                    await release.wait()
+                return await generate(booking, prefs, free_text)
+
+            agent.generate_itinerary = slow_generate
+
+            async def build_inputs(request):
+                booking, prefs = await fake_build_inputs(request)
+                return booking.model_copy(update={'check_out': check_outs[request.booking_id]}), prefs
+
+            source = InProcessEventSource()
+            consumer = BookingEventConsumer(source)
+            pregeneration = PregenerationService(
+                agent, build_inputs, os.path.join(tmp, "pregenerated.sqlite3"), idle_poll_interval=0.01
+            )
+            consumer.subscribe(pregeneration.handle_event)
+            pregeneration.start()
+            consumer.start()
+
+            source.publish({"operation": "Booking-Accepted", "id": 42})
+            await asyncio.sleep(0.05)
+            # Dates change while the first plan is still being generated
+            check_outs[42] = "2025-11-05"
+            source.publish({"operation": "Put-Booking", "id": 42})
+            await asyncio.sleep(0.05)
+            release.set()
+            await asyncio.sleep(0.05)
+            await pregeneration.queue.join()
+
+            old, prefs = await fake_build_inputs(type("R", (), {"booking_id": 42})())
+            new = old.model_copy(update={'check_out': "2025-11-05"})
+            stale = await pregeneration.lookup(old, prefs, None, None)
+            fresh = await pregeneration.lookup(new, prefs, None, None)
+
+            await consumer.stop()
+            await pregeneration.stop()
+            return agent.calls, pregeneration.stats(), stale, fresh
+
+    calls, stats, stale, fresh = asyncio.run(scenario())
+    assert calls == [42, 42]
+    assert (stats["generated"], stats["discarded"]) == (1, 1)
+    assert stale is None
+    assert fresh is not None
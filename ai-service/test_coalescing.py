@@ -0,0 +1,55 @@
+import asyncio
+
+from models.schemas import AgentResponse, BookingContext, PartyType, Preferences
+from services.agent_service import AIAgentService
+from services.single_flight import SingleFlight
+
+BOOKING = BookingContext(booking_id=1, location="Paris, France", check_in="2025-11-01",
+                         check_out="2025-11-03", party_type=PartyType(adults=2))
+
+
+def make_agent():
+    """Just the parts of AIAgentService that request coalescing uses"""
+    agent = object.__new__(AIAgentService)
+    agent.day_planning_mode = 'parallel'
+    agent.itinerary_flights = SingleFlight("itinerary")
+    agent.runs = 0
+
+    async def stream_itinerary(booking, prefs, free_text, planning_mode):
+        agent.runs += 1
+        await asyncio.sleep(0.05)
+        yield {'event': 'complete', 'data': AgentResponse(itinerary=[], packing_checklist=[free_text or ""],
+                                                          weather_summary="Sunny")}
+
+    agent.stream_itinerary = stream_itinerary
+    return agent
+
+
+def test_request_key_ignores_formatting_but_not_content():
+    agent = make_agent()
+    key = agent.request_key(BOOKING, Preferences(interests=["Food", "culture"]), "Museums  please", None)
+
+    assert key == agent.request_key(BOOKING, Preferences(interests=["culture", "food", "food"]), "museums please", "parallel")
+    assert key != agent.request_key(BOOKING, Preferences(interests=["culture", "food"]), "museums please", "whole_trip")
+    assert key != agent.request_key(BOOKING.model_copy(update={'check_out': "2025-11-04"}),
+                                    Preferences(interests=["culture", "food"]), "museums please", None)
+
+
+def test_identical_concurrent_requests_share_one_run():
+    agent = make_agent()
+
+    async def scenario():
+        leader = asyncio.ensure_future(agent.generate_itinerary(BOOKING, Preferences(interests=["food"]), "Kids"))
+        await asyncio.sleep(0)
+        followers = [agent.generate_itinerary(BOOKING, Preferences(interests=["FOOD"]), " kids ") for _ in range(3)]
+        other = agent.generate_itinerary(BOOKING, Preferences(interests=["food"]), "no kids")
+        # The first caller going away must not cancel the run the others wait on
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*followers, other)
+
+    results = asyncio.run(scenario())
+
+    assert agent.runs == 2
+    assert [result.packing_checklist for result in results] == [["Kids"]] * 3 + [["no kids"]]
+    assert agent.itinerary_flights.stats() == {"in_flight": 0, "executed": 2, "coalesced": 3}
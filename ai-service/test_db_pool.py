@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+from database import db_config
+from database.db_config import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise Error("gone away")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect(**config):
+        opened.append(FakeConnection(len(opened) + 1))
+        return opened[-1]
+
+    monkeypatch.setattr(db_config.mysql.connector, 'connect', connect)
+    return opened
+
+
+def test_checkin_reuses_and_exhaustion_raises(connections):
+    pool = ConnectionPool({}, size=1, timeout=0.05)
+
+    first = pool.checkout()
+    with pytest.raises(PoolError):
+        pool.checkout()
+    pool.checkin(first)
+
+    assert pool.checkout() is first
+    assert len(connections) == 1
+    assert pool.stats()['exhausted'] == 1
+
+
+def test_discard_wakes_a_blocked_checkout(connections):
+    pool = ConnectionPool({}, size=1, timeout=2)
+    held = pool.checkout()
+    result = {}
+
+    def waiter():
+        result['pooled'] = pool.checkout()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    pool.discard(held)
+    thread.join(1)
+
+    assert result['pooled'].connection.number == 2
+    assert time.monotonic() - started < 0.5
+    assert held.connection.closed
+    assert pool.stats()['open'] == 1
+
+
+def test_stale_idle_connection_is_replaced(connections, monkeypatch):
+    monkeypatch.setattr(db_config, 'DB_POOL_HEALTHCHECK_AFTER', 0)
+    pool = ConnectionPool({}, size=1, timeout=0.5)
+    stale = pool.checkout()
+    pool.checkin(stale)
+    stale.connection.alive = False
+
+    fresh = pool.checkout()
+
+    assert fresh is not stale and stale.connection.closed
+    assert pool.stats()['connections_discarded'] == 1
@@ -0,0 +1,27 @@
+from services.destination_context import normalize_location
+
+
+def test_same_city_spellings_share_a_key():
+    assert normalize_location("San Francisco, CA") == "san francisco|california"
+    assert normalize_location("san francisco, California, USA") == "san francisco|california"
+    assert normalize_location("SF, ca") == "san francisco|california"
+    assert normalize_location("Zürich, CH") == normalize_location("zurich, ch")
+    assert normalize_location("Washington, D.C.") == "washington|district of columbia"
+    assert normalize_location("New York") == normalize_location("New York, NY")
+
+
+def test_same_named_cities_in_different_regions_differ():
+    assert normalize_location("Portland, OR") != normalize_location("Portland, ME")
+    assert normalize_location("Paris, TX") != normalize_location("Paris, France")
+    assert normalize_location("London, UK") == normalize_location("London, United Kingdom")
+    assert normalize_location("Paris, TX") != normalize_location("Paris")
+
+
+def test_bare_well_known_city_shares_the_regional_key():
+    key = normalize_location("San Francisco, CA")
+
+    assert normalize_location("san francisco") == key
+    assert normalize_location("SF") == key
+    assert normalize_location("San Francisco, USA") == key
+    assert normalize_location("Paris") == normalize_location("Paris, France")
+    assert normalize_location("Portland") == "portland"
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from services.json_repair import repair_json
+
+DAY = {
+    "morning": [{"title": "Louvre", "description": "Art", "duration": "3 hours", "location": "Rue de Rivoli"}],
+    "afternoon": [
+        {"title": "Seine cruise", "description": "Boat tour", "duration": "1 hour", "location": "Pont Neuf"},
+        {"title": "Marais walk", "description": "Old streets", "duration": "2 hours", "location": "Le Marais"}
+    ],
+    "evening": [],
+    "restaurants": [{"name": "Chez Paul", "cuisine": "French", "why": "Classic", "location": "Bastille"}],
+    "summary": "Museums and the river"
+}
+
+
+def test_valid_json_needs_no_repairs():
+    text = "Here is the plan:\n```json\n" + json.dumps(DAY) + "\n```"
+    assert repair_json(text) == (DAY, [])
+
+
+def test_truncated_response_keeps_complete_elements():
+    text = json.dumps(DAY)
+    cut = text[:text.index('"Old streets"') + 5]
+
+    data, repairs = repair_json(cut)
+
+    assert data == {"morning": DAY["morning"], "afternoon": DAY["afternoon"][:1]}
+    assert "dropped truncated element .afternoon[1]" in repairs
+    assert "closed truncated object at $" in repairs
+
+
+def test_truncated_before_any_closing_brace():
+    data, repairs = repair_json('{"morning": [{"title": "Louvre", "descr')
+
+    assert data == {"morning": []}
+    assert repairs
+
+
+def test_common_syntax_slips_are_repaired():
+    text = """{
+        "morning": [{"title": "The "best" view", "duration": "1 hour",},],
+        "afternoon": [{"title": "Park"} {"title": "Zoo"}],
+        "evening": [{"title": "Show", "duration": 2 hours, "location": "Center"}],
+        "kids": True
+    }"""
+
+    data, repairs = repair_json(text)
+
+    assert data["morning"] == [{"title": 'The "best" view', "duration": "1 hour"}]
+    assert data["afternoon"] == [{"title": "Park"}, {"title": "Zoo"}]
+    assert data["evening"][0]["location"] == "Center"
+    assert data["kids"] is True
+    assert any(repair.startswith("removed trailing comma") for repair in repairs)
+    assert any(repair.startswith("escaped stray quote") for repair in repairs)
+    assert any(repair.startswith("inserted missing comma") for repair in repairs)
+
+
+def test_no_json_raises_value_error():
+    with pytest.raises(ValueError):
+        repair_json("I could not plan this day.")
+
+
+def test_truncation_only_drops_the_innermost_cut_element():
+    trip = {"days": [dict(DAY, day_number=1), dict(DAY, day_number=2)]}
+    text = json.dumps(trip)
+    cut = text[:text.rindex('"Bastille"') - 3]
+
+    data, repairs = repair_json(cut)
+
+    assert data["days"][0] == trip["days"][0]
+    last = data["days"][1]
+    assert last["morning"] == DAY["morning"] and last["afternoon"] == DAY["afternoon"]
+    assert last["restaurants"] == []
+    assert "summary" not in last
+    assert "dropped truncated element .days[1].restaurants[0]" in repairs
+
+
+def test_expect_object_skips_brackets_in_leading_prose():
+    text = "Sure! [Note] here it is: " + json.dumps(DAY)
+
+    data, repairs = repair_json(text, expect="object")
+
+    assert (data, repairs) == (DAY, [])
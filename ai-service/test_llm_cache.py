@@ -0,0 +1,50 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from services.llm_cache import LLMResponseCache
+
+
+def test_entries_expire_in_memory_and_on_disk(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMResponseCache(os.path.join(tmp, "llm.sqlite3"), ttl=60)
+            await cache.set("k", "plan")
+            fresh = await cache.get("k")
+
+            now[0] += 61
+            expired = await cache.get("k")
+            stats = cache.stats()
+            cache.close()
+            return fresh, expired, stats
+
+    fresh, expired, stats = asyncio.run(scenario())
+    assert fresh == "plan"
+    assert expired is None
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"], stats["memory_entries"]) == (1, 0, 1, 0)
+
+
+def test_disk_hits_keep_their_remaining_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "llm.sqlite3")
+            writer = LLMResponseCache(path, ttl=60)
+            await writer.set("k", "plan")
+            writer.close()
+
+            now[0] += 50
+            reader = LLMResponseCache(path, ttl=60)
+            promoted = await reader.get("k")
+            now[0] += 20
+            expired = await reader.get("k")
+            reader.close()
+            return promoted, expired
+
+    assert asyncio.run(scenario()) == ("plan", None)
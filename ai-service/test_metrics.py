@@ -0,0 +1,16 @@
+from fastapi import FastAPI
+
+from services.metrics import _route_template
+
+
+def test_route_label_is_the_route_template():
+    app = FastAPI()
+
+    @app.get("/v1/items/{item_id}")
+    async def item(item_id: int):
+        return {}
+
+    scope = {"app": app, "endpoint": item, "method": "GET", "path": "/v1/items/1", "path_params": {"item_id": 1}}
+
+    assert _route_template(scope) == "/v1/items/{item_id}"
+    assert _route_template({"app": app, "method": "GET", "path": "/v1/nope"}) == "unmatched"
@@ -25,18 +25,19 @@ def test_models():
         budget="medium",
         interests=["culture", "food", "nature"],
         mobility_needs="none",
-        dietary_filters=["vegan"]
+        dietary_restrictions=["vegan"]
     )
     print(f"✓ Preferences created: budget={prefs.budget}, interests={prefs.interests}")
 
     # Test 3: Create full request
     print("\n3. Testing AgentRequest...")
     request = AgentRequest(
-        booking_context=booking,
+        booking_id=booking.booking_id,
+        user_id=1,
         preferences=prefs,
-        free_text_query="We want family-friendly activities"
+        free_text="We want family-friendly activities"
     )
-    print(f"✓ AgentRequest created with free text: '{request.free_text_query}'")
+    print(f"✓ AgentRequest created with free text: '{request.free_text}'")
 
     # Test 4: Create activity card
     print("\n4. Testing ActivityCard...")
@@ -0,0 +1,44 @@
+from models.schemas import Preferences
+from services.preference_extraction import PreferenceExtractor, extract_preferences, extract_preferences_batch
+
+
+def test_extracts_every_category_in_one_pass():
+    delta = extract_preferences(
+        "Traveling with our kids. We're Vegan and gluten  free, love museums, beaches and hiking; "
+        "one of us uses a wheelchair but also has limited mobility"
+    )
+
+    assert delta.dietary_restrictions == ["vegan", "gluten-free"]
+    assert delta.interests == ["culture", "nature"]
+    assert delta.mobility_needs == "wheelchair"
+    assert delta.has_children
+
+
+def test_keywords_need_word_boundaries():
+    delta = extract_preferences("Start in Barcelona, then depart for the sparkling coast")
+
+    assert delta.interests == []
+    assert not delta.has_children
+
+
+def test_delta_applies_to_preferences_and_party():
+    prefs = Preferences(interests=["food"], dietary_restrictions=["halal"])
+    delta = extract_preferences("halal and kosher please, the children like parks")
+
+    updated = delta.apply_to(prefs)
+    party = delta.party_type(total_guests=4)
+
+    assert updated.dietary_restrictions == ["halal", "kosher"]
+    assert updated.interests == ["food", "nature"]
+    assert updated.mobility_needs == "none"
+    assert prefs.dietary_restrictions == ["halal"]
+    assert (party.adults, party.children) == (3, 1)
+
+
+def test_batch_and_custom_lexicon():
+    extractor = PreferenceExtractor({"interests": {"wine": ["wine tasting", "vineyard"]}})
+
+    deltas = extractor.extract_batch(["a vineyard tour", None, "Wine-tasting in Napa"])
+
+    assert [delta.interests for delta in deltas] == [["wine"], [], ["wine"]]
+    assert extract_preferences_batch(["spa day", ""])[0].interests == ["relaxation"]
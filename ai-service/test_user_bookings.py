@@ -0,0 +1,104 @@
+import asyncio
+import json
+import sqlite3
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from database import db_config
+from database.db_config import iter_user_bookings
+
+# (id, user_id, check_in): user 7 has ties on 2025-07-01 and 2025-06-15
+BOOKINGS = [
+    (1, 7, '2025-06-15'), (2, 7, '2025-05-01'), (3, 7, '2025-07-01'), (4, 8, '2025-07-01'),
+    (5, 7, '2025-07-01'), (6, 7, '2025-08-20'), (7, 7, '2025-04-10'), (8, 7, '2025-07-01'),
+    (9, 7, '2025-06-15'), (10, 7, '2025-03-03')
+]
+EXPECTED = [6, 8, 5, 3, 9, 1, 2, 7, 10]
+
+
+class FakeCursor:
+    """mysql.connector dictionary cursor over SQLite"""
+
+    def __init__(self, db, queries):
+        self.db = db
+        self.queries = queries
+        self.rows = []
+
+    def execute(self, query, params):
+        self.queries.append(params)
+        self.rows = [dict(row) for row in self.db.execute(query.replace('%s', '?'), params)]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self):
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE properties (id INTEGER PRIMARY KEY, title TEXT, location TEXT, type TEXT, images TEXT);
+            CREATE TABLE bookings (id INTEGER PRIMARY KEY, property_id INTEGER, user_id INTEGER, check_in TEXT,
+                                   check_out TEXT, guests INTEGER, status TEXT, total_price REAL);
+            INSERT INTO properties VALUES (1, 'Loft', 'Paris, France', 'loft', '[]');
+        """)
+        self.db.executemany(
+            "INSERT INTO bookings VALUES (?, 1, ?, ?, ?, 2, 'Accepted', 300.0)",
+            [(booking_id, user_id, check_in, check_in) for booking_id, user_id, check_in in BOOKINGS]
+        )
+        self.queries = []
+
+    @contextmanager
+    def connection(self):
+        cursor = lambda **options: FakeCursor(self.db, self.queries)
+        yield SimpleNamespace(connection=SimpleNamespace(cursor=cursor))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(db_config, 'get_pool', lambda: fake)
+    return fake
+
+
+def test_keyset_pages_cover_ties_without_duplicates_or_gaps(pool):
+    ids = [row['booking_id'] for row in iter_user_bookings(7, page_size=3)]
+
+    assert ids == EXPECTED
+    # 9 rows in pages of 3: the fourth page comes back empty and ends the walk
+    assert len(pool.queries) == 4
+    assert pool.queries[1][1:4] == ('2025-07-01', '2025-07-01', 5)
+
+
+def test_page_endpoint_walks_cursors_to_an_empty_last_page(pool):
+    import main
+
+    async def walk():
+        pages = []
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            cursor = None
+            while True:
+                params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+                page = (await client.get('/api/users/7/bookings', params=params)).json()
+                pages.append(page)
+                cursor = page['next_cursor']
+                if not cursor:
+                    break
+            async with client.stream('GET', '/api/users/7/bookings/stream', params={'page_size': 2}) as response:
+                lines = [json.loads(line) async for line in response.aiter_lines() if line]
+        return pages, lines
+
+    pages, lines = asyncio.run(walk())
+
+    assert [len(page['bookings']) for page in pages] == [3, 3, 3, 0]
+    assert [row['booking_id'] for page in pages for row in page['bookings']] == EXPECTED
+    assert pages[0]['next_cursor'] == '2025-07-01_5'
+    assert [line['data']['booking_id'] for line in lines[:-1]] == EXPECTED
+    assert lines[-1] == {'event': 'complete', 'data': {'count': 9}}